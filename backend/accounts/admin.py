@@ -1,10 +1,15 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Doctor, Patient
+from audit.admin import AuditedAdminMixin
+from healthhub.exports import export_action
+from healthhub.imports import ImportAdminMixin
+from .exports import DOCTOR_COLUMNS, NURSE_COLUMNS
+from .imports import DoctorImporter, NurseImporter
+from .models import User, Doctor, Patient, Nurse
 
 
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(AuditedAdminMixin, UserAdmin):
     list_display = ('username', 'email', 'user_type', 'first_name', 'last_name', 'is_active')
     list_filter = ('user_type', 'is_active', 'is_staff', 'is_superuser')
     search_fields = ('username', 'email', 'first_name', 'last_name')
@@ -12,15 +17,33 @@ class CustomUserAdmin(UserAdmin):
 
 
 @admin.register(Doctor)
-class DoctorAdmin(admin.ModelAdmin):
+class DoctorAdmin(AuditedAdminMixin, ImportAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'specialist', 'location', 'is_available', 'created_at')
     list_filter = ('specialist', 'location', 'is_available')
     search_fields = ('user__username', 'user__first_name', 'user__last_name')
     readonly_fields = ('created_at',)
+    actions = [
+        export_action(DOCTOR_COLUMNS, 'csv', 'doctors'),
+        export_action(DOCTOR_COLUMNS, 'ndjson', 'doctors'),
+    ]
+    importer_class = DoctorImporter
+
+
+@admin.register(Nurse)
+class NurseAdmin(AuditedAdminMixin, ImportAdminMixin, admin.ModelAdmin):
+    list_display = ('user', 'location', 'is_available', 'created_at')
+    list_filter = ('location', 'is_available')
+    search_fields = ('user__username', 'user__first_name', 'user__last_name')
+    readonly_fields = ('created_at',)
+    actions = [
+        export_action(NURSE_COLUMNS, 'csv', 'nurses'),
+        export_action(NURSE_COLUMNS, 'ndjson', 'nurses'),
+    ]
+    importer_class = NurseImporter
 
 
 @admin.register(Patient)
-class PatientAdmin(admin.ModelAdmin):
+class PatientAdmin(AuditedAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'phone', 'date_of_birth', 'created_at')
     search_fields = ('user__username', 'user__first_name', 'user__last_name')
     readonly_fields = ('created_at',)
@@ -5,3 +5,19 @@ class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
 
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from healthhub.responsecache import invalidate_on
+        from .authentication import forget_user, remember_user
+        from .models import Doctor, Nurse, Patient, User
+        from .profiles import forget_profile
+        post_save.connect(remember_user, sender=User, dispatch_uid='auth_user_cache_save')
+        post_delete.connect(forget_user, sender=User, dispatch_uid='auth_user_cache_delete')
+        for model in (User, Doctor, Patient, Nurse):
+            post_save.connect(forget_profile, sender=model, dispatch_uid=f'profile_cache_save_{model.__name__}')
+            post_delete.connect(forget_profile, sender=model, dispatch_uid=f'profile_cache_delete_{model.__name__}')
+        invalidate_on('doctors', Doctor)
+        invalidate_on('nurses', Nurse)
+        # Directory entries embed the provider's user
+        invalidate_on('doctors', User, lambda user: user.user_type == 'doctor')
+        invalidate_on('nurses', User, lambda user: user.user_type == 'nurse')
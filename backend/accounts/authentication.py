@@ -0,0 +1,114 @@
+"""
+JWT authentication without a user query per request.
+
+``CachedJWTAuthentication`` only needs the fields views authorize with
+(``RECORD_FIELDS``).  It keeps them in a per-process TTL LRU keyed by user
+id, refreshed by ``User`` save/delete signals.  On a miss it takes them from
+the role claims that ``RoleRefreshToken`` embeds in the token, and it only
+queries the database for tokens issued without them.
+
+``request.user`` is then a ``User`` with just those fields loaded; touching
+any other field loads the rest in one query (see ``User.refresh_from_db``).
+Role claims are trusted until the access token expires, except that saves
+seen by this process take precedence through the cache; refreshing a token
+re-reads them.  Tokens revoked at logout are rejected through
+``accounts.revocation``.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from healthhub.lru import MISSING, TTLCache
+from .revocation import revoked_tokens
+
+RECORD_FIELDS = ('id', 'user_type', 'is_active', 'is_staff', 'is_superuser')
+ROLE_CLAIMS = ('user_type', 'is_staff', 'is_superuser')
+
+user_cache = TTLCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL)
+
+
+def remember_user(sender, instance, **kwargs):
+    if instance.get_deferred_fields().intersection(RECORD_FIELDS):
+        user_cache.pop(instance.pk)
+    else:
+        user_cache.set(instance.pk, {field: getattr(instance, field) for field in RECORD_FIELDS})
+
+
+def forget_user(sender, instance, **kwargs):
+    # Tombstone, so that role claims of the deleted user's tokens are not trusted either
+    user_cache.set(instance.pk, None)
+
+
+def load_record(user_id):
+    record = get_user_model().objects.filter(id=user_id).values(*RECORD_FIELDS).first()
+    if record is not None:
+        user_cache.set(user_id, record)
+    return record
+
+
+def build_user(record):
+    User = get_user_model()
+    # from_db() takes the loaded values in field order
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in record]
+    return User.from_db(router.db_for_read(User), names, [record[name] for name in names])
+
+
+class RoleRefreshToken(RefreshToken):
+    """Refresh token that carries the user's role claims into its access tokens."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        if settings.JWT_ROLE_CLAIMS:
+            for claim in ROLE_CLAIMS:
+                token[claim] = getattr(user, claim)
+        return token
+
+    def verify(self):
+        super().verify()
+        if settings.JWT_ROLE_CLAIMS:
+            # Only runs for refresh tokens being used, so roles changed since login are
+            # picked up at the next refresh, and deactivated users can no longer refresh
+            record = load_record(self[api_settings.USER_ID_CLAIM])
+            if record is None or not record['is_active']:
+                raise TokenError(_("User not found or inactive"))
+            for claim in ROLE_CLAIMS:
+                self[claim] = record[claim]
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if token.get(api_settings.JTI_CLAIM) in revoked_tokens:
+            raise InvalidToken(_("Token has been revoked"))
+        return token
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash, which is not cached
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        record = user_cache.get(user_id, MISSING)
+        if record is MISSING:
+            if settings.JWT_ROLE_CLAIMS and all(claim in validated_token for claim in ROLE_CLAIMS):
+                # Tokens are only issued to active users
+                record = {'id': user_id, 'is_active': True}
+                record.update((claim, validated_token[claim]) for claim in ROLE_CLAIMS)
+            else:
+                record = load_record(user_id)
+
+        if record is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not record['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return build_user(record)
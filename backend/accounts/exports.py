@@ -0,0 +1,32 @@
+"""Column layouts for provider directory exports (see ``healthhub.exports``)."""
+PROVIDER_USER_COLUMNS = [
+    ('user_id', 'user_id'),
+    ('username', 'user__username'),
+    ('email', 'user__email'),
+    ('first_name', 'user__first_name'),
+    ('last_name', 'user__last_name'),
+    ('is_active', 'user__is_active'),
+]
+
+DOCTOR_COLUMNS = PROVIDER_USER_COLUMNS + [
+    ('specialist', 'specialist'),
+    ('location', 'location'),
+    ('phone', 'phone'),
+    ('experience_years', 'experience_years'),
+    ('consultation_fee', 'consultation_fee'),
+    ('appointment_duration', 'appointment_duration'),
+    ('is_available', 'is_available'),
+    ('bio', 'bio'),
+    ('created_at', 'created_at'),
+]
+
+NURSE_COLUMNS = PROVIDER_USER_COLUMNS + [
+    ('location', 'location'),
+    ('phone', 'phone'),
+    ('experience_years', 'experience_years'),
+    ('consultation_fee', 'consultation_fee'),
+    ('appointment_duration', 'appointment_duration'),
+    ('is_available', 'is_available'),
+    ('bio', 'bio'),
+    ('created_at', 'created_at'),
+]
@@ -0,0 +1,148 @@
+"""
+Bulk import of doctor and nurse profiles (see ``healthhub.imports``).
+
+One flat row per provider: the user columns of ``UserRegistrationSerializer``
+(``username``, ``email``, ``first_name``, ``last_name`` and an optional
+``password``) next to the profile columns of the registration serializer.
+Rows are matched to existing accounts by username, so re-importing a file
+updates the profiles instead of duplicating them.
+
+Accounts created without a ``password`` get an unusable one.  Supplying
+passwords makes the import much slower, since each one is hashed (in
+parallel, on the pool of ``healthhub.hashing``).
+"""
+import secrets
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import transaction
+
+from healthhub import hashing
+from healthhub.imports import Importer, SerializerRules
+from .models import Doctor, Nurse, User
+from .profiles import forget_profiles
+from .serializers import DoctorRegistrationSerializer, NurseRegistrationSerializer, UserRegistrationSerializer
+
+USER_FIELDS = ('username', 'email', 'first_name', 'last_name')
+
+
+class ProviderImporter(Importer):
+    model = None
+    user_type = None
+    serializer_class = None
+    profile_fields = ()
+
+    def __init__(self):
+        self.user_rules = SerializerRules(UserRegistrationSerializer(), USER_FIELDS + ('password',),
+                                          optional=('password',))
+        self.profile_rules = SerializerRules(self.serializer_class(), self.profile_fields)
+
+    def validate(self, row):
+        user, user_errors = self.user_rules.validate(row)
+        profile, profile_errors = self.profile_rules.validate(row)
+        return {'user': user, 'profile': profile}, {**user_errors, **profile_errors}
+
+    def key(self, record):
+        return record['user']['username']
+
+    def write(self, batch):
+        skipped = {}
+        usernames = [record['user']['username'] for _, record in batch]
+        existing = {user.username: user for user in User.objects.filter(username__in=usernames)}
+
+        # Emails must stay unique across accounts, including the rest of this batch
+        emails = {}
+        taken = dict(
+            User.objects.filter(email__in=[record['user']['email'] for _, record in batch])
+            .values_list('email', 'username')
+        )
+        accepted = []
+        for line, record in batch:
+            username, email = record['user']['username'], record['user']['email']
+            owner = emails.get(email) or taken.get(email)
+            if owner is not None and owner != username:
+                skipped[line] = f"Email {email} is already used by {owner}"
+                continue
+            user = existing.get(username)
+            if user is not None and user.user_type != self.user_type:
+                skipped[line] = f"Username {username} belongs to a {user.user_type} account"
+                continue
+            emails[email] = username
+            accepted.append(record)
+
+        # Upsert on the unique username / user columns; unchanged rows are not rewritten
+        users = []
+        hashes = iter(hashing.make_passwords(
+            [record['user']['password'] for record in accepted if record['user'].get('password') is not None]
+        ))
+        for record in accepted:
+            data = dict(record['user'])
+            password = data.pop('password', None)
+            current = existing.get(data['username'])
+            if password is not None:
+                hashed = next(hashes)
+            elif current is None:
+                # Same shape as make_password(None), from one urandom call instead of 40
+                hashed = UNUSABLE_PASSWORD_PREFIX + secrets.token_urlsafe(30)
+            else:
+                hashed = current.password
+                if all(getattr(current, name) == value for name, value in data.items()):
+                    continue
+            users.append(User(user_type=self.user_type, password=hashed, **data))
+        User.objects.bulk_create(
+            users, batch_size=500, update_conflicts=True,
+            unique_fields=['username'], update_fields=[*USER_FIELDS[1:], 'password'],
+        )
+
+        user_ids = dict(
+            User.objects.filter(username__in=[record['user']['username'] for record in accepted])
+            .values_list('username', 'id')
+        )
+        current_profiles = {
+            row[0]: row[1:]
+            for row in self.model.objects.filter(user_id__in=user_ids.values())
+            .values_list('user_id', *self.profile_fields)
+        }
+        profiles, created = [], 0
+        for record in accepted:
+            user_id = user_ids[record['user']['username']]
+            current = current_profiles.get(user_id)
+            if current is None:
+                created += 1
+                values = record['profile']
+            else:
+                # Columns missing from the row keep their stored values
+                values = {**dict(zip(self.profile_fields, current)), **record['profile']}
+                if tuple(values[name] for name in self.profile_fields) == current:
+                    continue
+            profiles.append(self.model(user_id=user_id, **values))
+        self.model.objects.bulk_create(
+            profiles, batch_size=500, update_conflicts=True,
+            unique_fields=['user'], update_fields=self.profile_fields,
+        )
+        transaction.on_commit(lambda: forget_profiles(user_ids.values()))
+        return created, len(accepted) - created, skipped
+
+
+class DoctorImporter(ProviderImporter):
+    name = 'doctors'
+    cache_scopes = ('doctors',)
+    model = Doctor
+    user_type = 'doctor'
+    serializer_class = DoctorRegistrationSerializer
+    profile_fields = ('specialist', 'location', 'phone', 'experience_years', 'consultation_fee', 'bio',
+                      'appointment_duration')
+
+
+class NurseImporter(ProviderImporter):
+    name = 'nurses'
+    cache_scopes = ('nurses',)
+    model = Nurse
+    user_type = 'nurse'
+    serializer_class = NurseRegistrationSerializer
+    profile_fields = ('location', 'phone', 'experience_years', 'consultation_fee', 'bio', 'appointment_duration')
+
+
+IMPORTERS = {
+    'doctors': DoctorImporter,
+    'nurses': NurseImporter,
+}
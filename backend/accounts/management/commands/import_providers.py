@@ -0,0 +1,7 @@
+from accounts.imports import IMPORTERS
+from healthhub.imports import ImportCommand
+
+
+class Command(ImportCommand):
+    help = "Create or update doctor/nurse accounts and profiles from a CSV or JSON Lines file"
+    importers = IMPORTERS
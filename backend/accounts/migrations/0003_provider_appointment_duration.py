@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_user_user_type_nurse'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='appointment_duration',
+            field=models.PositiveSmallIntegerField(default=30, help_text='Default appointment length in minutes'),
+        ),
+        migrations.AddField(
+            model_name='nurse',
+            name='appointment_duration',
+            field=models.PositiveSmallIntegerField(default=30, help_text='Default appointment length in minutes'),
+        ),
+    ]
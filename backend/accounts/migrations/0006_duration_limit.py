@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:03
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='doctor',
+            name='appointment_duration',
+            field=models.PositiveSmallIntegerField(default=30, help_text='Default appointment length in minutes', validators=[django.core.validators.MaxValueValidator(1440)]),
+        ),
+        migrations.AlterField(
+            model_name='nurse',
+            name='appointment_duration',
+            field=models.PositiveSmallIntegerField(default=30, help_text='Default appointment length in minutes', validators=[django.core.validators.MaxValueValidator(1440)]),
+        ),
+    ]
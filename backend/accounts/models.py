@@ -1,5 +1,11 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.validators import MaxValueValidator
 from django.db import models
+from healthhub import hashing
+
+
+# Longest booking; overlap checks only look this far back for bookings still running
+MAX_APPOINTMENT_MINUTES = 24 * 60
 
 
 class User(AbstractUser):
@@ -13,9 +19,35 @@ class User(AbstractUser):
     user_type = models.CharField(max_length=10, choices=USER_TYPE_CHOICES, default='patient')
     email = models.EmailField(unique=True)
     
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['date_joined']),
+        ]
+    
     def __str__(self):
         return f"{self.username} ({self.user_type})"
 
+    # Hash on the shared pool of healthhub.hashing
+    def set_password(self, raw_password):
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        def setter(raw_password):
+            self.set_password(raw_password)
+            # An upgraded hash is not a password change
+            self._password = None
+            self.save(update_fields=['password'])
+        return hashing.check_password(raw_password, self.password, setter)
+
+    def refresh_from_db(self, using=None, fields=None):
+        # Users built by CachedJWTAuthentication only have the role fields loaded;
+        # load everything else together instead of one query per field touched
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred.issuperset(fields):
+            fields = deferred
+        super().refresh_from_db(using, fields)
+
 
 class Doctor(models.Model):
     SPECIALIST_CHOICES = [
@@ -48,6 +80,9 @@ class Doctor(models.Model):
     experience_years = models.PositiveIntegerField(default=0)
     consultation_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     bio = models.TextField(blank=True)
+    appointment_duration = models.PositiveSmallIntegerField(
+        default=30, validators=[MaxValueValidator(MAX_APPOINTMENT_MINUTES)],
+        help_text="Default appointment length in minutes")
     is_available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -85,9 +120,22 @@ class Nurse(models.Model):
     experience_years = models.PositiveIntegerField(default=0)
     consultation_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     bio = models.TextField(blank=True)
+    appointment_duration = models.PositiveSmallIntegerField(
+        default=30, validators=[MaxValueValidator(MAX_APPOINTMENT_MINUTES)],
+        help_text="Default appointment length in minutes")
     is_available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"Nurse {self.user.get_full_name() or self.user.username} - {self.get_location_display()}"
 
+
+
+class RevokedToken(models.Model):
+    """Access token revoked before it expires, e.g. at logout (see ``accounts.revocation``)."""
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.jti
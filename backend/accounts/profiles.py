@@ -0,0 +1,65 @@
+"""
+The profile payload of ``login`` and ``user_profile``.
+
+``profile_payload(user)`` returns ``{'user': ..., '<user_type>': ...}`` for
+doctors, patients and nurses (just ``{'user': ...}`` for other accounts).  It
+is built from one query, the user joined to its reverse one-to-one profiles,
+and cached per user in the ``profiles`` cache.  Entries are dropped when the
+user or its profile is saved or deleted, or re-imported; ``PROFILE_CACHE_TTL``
+bounds staleness for writes in other processes while the cache is
+process-local.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ObjectDoesNotExist
+
+from .models import User
+from .serializers import DoctorSerializer, NurseSerializer, PatientSerializer, UserSerializer
+
+CACHE_ALIAS = 'profiles'
+
+# user_type -> (reverse one-to-one of User, serializer)
+PROFILES = {
+    'doctor': ('doctor_profile', DoctorSerializer),
+    'patient': ('patient_profile', PatientSerializer),
+    'nurse': ('nurse_profile', NurseSerializer),
+}
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _key(user_id):
+    return f'profile:{user_id}'
+
+
+def build_payload(user_id):
+    user = User.objects.select_related(*(relation for relation, _ in PROFILES.values())).get(pk=user_id)
+    if user.user_type in PROFILES:
+        relation, serializer_class = PROFILES[user.user_type]
+        try:
+            profile = getattr(user, relation)
+        except ObjectDoesNotExist:
+            pass
+        else:
+            data = serializer_class(profile).data
+            # The profile serializer nests the same user, so serialize it once
+            return {'user': data['user'], user.user_type: data}
+    return {'user': UserSerializer(user).data}
+
+
+def profile_payload(user):
+    payload = _cache().get(_key(user.pk))
+    if payload is None:
+        payload = build_payload(user.pk)
+        _cache().set(_key(user.pk), payload, settings.PROFILE_CACHE_TTL)
+    return payload
+
+
+def forget_profiles(user_ids):
+    _cache().delete_many([_key(user_id) for user_id in user_ids])
+
+
+def forget_profile(sender, instance, **kwargs):
+    forget_profiles([instance.pk if isinstance(instance, User) else instance.user_id])
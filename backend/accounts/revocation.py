@@ -0,0 +1,78 @@
+"""
+Revoked access tokens, checked from memory.
+
+``revoke(token)`` stores the token's JTI in ``RevokedToken`` and in this
+process's ``revoked_tokens`` set.  ``CachedJWTAuthentication`` then checks
+every request against the set, which costs one hash lookup.  Each process
+loads revocations made by the others at most every
+``REVOCATION_SYNC_INTERVAL`` seconds, with a query for the rows added since
+its last load.  Entries are dropped once their token has expired anyway.
+
+Refresh tokens are revoked through simplejwt's ``token_blacklist`` instead,
+which is only consulted when a token is refreshed.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.utils import timezone as django_timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken
+
+
+class RevocationList:
+
+    def __init__(self, sync_interval=None):
+        self.sync_interval = sync_interval
+        self._expiry = {}  # jti -> expiry timestamp
+        self._last_id = 0
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+
+    def __contains__(self, jti):
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+        return jti in self._expiry
+
+    def add(self, jti, expires_at):
+        self._expiry[jti] = expires_at.timestamp()
+
+    def sync(self):
+        # Other threads keep answering from the current set meanwhile
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            interval = self.sync_interval if self.sync_interval is not None else settings.REVOCATION_SYNC_INTERVAL
+            now = django_timezone.now()
+            rows = (RevokedToken.objects.filter(id__gt=self._last_id, expires_at__gt=now)
+                    .values_list('id', 'jti', 'expires_at').order_by('id'))
+            for pk, jti, expires_at in rows:
+                self._expiry[jti] = expires_at.timestamp()
+                self._last_id = pk
+            cutoff = now.timestamp()
+            # add() writes without the lock, so iterate over a copy
+            for jti in [jti for jti, expires in list(self._expiry.items()) if expires <= cutoff]:
+                self._expiry.pop(jti, None)
+            self._next_sync = time.monotonic() + interval
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        with self._lock:
+            self._expiry.clear()
+            self._last_id = 0
+            self._next_sync = 0.0
+
+
+revoked_tokens = RevocationList()
+
+
+def revoke(token):
+    """Revoke a validated access ``token`` until it expires."""
+    jti = token[api_settings.JTI_CLAIM]
+    expires_at = datetime.fromtimestamp(token['exp'], tz=timezone.utc)
+    RevokedToken.objects.get_or_create(jti=jti, defaults={'expires_at': expires_at})
+    revoked_tokens.add(jti, expires_at)
+    RevokedToken.objects.filter(expires_at__lte=django_timezone.now()).delete()
@@ -1,5 +1,10 @@
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import authenticate
+from healthhub.fastserializers import FastSerializer
+from .authentication import RoleRefreshToken
 from .models import User, Doctor, Patient, Nurse
 
 
@@ -19,7 +24,9 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data.pop('password_confirm')
         password = validated_data.pop('password')
-        user = User.objects.create_user(**validated_data)
+        user = User(**validated_data)
+        # The username/email normalization of create_user(), which would bypass the hashing pool
+        user.clean()
         user.set_password(password)
         user.save()
         return user
@@ -30,7 +37,9 @@ class DoctorRegistrationSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Doctor
-        fields = ('user', 'specialist', 'location', 'phone', 'experience_years', 'consultation_fee', 'bio')
+        fields = ('user', 'specialist', 'location', 'phone', 'experience_years', 'consultation_fee', 'bio',
+                  'appointment_duration')
+        extra_kwargs = {'appointment_duration': {'min_value': 1}}
     
     def validate_specialist(self, value):
         if not value:
@@ -77,7 +86,9 @@ class NurseRegistrationSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Nurse
-        fields = ('user', 'location', 'phone', 'experience_years', 'consultation_fee', 'bio')
+        fields = ('user', 'location', 'phone', 'experience_years', 'consultation_fee', 'bio',
+                  'appointment_duration')
+        extra_kwargs = {'appointment_duration': {'min_value': 1}}
     
     def validate_location(self, value):
         if not value:
@@ -117,6 +128,24 @@ class UserLoginSerializer(serializers.Serializer):
             raise serializers.ValidationError('Must include username and password')
 
 
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    # Re-reads the role claims of the user and rejects inactive users
+    token_class = RoleRefreshToken
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value):
+        try:
+            token = RoleRefreshToken(value)
+        except TokenError as exc:
+            raise serializers.ValidationError(str(exc))
+        if token.get(api_settings.USER_ID_CLAIM) != self.context['request'].user.pk:
+            raise serializers.ValidationError("Refresh token belongs to another user")
+        return token
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -129,7 +158,7 @@ class DoctorSerializer(serializers.ModelSerializer):
     class Meta:
         model = Doctor
         fields = ('id', 'user', 'specialist', 'location', 'phone', 'experience_years', 
-                 'consultation_fee', 'bio', 'is_available', 'created_at')
+                 'consultation_fee', 'bio', 'appointment_duration', 'is_available', 'created_at')
 
 
 class PatientSerializer(serializers.ModelSerializer):
@@ -146,4 +175,12 @@ class NurseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Nurse
         fields = ('id', 'user', 'location', 'phone', 'experience_years', 
-                 'consultation_fee', 'bio', 'is_available', 'created_at')
+                 'consultation_fee', 'bio', 'appointment_duration', 'is_available', 'created_at')
+
+
+class FastDoctorSerializer(FastSerializer):
+    serializer_class = DoctorSerializer
+
+
+class FastNurseSerializer(FastSerializer):
+    serializer_class = NurseSerializer
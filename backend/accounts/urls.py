@@ -1,4 +1,5 @@
 from django.urls import path
+from rest_framework_simplejwt.views import TokenRefreshView
 from . import views
 
 urlpatterns = [
@@ -6,10 +7,14 @@ urlpatterns = [
     path('register/doctor/', views.register_doctor, name='register_doctor'),
     path('register/nurse/', views.register_nurse, name='register_nurse'),
     path('login/', views.login, name='login'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('logout/', views.logout, name='logout'),
     path('profile/', views.user_profile, name='user_profile'),
     path('doctors/', views.DoctorListView.as_view(), name='doctor_list'),
     path('doctors/<int:pk>/', views.doctor_detail, name='doctor_detail'),
+    path('doctors/export/<str:fmt>/', views.export_doctors, name='export_doctors'),
     path('nurses/', views.NurseListView.as_view(), name='nurse_list'),
     path('nurses/<int:pk>/', views.nurse_detail, name='nurse_detail'),
+    path('nurses/export/<str:fmt>/', views.export_nurses, name='export_nurses'),
 ]
 
@@ -1,13 +1,23 @@
 from rest_framework import status, generics
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes, throttle_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
-from .models import Doctor, Patient, Nurse
+from django.utils.decorators import method_decorator
+from healthhub.exports import EXPORT_FORMATS, EXPORT_RENDERERS, streaming_export
+from healthhub.fastserializers import FastListMixin
+from healthhub.idempotency import idempotent
+from healthhub.responsecache import cached_response
+from healthhub.throttling import LoginIPThrottle, LoginUsernameThrottle, RegisterIPThrottle
+from .authentication import RoleRefreshToken
+from .revocation import revoke
+from .exports import DOCTOR_COLUMNS, NURSE_COLUMNS
+from .profiles import profile_payload
+from .models import Doctor, Nurse
 from .serializers import (
     UserRegistrationSerializer, DoctorRegistrationSerializer, PatientRegistrationSerializer, NurseRegistrationSerializer,
-    UserLoginSerializer, UserSerializer, DoctorSerializer, PatientSerializer, NurseSerializer
+    UserLoginSerializer, LogoutSerializer, UserSerializer, DoctorSerializer, PatientSerializer, NurseSerializer,
+    FastDoctorSerializer, FastNurseSerializer
 )
 
 User = get_user_model()
@@ -15,12 +25,14 @@ User = get_user_model()
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterIPThrottle])
+@idempotent
 def register_patient(request):
     print("Patient registration request data:", request.data)
     serializer = PatientRegistrationSerializer(data=request.data)
     if serializer.is_valid():
         patient = serializer.save()
-        refresh = RefreshToken.for_user(patient.user)
+        refresh = RoleRefreshToken.for_user(patient.user)
         return Response({
             'user': UserSerializer(patient.user).data,
             'patient': PatientSerializer(patient).data,
@@ -35,12 +47,14 @@ def register_patient(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterIPThrottle])
+@idempotent
 def register_doctor(request):
     print("Doctor registration request data:", request.data)
     serializer = DoctorRegistrationSerializer(data=request.data)
     if serializer.is_valid():
         doctor = serializer.save()
-        refresh = RefreshToken.for_user(doctor.user)
+        refresh = RoleRefreshToken.for_user(doctor.user)
         return Response({
             'user': UserSerializer(doctor.user).data,
             'doctor': DoctorSerializer(doctor).data,
@@ -55,11 +69,13 @@ def register_doctor(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterIPThrottle])
+@idempotent
 def register_nurse(request):
     serializer = NurseRegistrationSerializer(data=request.data)
     if serializer.is_valid():
         nurse = serializer.save()
-        refresh = RefreshToken.for_user(nurse.user)
+        refresh = RoleRefreshToken.for_user(nurse.user)
         return Response({
             'user': UserSerializer(nurse.user).data,
             'nurse': NurseSerializer(nurse).data,
@@ -73,75 +89,50 @@ def register_nurse(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginUsernameThrottle])
 def login(request):
     serializer = UserLoginSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data['user']
-        refresh = RefreshToken.for_user(user)
+        refresh = RoleRefreshToken.for_user(user)
         
         response_data = {
-            'user': UserSerializer(user).data,
+            **profile_payload(user),
             'tokens': {
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
             }
         }
         
-        # Add profile data based on user type
-        if user.user_type == 'doctor':
-            try:
-                doctor = Doctor.objects.get(user=user)
-                response_data['doctor'] = DoctorSerializer(doctor).data
-            except Doctor.DoesNotExist:
-                pass
-        elif user.user_type == 'patient':
-            try:
-                patient = Patient.objects.get(user=user)
-                response_data['patient'] = PatientSerializer(patient).data
-            except Patient.DoesNotExist:
-                pass
-        elif user.user_type == 'nurse':
-            try:
-                nurse = Nurse.objects.get(user=user)
-                response_data['nurse'] = NurseSerializer(nurse).data
-            except Nurse.DoesNotExist:
-                pass
-        
         return Response(response_data, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout(request):
+    """Revoke the access token of the request, and blacklist the refresh token if one is sent."""
+    serializer = LogoutSerializer(data=request.data, context={'request': request})
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    refresh = serializer.validated_data.get('refresh')
+    if refresh is not None:
+        refresh.blacklist()
+    revoke(request.auth)
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_profile(request):
-    user = request.user
-    response_data = {'user': UserSerializer(user).data}
-    
-    if user.user_type == 'doctor':
-        try:
-            doctor = Doctor.objects.get(user=user)
-            response_data['doctor'] = DoctorSerializer(doctor).data
-        except Doctor.DoesNotExist:
-            pass
-    elif user.user_type == 'patient':
-        try:
-            patient = Patient.objects.get(user=user)
-            response_data['patient'] = PatientSerializer(patient).data
-        except Patient.DoesNotExist:
-            pass
-    elif user.user_type == 'nurse':
-        try:
-            nurse = Nurse.objects.get(user=user)
-            response_data['nurse'] = NurseSerializer(nurse).data
-        except Nurse.DoesNotExist:
-            pass
-    
-    return Response(response_data)
+    return Response(profile_payload(request.user))
 
 
-class DoctorListView(generics.ListAPIView):
+@method_decorator(cached_response('doctors'), name='list')
+class DoctorListView(FastListMixin, generics.ListAPIView):
     queryset = Doctor.objects.filter(is_available=True)
     serializer_class = DoctorSerializer
+    fast_serializer_class = FastDoctorSerializer
     permission_classes = [AllowAny]
     
     def get_queryset(self):
@@ -157,9 +148,11 @@ class DoctorListView(generics.ListAPIView):
         return queryset
 
 
-class NurseListView(generics.ListAPIView):
+@method_decorator(cached_response('nurses'), name='list')
+class NurseListView(FastListMixin, generics.ListAPIView):
     queryset = Nurse.objects.filter(is_available=True)
     serializer_class = NurseSerializer
+    fast_serializer_class = FastNurseSerializer
     permission_classes = [AllowAny]
     
     def get_queryset(self):
@@ -190,3 +183,36 @@ def doctor_detail(request, pk):
         return Response(serializer.data)
     except Doctor.DoesNotExist:
         return Response({'error': 'Doctor not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
+
+def _export_providers(request, model, columns, filters, name, fmt):
+    if request.user.user_type != 'admin' and not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    if fmt not in EXPORT_FORMATS:
+        return Response({'error': f"Unsupported format; use one of {', '.join(EXPORT_FORMATS)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    queryset = model.objects.order_by('pk')
+    for param in filters:
+        if request.query_params.get(param):
+            queryset = queryset.filter(**{param: request.query_params[param]})
+    is_available = request.query_params.get('is_available', '').lower()
+    if is_available in ('1', 'true', '0', 'false'):
+        queryset = queryset.filter(is_available=is_available in ('1', 'true'))
+    return streaming_export(queryset, columns, fmt, name)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes(EXPORT_RENDERERS)
+def export_doctors(request, fmt):
+    """Stream the doctor directory as CSV or NDJSON (admins only); filters: specialist, location, is_available."""
+    return _export_providers(request, Doctor, DOCTOR_COLUMNS, ('specialist', 'location'), 'doctors', fmt)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes(EXPORT_RENDERERS)
+def export_nurses(request, fmt):
+    """Stream the nurse directory as CSV or NDJSON (admins only); filters: location, is_available."""
+    return _export_providers(request, Nurse, NURSE_COLUMNS, ('location',), 'nurses', fmt)
@@ -0,0 +1,30 @@
+from django.contrib import admin
+from .models import DailyBookingStat, DailyRegistrationStat, StatsWatermark
+
+
+class ReadOnlyStatAdmin(admin.ModelAdmin):
+    """Stats are written by ``manage.py refresh_platform_stats`` only."""
+    date_hierarchy = 'day'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyBookingStat)
+class DailyBookingStatAdmin(ReadOnlyStatAdmin):
+    list_display = ('day', 'provider_type', 'specialist', 'location', 'status', 'count')
+    list_filter = ('provider_type', 'specialist', 'location', 'status')
+
+
+@admin.register(DailyRegistrationStat)
+class DailyRegistrationStatAdmin(ReadOnlyStatAdmin):
+    list_display = ('day', 'user_type', 'count')
+    list_filter = ('user_type',)
+
+
+@admin.register(StatsWatermark)
+class StatsWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('name', 'value')
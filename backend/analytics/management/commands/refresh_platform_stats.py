@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.materialize import refresh
+
+
+class Command(BaseCommand):
+    help = "Fold new bookings and registrations into the materialized platform statistics"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help="Recompute every day instead of only days changed since the last run (also corrects deletions)",
+        )
+        parser.add_argument('--loop', action='store_true', help="Keep refreshing instead of running a single pass")
+        parser.add_argument('--interval', type=int, default=300, help="Seconds between passes with --loop")
+
+    def handle(self, *args, **options):
+        full = options['full']
+        while True:
+            started = time.monotonic()
+            written = refresh(full=full)
+            elapsed = time.monotonic() - started
+            if any(written.values()) or options['verbosity'] > 1:
+                summary = ', '.join(f"{rows} {name}" for name, rows in written.items())
+                self.stdout.write(self.style.SUCCESS(f"Wrote {summary} stat rows in {elapsed:.2f}s"))
+            if not options['loop']:
+                return
+            # Only the first pass of a looping run is a full recompute
+            full = False
+            time.sleep(max(0, options['interval'] - elapsed))
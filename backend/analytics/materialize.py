@@ -0,0 +1,241 @@
+"""
+Materialized platform statistics.
+
+``refresh`` folds changes since the last run into ``DailyBookingStat`` and
+``DailyRegistrationStat``: it finds the days touched by appointments updated
+(or users joined) after the stored watermark and recomputes just those days.
+Reports then read the small stats tables, whose size depends on the number
+of days and categories rather than on the number of bookings or users.
+
+Deleted appointments do not leave a trace to pick up incrementally; a
+periodic ``refresh(full=True)`` corrects for them.
+"""
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from healthhub.responsecache import invalidate
+from appointments.models import Appointment, ArchivedAppointment, ArchivedNurseAppointment, NurseAppointment
+from .models import DailyBookingStat, DailyRegistrationStat, StatsWatermark
+
+User = get_user_model()
+
+# Changes committed slightly before a run started may become visible only after it;
+# re-reading this much history each run catches them.  Recomputing a day is idempotent.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# (model, provider type, specialist path, location path); hot tables first
+BOOKING_SOURCES = (
+    (Appointment, 'doctor', 'doctor__doctor_profile__specialist', 'doctor__doctor_profile__location'),
+    (NurseAppointment, 'nurse', None, 'nurse__nurse_profile__location'),
+    (ArchivedAppointment, 'doctor', 'doctor__doctor_profile__specialist', 'doctor__doctor_profile__location'),
+    (ArchivedNurseAppointment, 'nurse', None, 'nurse__nurse_profile__location'),
+)
+HOT_BOOKING_MODELS = (Appointment, NurseAppointment)
+
+
+# Day ranges ORed into one query; SQLite rejects expression trees much deeper than this
+DAY_RANGES_PER_QUERY = 200
+
+
+def day_ranges(days):
+    """Sorted ``(first, last)`` day pairs covering ``days``, consecutive days merged."""
+    ranges = []
+    for day in sorted(days):
+        if ranges and day == ranges[-1][1] + timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def day_range_chunks(days):
+    """``day_ranges(days)`` split into lists of at most ``DAY_RANGES_PER_QUERY`` ranges."""
+    ranges = day_ranges(days)
+    return [ranges[index:index + DAY_RANGES_PER_QUERY] for index in range(0, len(ranges), DAY_RANGES_PER_QUERY)]
+
+
+def day_range_filter(field, ranges):
+    """``Q`` matching datetime ``field`` on any of the day ``ranges`` as index-friendly datetime ranges."""
+    tz = timezone.get_default_timezone()
+    condition = Q()
+    for first, last in ranges:
+        start = timezone.make_aware(datetime.combine(first, time.min), tz)
+        end = timezone.make_aware(datetime.combine(last + timedelta(days=1), time.min), tz)
+        condition |= Q(**{f'{field}__gte': start, f'{field}__lt': end})
+    return condition
+
+
+def _day_querysets(queryset, field, days):
+    """``queryset`` restricted to ``days`` of datetime ``field``, as one queryset per chunk of day ranges."""
+    if days is None:
+        return [queryset]
+    return [queryset.filter(day_range_filter(field, ranges)) for ranges in day_range_chunks(days)]
+
+
+def _delete_days(queryset, days):
+    """Delete the rows of ``queryset`` whose ``day`` is in ``days`` (all rows when ``None``)."""
+    if days is None:
+        queryset.delete()
+        return
+    for ranges in day_range_chunks(days):
+        condition = Q()
+        for first, last in ranges:
+            condition |= Q(day__range=(first, last))
+        queryset.filter(condition).delete()
+
+
+def _booking_counts(days=None):
+    counts = {}
+    for model, provider_type, specialist_path, location_path in BOOKING_SOURCES:
+        fields = [location_path, 'status'] + ([specialist_path] if specialist_path else [])
+        for rows in _day_querysets(model.objects.all(), 'created_at', days):
+            grouped = (
+                rows.annotate(day=TruncDate('created_at'))
+                .values_list('day', *fields)
+                .annotate(total=Count('id'))
+                .order_by()
+            )
+            for row in grouped.iterator():
+                if specialist_path:
+                    day, location, status, specialist, total = row
+                else:
+                    day, location, status, total = row
+                    specialist = ''
+                key = (day, provider_type, specialist or '', location or '', status)
+                counts[key] = counts.get(key, 0) + total
+    return counts
+
+
+def _registration_counts(days=None):
+    counts = {}
+    for rows in _day_querysets(User.objects.all(), 'date_joined', days):
+        grouped = (
+            rows.annotate(day=TruncDate('date_joined'))
+            .values_list('day', 'user_type')
+            .annotate(total=Count('id'))
+            .order_by()
+        )
+        for day, user_type, total in grouped.iterator():
+            counts[day, user_type] = counts.get((day, user_type), 0) + total
+    return counts
+
+
+def _dirty_booking_days(since):
+    days = set()
+    for model in HOT_BOOKING_MODELS:
+        days.update(
+            model.objects.filter(updated_at__gte=since)
+            .annotate(day=TruncDate('created_at'))
+            .values_list('day', flat=True)
+            .order_by()
+            .distinct()
+        )
+    return days
+
+
+def _dirty_registration_days(since):
+    return set(
+        User.objects.filter(date_joined__gte=since)
+        .annotate(day=TruncDate('date_joined'))
+        .values_list('day', flat=True)
+        .order_by()
+        .distinct()
+    )
+
+
+def refresh_bookings(since=None):
+    """Recompute booking stats for days touched since ``since`` (all days when ``None``)."""
+    days = None if since is None else _dirty_booking_days(since)
+    if days is not None and not days:
+        return 0
+    counts = _booking_counts(days)
+    with transaction.atomic():
+        _delete_days(DailyBookingStat.objects.all(), days)
+        DailyBookingStat.objects.bulk_create(
+            [
+                DailyBookingStat(day=day, provider_type=provider_type, specialist=specialist,
+                                 location=location, status=status, count=total)
+                for (day, provider_type, specialist, location, status), total in counts.items()
+            ],
+            batch_size=1000,
+        )
+    return len(counts)
+
+
+def refresh_registrations(since=None):
+    """Recompute registration stats for days with users joining since ``since`` (all days when ``None``)."""
+    days = None if since is None else _dirty_registration_days(since)
+    if days is not None and not days:
+        return 0
+    counts = _registration_counts(days)
+    with transaction.atomic():
+        _delete_days(DailyRegistrationStat.objects.all(), days)
+        DailyRegistrationStat.objects.bulk_create(
+            [DailyRegistrationStat(day=day, user_type=user_type, count=total)
+             for (day, user_type), total in counts.items()],
+            batch_size=1000,
+        )
+    return len(counts)
+
+
+REFRESHERS = {
+    'bookings': refresh_bookings,
+    'registrations': refresh_registrations,
+}
+
+
+def refresh(full=False):
+    """Bring every stats table up to date; returns rollup rows written per table."""
+    written = {}
+    for name, refresher in REFRESHERS.items():
+        started = timezone.now()
+        watermark = StatsWatermark.objects.filter(name=name).first()
+        since = None if full or watermark is None else watermark.value - WATERMARK_OVERLAP
+        written[name] = refresher(since)
+        StatsWatermark.objects.update_or_create(name=name, defaults={'value': started})
+    invalidate('analytics')
+    return written
+
+
+def platform_summary(days=30):
+    """Bookings, cancellation rates and registrations over the last ``days`` days, from the stats tables."""
+    since = timezone.localdate() - timedelta(days=days - 1)
+
+    by_specialist, by_location, by_day = {}, {}, {}
+    for day, provider_type, specialist, location, status, count in (
+            DailyBookingStat.objects.filter(day__gte=since)
+            .values_list('day', 'provider_type', 'specialist', 'location', 'status', 'count')):
+        for bucket, key in ((by_specialist, specialist or provider_type), (by_location, location), (by_day, day)):
+            totals = bucket.setdefault(key, {'bookings': 0, 'cancelled': 0})
+            totals['bookings'] += count
+            if status == 'cancelled':
+                totals['cancelled'] += count
+
+    def with_rates(bucket):
+        for totals in bucket.values():
+            totals['cancellation_rate'] = (
+                round(totals['cancelled'] / totals['bookings'], 4) if totals['bookings'] else 0.0
+            )
+        return bucket
+
+    registrations_by_type, registrations_by_day = {}, {}
+    for day, user_type, count in (
+            DailyRegistrationStat.objects.filter(day__gte=since).values_list('day', 'user_type', 'count')):
+        registrations_by_type[user_type] = registrations_by_type.get(user_type, 0) + count
+        registrations_by_day.setdefault(day, {})[user_type] = count
+
+    refreshed = dict(StatsWatermark.objects.values_list('name', 'value'))
+    return {
+        'since': since,
+        'refreshed_at': refreshed,
+        'bookings_by_specialist': with_rates(by_specialist),
+        'bookings_by_location': with_rates(by_location),
+        'bookings_by_day': [{'day': day, **totals} for day, totals in sorted(with_rates(by_day).items())],
+        'registrations_by_user_type': registrations_by_type,
+        'registrations_by_day': [{'day': day, **counts} for day, counts in sorted(registrations_by_day.items())],
+    }
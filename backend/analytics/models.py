@@ -0,0 +1,46 @@
+from django.db import models
+
+
+class DailyBookingStat(models.Model):
+    """Appointments booked per day, provider type, specialist, location and current status."""
+    PROVIDER_TYPE_CHOICES = [
+        ('doctor', 'Doctor'),
+        ('nurse', 'Nurse'),
+    ]
+    
+    day = models.DateField(help_text="Day the appointment was booked")
+    provider_type = models.CharField(max_length=10, choices=PROVIDER_TYPE_CHOICES)
+    specialist = models.CharField(max_length=20, blank=True, help_text="Doctor specialist; blank for nurses")
+    location = models.CharField(max_length=20, blank=True)
+    status = models.CharField(max_length=10)
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-day', 'provider_type', 'specialist', 'location', 'status']
+        unique_together = ['day', 'provider_type', 'specialist', 'location', 'status']
+    
+    def __str__(self):
+        return f"{self.day} {self.provider_type} {self.specialist or '-'} {self.location or '-'} {self.status}: {self.count}"
+
+
+class DailyRegistrationStat(models.Model):
+    """New users per day and user type."""
+    day = models.DateField()
+    user_type = models.CharField(max_length=10)
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-day', 'user_type']
+        unique_together = ['day', 'user_type']
+    
+    def __str__(self):
+        return f"{self.day} {self.user_type}: {self.count}"
+
+
+class StatsWatermark(models.Model):
+    """Point up to which source-table changes have been folded into the stats."""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DateTimeField()
+    
+    def __str__(self):
+        return f"{self.name}: {self.value}"
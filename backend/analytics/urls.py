@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('summary/', views.summary, name='platform_summary'),
+]
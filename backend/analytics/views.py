@@ -0,0 +1,27 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from healthhub.responsecache import cached_response
+from .materialize import platform_summary
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def summary(request):
+    """Platform-wide booking and registration statistics from the materialized stats tables."""
+    if request.user.user_type != 'admin' and not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    try:
+        days = int(request.query_params.get('days', 30))
+    except ValueError:
+        return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= days <= 366:
+        return Response({'error': 'days must be between 1 and 366'}, status=status.HTTP_400_BAD_REQUEST)
+    return _summary(request, days)
+
+
+@cached_response('analytics')
+def _summary(request, days):
+    # Cached below the admin check; invalidated when refresh() rewrites the stats tables
+    return Response(platform_summary(days))
@@ -1,15 +1,32 @@
 from django.contrib import admin
-from .models import Appointment
+from audit.admin import AuditedAdminMixin
+from healthhub.exports import export_action
+from .exports import APPOINTMENT_COLUMNS
+from .models import Appointment, ArchivedAppointment, ArchivedNurseAppointment
 
 
 @admin.register(Appointment)
-class AppointmentAdmin(admin.ModelAdmin):
+class AppointmentAdmin(AuditedAdminMixin, admin.ModelAdmin):
     list_display = ('patient', 'doctor', 'status', 'appointment_date', 'appointment_time', 'created_at')
     list_filter = ('status', 'appointment_date', 'created_at')
     search_fields = ('patient__username', 'doctor__username', 'reason')
     readonly_fields = ('created_at', 'updated_at')
     date_hierarchy = 'appointment_date'
+    actions = [
+        export_action(APPOINTMENT_COLUMNS, 'csv', 'appointments'),
+        export_action(APPOINTMENT_COLUMNS, 'ndjson', 'appointments'),
+    ]
 
 
-
-
+@admin.register(ArchivedAppointment, ArchivedNurseAppointment)
+class ArchivedAppointmentAdmin(admin.ModelAdmin):
+    list_display = ('id', 'patient', 'status', 'starts_at', 'archived_at')
+    list_filter = ('status',)
+    search_fields = ('patient__username', 'reason')
+    date_hierarchy = 'starts_at'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -5,3 +5,6 @@ class AppointmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'appointments'
 
+    def ready(self):
+        from . import rollups
+        rollups.connect()
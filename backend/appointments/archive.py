@@ -0,0 +1,93 @@
+"""
+Hot/cold split for appointment history.
+
+Finished appointments are moved in batches from ``Appointment`` and
+``NurseAppointment`` into their archive tables so the hot tables only hold
+bookings that still matter for scheduling.  Read endpoints fold the archive
+back in when asked with ``?include_archived=1``.
+"""
+import heapq
+from operator import attrgetter, itemgetter
+
+from django.db import transaction
+
+from . import rollups
+from .models import Appointment, ArchivedAppointment, ArchivedNurseAppointment, NurseAppointment
+
+FINISHED_STATUSES = ('completed', 'cancelled')
+
+ARCHIVED_FIELDS = (
+    'id', 'patient_id', 'status', 'appointment_date', 'appointment_time', 'starts_at',
+    'duration_minutes', 'reason', 'notes', 'created_at', 'updated_at',
+)
+
+# hot model -> (archive model, provider field)
+ARCHIVES = {
+    Appointment: (ArchivedAppointment, 'doctor'),
+    NurseAppointment: (ArchivedNurseAppointment, 'nurse'),
+}
+
+
+def wants_archived(request):
+    return request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
+
+def archive_batch(model, cutoff, batch_size):
+    """
+    Move up to ``batch_size`` finished rows that started before ``cutoff``.
+
+    Each batch is its own transaction, so an interrupted run keeps the batches
+    it finished and the next run simply carries on with what is left.
+    Daily rollups are left alone: archived history still counts.
+    Returns the number of rows moved.
+    """
+    archive_model, provider_field = ARCHIVES[model]
+    fields = ARCHIVED_FIELDS + (f'{provider_field}_id',)
+    with transaction.atomic():
+        rows = list(
+            model.objects.filter(status__in=FINISHED_STATUSES, starts_at__lt=cutoff)
+            .order_by('starts_at', 'pk')
+            .values(*fields)[:batch_size]
+        )
+        if not rows:
+            return 0
+        archive_model.objects.bulk_create(
+            [archive_model(**row) for row in rows], ignore_conflicts=True
+        )
+        with rollups.suspended():
+            model.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+    return len(rows)
+
+
+class ArchivedChain:
+    """
+    Read-only sequence of hot and archived rows merged newest first.
+
+    Slicing fetches at most ``stop`` rows from each side, so paginating over
+    it never loads the whole history.
+    """
+
+    def __init__(self, hot, archived, key=attrgetter('starts_at')):
+        self.hot = hot.order_by('-starts_at', '-pk')
+        self.archived = archived.order_by('-starts_at', '-pk')
+        self.key = key
+
+    def values(self, *fields):
+        """The same chain yielding ``values()`` dicts; ``fields`` must include ``starts_at``."""
+        return ArchivedChain(self.hot.values(*fields), self.archived.values(*fields), key=itemgetter('starts_at'))
+
+    def count(self):
+        return self.hot.count() + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return heapq.merge(self.hot.iterator(), self.archived.iterator(), key=self.key, reverse=True)
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        stop = item.stop if item.stop is not None else self.count()
+        merged = heapq.merge(self.hot[:stop], self.archived[:stop], key=self.key, reverse=True)
+        return list(merged)[item]
@@ -0,0 +1,68 @@
+"""
+Overlap detection for doctor and nurse schedules.
+"""
+from datetime import timedelta
+
+from django.db import connections
+from django.db.models import DateTimeField, DurationField, ExpressionWrapper, F, Value
+from django.db.models.functions import Cast
+
+from accounts.models import MAX_APPOINTMENT_MINUTES
+from .models import ACTIVE_STATUSES, appointment_starts_at
+
+DEFAULT_DURATION_MINUTES = 30
+MAX_DURATION_MINUTES = MAX_APPOINTMENT_MINUTES
+
+
+def booking_end(vendor):
+    """``starts_at + duration_minutes`` as a query expression."""
+    if vendor == 'sqlite':
+        # SQLite keeps durations as microseconds and can't multiply them
+        duration = Cast(F('duration_minutes') * 60_000_000, DurationField())
+    else:
+        duration = ExpressionWrapper(F('duration_minutes') * Value(timedelta(minutes=1)),
+                                     output_field=DurationField())
+    return ExpressionWrapper(F('starts_at') + duration, output_field=DateTimeField())
+
+
+def appointment_bounds(appointment_date, appointment_time, duration_minutes):
+    start = appointment_starts_at(appointment_date, appointment_time)
+    return start, start + timedelta(minutes=duration_minutes)
+
+
+def provider_duration(provider):
+    """Default appointment length configured on the doctor's or nurse's profile."""
+    profile_attr = {'doctor': 'doctor_profile', 'nurse': 'nurse_profile'}.get(provider.user_type)
+    profile = getattr(provider, profile_attr, None) if profile_attr else None
+    duration = profile.appointment_duration if profile else DEFAULT_DURATION_MINUTES
+    # Profiles saved before the limit existed may be longer
+    return min(duration, MAX_DURATION_MINUTES)
+
+
+def overlapping(model, provider_field, provider, start, end, exclude_pk=None):
+    """
+    A provider's active bookings overlapping ``[start, end)``.
+
+    No booking is longer than ``MAX_DURATION_MINUTES``, so only bookings starting
+    in ``(start - MAX_DURATION_MINUTES, end)`` can overlap; that bounds the scan
+    of the (provider, starts_at) index, and their ends are compared in the same
+    query.
+    """
+    rows = model.objects.filter(
+        **{provider_field: provider},
+        starts_at__gt=start - timedelta(minutes=MAX_DURATION_MINUTES),
+        starts_at__lt=end,
+        status__in=ACTIVE_STATUSES,
+    )
+    rows = rows.alias(ends_at=booking_end(connections[rows.db].vendor)).filter(ends_at__gt=start)
+    if exclude_pk is not None:
+        rows = rows.exclude(pk=exclude_pk)
+    return rows
+
+
+def find_conflict(model, provider_field, provider, appointment_date, appointment_time,
+                  duration_minutes, exclude_pk=None):
+    """Return the pk of an active booking overlapping the requested slot, or ``None``."""
+    start, end = appointment_bounds(appointment_date, appointment_time, duration_minutes)
+    rows = overlapping(model, provider_field, provider, start, end, exclude_pk=exclude_pk)
+    return rows.order_by().values_list('pk', flat=True).first()
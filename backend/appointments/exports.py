@@ -0,0 +1,38 @@
+"""Column layouts for appointment exports (see ``healthhub.exports``)."""
+from .models import Appointment, ArchivedAppointment, ArchivedNurseAppointment, NurseAppointment
+
+
+def appointment_columns(provider_field):
+    columns = [
+        ('id', 'id'),
+        ('patient_id', 'patient_id'),
+        ('patient_username', 'patient__username'),
+        ('patient_email', 'patient__email'),
+        (f'{provider_field}_id', f'{provider_field}_id'),
+        (f'{provider_field}_username', f'{provider_field}__username'),
+    ]
+    if provider_field == 'doctor':
+        columns.append(('specialist', 'doctor__doctor_profile__specialist'))
+    columns += [
+        ('location', f'{provider_field}__{provider_field}_profile__location'),
+        ('status', 'status'),
+        ('appointment_date', 'appointment_date'),
+        ('appointment_time', 'appointment_time'),
+        ('starts_at', 'starts_at'),
+        ('duration_minutes', 'duration_minutes'),
+        ('reason', 'reason'),
+        ('notes', 'notes'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ]
+    return columns
+
+
+APPOINTMENT_COLUMNS = appointment_columns('doctor')
+NURSE_APPOINTMENT_COLUMNS = appointment_columns('nurse')
+
+# export name -> (hot model, archive model, columns)
+APPOINTMENT_EXPORTS = {
+    'appointments': (Appointment, ArchivedAppointment, APPOINTMENT_COLUMNS),
+    'nurse-appointments': (NurseAppointment, ArchivedNurseAppointment, NURSE_APPOINTMENT_COLUMNS),
+}
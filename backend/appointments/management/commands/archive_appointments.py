@@ -0,0 +1,68 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from appointments.archive import ARCHIVES, archive_batch
+
+
+class Command(BaseCommand):
+    help = "Move completed and cancelled appointments older than a cutoff into the archive tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=settings.APPOINTMENT_ARCHIVE_AFTER_DAYS,
+            help="Archive finished appointments that started more than this many days ago",
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--max-batches', type=int, default=None,
+            help="Stop after this many batches per table; rerun to resume",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        for model, (_, provider_field) in ARCHIVES.items():
+            name = model._meta.verbose_name_plural
+            busiest = self.busiest_provider(model, provider_field)
+            rows_before, latency_before = self.measure(model, provider_field, busiest)
+
+            moved = batches = 0
+            started = time.perf_counter()
+            while options['max_batches'] is None or batches < options['max_batches']:
+                count = archive_batch(model, cutoff, options['batch_size'])
+                if not count:
+                    break
+                moved += count
+                batches += 1
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"  {name}: moved {moved} rows")
+            elapsed = time.perf_counter() - started
+
+            rows_after, latency_after = self.measure(model, provider_field, busiest)
+            self.stdout.write(self.style.SUCCESS(
+                f"{name}: archived {moved} rows in {batches} batches ({elapsed:.1f}s); "
+                f"hot table {rows_before} -> {rows_after} rows; "
+                f"busiest provider listing {latency_before * 1000:.1f}ms -> {latency_after * 1000:.1f}ms"
+            ))
+
+    def busiest_provider(self, model, provider_field):
+        return (
+            model.objects.values(provider_field)
+            .annotate(total=Count('id'))
+            .order_by('-total')
+            .values_list(provider_field, flat=True)
+            .first()
+        )
+
+    def measure(self, model, provider_field, busiest):
+        """Hot-table row count and the time to list the busiest provider's appointments."""
+        rows = model.objects.count()
+        if busiest is None:
+            return rows, 0.0
+        started = time.perf_counter()
+        list(model.objects.filter(**{provider_field: busiest}).values_list('id', 'status', 'starts_at'))
+        return rows, time.perf_counter() - started
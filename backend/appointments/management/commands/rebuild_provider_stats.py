@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from appointments.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-provider daily appointment rollups from scratch"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--provider', type=int, help="Only rebuild this provider's (user id) rollups")
+
+    def handle(self, *args, **options):
+        written = rebuild(provider_id=options['provider'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup rows"))
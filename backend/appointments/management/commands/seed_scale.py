@@ -0,0 +1,86 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from analytics.materialize import refresh
+from appointments.rollups import rebuild
+from healthhub.seeding import DEFAULT_PASSWORD, Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generate a deterministic synthetic dataset (patients, providers, hospitals, appointments) "
+        "for load tests and benchmarks"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=10000)
+        parser.add_argument('--doctors', type=int, default=500)
+        parser.add_argument('--nurses', type=int, default=200)
+        parser.add_argument('--hospitals', type=int, default=100)
+        parser.add_argument('--appointments', type=int, default=100000, help="Doctor appointments")
+        parser.add_argument('--nurse-appointments', type=int, help="Defaults to a fifth of --appointments")
+        parser.add_argument('--seed', type=int, default=42, help="Same seed, volumes and anchor give the same rows")
+        parser.add_argument('--anchor', help="Date (YYYY-MM-DD) treated as today; defaults to the current date")
+        parser.add_argument('--days-back', type=int, default=365, help="History spanned by appointments")
+        parser.add_argument('--days-ahead', type=int, default=60, help="Future bookings spanned by appointments")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per transaction")
+        parser.add_argument('--prefix', default='seed', help="Username prefix of generated accounts")
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help="Password shared by all generated accounts")
+        parser.add_argument('--skip-stats', action='store_true',
+                            help="Skip rebuilding dashboard rollups and platform statistics afterwards")
+        parser.add_argument('--json', metavar='PATH', help="Also write row counts and timings to PATH")
+
+    def handle(self, *args, **options):
+        anchor = None
+        if options['anchor']:
+            anchor = parse_date(options['anchor'])
+            if anchor is None:
+                raise CommandError("--anchor must be a YYYY-MM-DD date")
+        nurse_appointments = options['nurse_appointments']
+        if nurse_appointments is None:
+            nurse_appointments = options['appointments'] // 5
+
+        seeder = Seeder(
+            patients=options['patients'],
+            doctors=options['doctors'],
+            nurses=options['nurses'],
+            hospitals=options['hospitals'],
+            appointments=options['appointments'],
+            nurse_appointments=nurse_appointments,
+            seed=options['seed'],
+            anchor=anchor,
+            days_back=options['days_back'],
+            days_ahead=options['days_ahead'],
+            batch_size=options['batch_size'],
+            prefix=options['prefix'],
+            password=options['password'],
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+        if seeder.exists():
+            raise CommandError(
+                f"Accounts prefixed '{options['prefix']}_' already exist; use another --prefix or a fresh database"
+            )
+
+        started = time.monotonic()
+        stats = seeder.run()
+        for name, table in stats.items():
+            self.stdout.write(f"{name}: {table['rows']} rows in {table['seconds']}s "
+                              f"({table['rows_per_second'] or 0} rows/s)")
+
+        if not options['skip_stats']:
+            rollup_started = time.monotonic()
+            rollups = rebuild()
+            platform = refresh(full=True)
+            stats['derived'] = {'provider_rollups': rollups, 'platform_stats': platform,
+                                'seconds': round(time.monotonic() - rollup_started, 2)}
+            self.stdout.write(f"Rebuilt {rollups} provider rollups and platform statistics "
+                              f"in {stats['derived']['seconds']}s")
+
+        if options['json']:
+            with open(options['json'], 'w') as report:
+                json.dump({'seed': options['seed'], 'anchor': seeder.anchor.isoformat(), 'tables': stats},
+                          report, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Seeded dataset in {time.monotonic() - started:.1f}s"))
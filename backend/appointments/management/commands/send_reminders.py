@@ -0,0 +1,46 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from appointments.reminders import get_backend, queue_due_reminders, send_due_reminders
+
+
+class Command(BaseCommand):
+    help = "Queue 24h and 1h reminders for approved appointments for run_tasks, once or in a polling loop"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of running a single pass")
+        parser.add_argument('--interval', type=int, default=60, help="Seconds between passes with --loop")
+        parser.add_argument(
+            '--lookback-minutes', type=int, default=15,
+            help="Also send reminders that became due this many minutes ago (covers worker downtime)",
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--inline', action='store_true',
+                            help="Send the reminders from this process instead of queueing them")
+        parser.add_argument('--workers', type=int, default=settings.REMINDER_WORKERS,
+                            help="Sending threads with --inline")
+
+    def handle(self, *args, **options):
+        backend = get_backend() if options['inline'] else None
+        lookback = timedelta(minutes=options['lookback_minutes'])
+        while True:
+            started = time.monotonic()
+            if options['inline']:
+                count = send_due_reminders(
+                    lookback=lookback,
+                    batch_size=options['batch_size'],
+                    workers=options['workers'],
+                    backend=backend,
+                )
+            else:
+                count = queue_due_reminders(lookback=lookback, batch_size=options['batch_size'])
+            elapsed = time.monotonic() - started
+            if count or options['verbosity'] > 1:
+                verb = 'Sent' if options['inline'] else 'Queued'
+                self.stdout.write(f"{verb} {count} reminders in {elapsed:.2f}s")
+            if not options['loop']:
+                return
+            time.sleep(max(0, options['interval'] - elapsed))
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:44
+
+from datetime import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+BATCH_SIZE = 2000
+
+
+def backfill_starts_at(apps, schema_editor):
+    tz = timezone.get_default_timezone()
+    for model_name in ('Appointment', 'NurseAppointment'):
+        model = apps.get_model('appointments', model_name)
+        last_pk = 0
+        while True:
+            batch = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'appointment_date', 'appointment_time')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            for row in batch:
+                row.starts_at = timezone.make_aware(
+                    datetime.combine(row.appointment_date, row.appointment_time), tz
+                )
+            model.objects.bulk_update(batch, ['starts_at'])
+            last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0003_appointment_duration'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='appointment',
+            options={'ordering': ['-starts_at']},
+        ),
+        migrations.AlterModelOptions(
+            name='nurseappointment',
+            options={'ordering': ['-starts_at']},
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='starts_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='nurseappointment',
+            name='starts_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_starts_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='appointment',
+            name='starts_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='nurseappointment',
+            name='starts_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', 'starts_at'], name='appointment_doctor__60bd67_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', 'starts_at'], name='appointment_patient_c89bba_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nurseappointment',
+            index=models.Index(fields=['nurse', 'starts_at'], name='appointment_nurse_i_c38a46_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nurseappointment',
+            index=models.Index(fields=['patient', 'starts_at'], name='appointment_patient_57019f_idx'),
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('appointments', '0004_starts_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAppointment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('cancelled', 'Cancelled'), ('completed', 'Completed')], max_length=10)),
+                ('appointment_date', models.DateField()),
+                ('appointment_time', models.TimeField()),
+                ('starts_at', models.DateTimeField()),
+                ('duration_minutes', models.PositiveSmallIntegerField(default=30)),
+                ('reason', models.TextField(blank=True)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-starts_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedNurseAppointment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('cancelled', 'Cancelled'), ('completed', 'Completed')], max_length=10)),
+                ('appointment_date', models.DateField()),
+                ('appointment_time', models.TimeField()),
+                ('starts_at', models.DateTimeField()),
+                ('duration_minutes', models.PositiveSmallIntegerField(default=30)),
+                ('reason', models.TextField(blank=True)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-starts_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', 'starts_at'], name='appointment_status_b30a74_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nurseappointment',
+            index=models.Index(fields=['status', 'starts_at'], name='appointment_status_eb17dd_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivednurseappointment',
+            name='nurse',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivednurseappointment',
+            name='patient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedappointment',
+            name='doctor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedappointment',
+            name='patient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archivednurseappointment',
+            index=models.Index(fields=['nurse', 'starts_at'], name='appointment_nurse_i_542c57_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivednurseappointment',
+            index=models.Index(fields=['patient', 'starts_at'], name='appointment_patient_7bd2d2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedappointment',
+            index=models.Index(fields=['doctor', 'starts_at'], name='appointment_doctor__f923ca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedappointment',
+            index=models.Index(fields=['patient', 'starts_at'], name='appointment_patient_8f5cef_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0005_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('appointment', 'Appointment'), ('nurse_appointment', 'Nurse Appointment')], max_length=20)),
+                ('appointment_id', models.BigIntegerField()),
+                ('lead', models.CharField(help_text='How long before the start the reminder was for, e.g. 24h', max_length=8)),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('kind', 'appointment_id', 'lead')},
+            },
+        ),
+    ]
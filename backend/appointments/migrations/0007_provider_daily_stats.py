@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('appointments', '0006_sent_reminder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProviderDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('cancelled', 'Cancelled'), ('completed', 'Completed')], max_length=10)),
+                ('count', models.IntegerField(default=0)),
+                ('minutes', models.IntegerField(default=0)),
+                ('provider', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'provider daily stats',
+                'unique_together': {('provider', 'day', 'status')},
+            },
+        ),
+    ]
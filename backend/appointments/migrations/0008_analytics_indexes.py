@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0007_provider_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['created_at'], name='appointment_created_5f1d98_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['updated_at'], name='appointment_updated_6cefcf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedappointment',
+            index=models.Index(fields=['created_at'], name='appointment_created_52031c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivednurseappointment',
+            index=models.Index(fields=['created_at'], name='appointment_created_dee960_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nurseappointment',
+            index=models.Index(fields=['created_at'], name='appointment_created_edb57c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nurseappointment',
+            index=models.Index(fields=['updated_at'], name='appointment_updated_0bb4da_idx'),
+        ),
+    ]
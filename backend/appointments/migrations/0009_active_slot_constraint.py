@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0008_analytics_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='appointment',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='nurseappointment',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ('pending', 'approved'))), fields=('doctor', 'appointment_date', 'appointment_time'), name='unique_active_doctor_slot'),
+        ),
+        migrations.AddConstraint(
+            model_name='nurseappointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ('pending', 'approved'))), fields=('nurse', 'appointment_date', 'appointment_time'), name='unique_active_nurse_slot'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:03
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0009_active_slot_constraint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='appointment',
+            name='duration_minutes',
+            field=models.PositiveSmallIntegerField(default=30, validators=[django.core.validators.MaxValueValidator(1440)]),
+        ),
+        migrations.AlterField(
+            model_name='nurseappointment',
+            name='duration_minutes',
+            field=models.PositiveSmallIntegerField(default=30, validators=[django.core.validators.MaxValueValidator(1440)]),
+        ),
+    ]
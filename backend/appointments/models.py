@@ -1,8 +1,42 @@
-from django.db import models
+from datetime import datetime
+
+from django.core.validators import MaxValueValidator
+from django.db import models, router, transaction
 from django.conf import settings
+from django.utils import timezone
+
+from accounts.models import MAX_APPOINTMENT_MINUTES
+
+# Bookings that hold their slot
+ACTIVE_STATUSES = ('pending', 'approved')
+
+
+def appointment_starts_at(appointment_date, appointment_time):
+    """Timezone-aware start of a booking whose date/time are wall-clock values in TIME_ZONE."""
+    return timezone.make_aware(datetime.combine(appointment_date, appointment_time),
+                               timezone.get_default_timezone())
+
 
+class StartsAtMixin:
+    """
+    Keeps the indexed ``starts_at`` column in sync with the date/time fields.
 
-class Appointment(models.Model):
+    Saves run in a transaction, so the rollup deltas applied by the
+    ``post_save`` handlers in ``appointments.rollups`` commit or roll back
+    together with the row (deletes already do).
+    """
+
+    def save(self, *args, **kwargs):
+        self.starts_at = appointment_starts_at(self.appointment_date, self.appointment_time)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'appointment_date', 'appointment_time'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'starts_at'}
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+class Appointment(StartsAtMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('approved', 'Approved'),
@@ -15,20 +49,34 @@ class Appointment(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     appointment_date = models.DateField()
     appointment_time = models.TimeField()
+    starts_at = models.DateTimeField(editable=False)
+    duration_minutes = models.PositiveSmallIntegerField(default=30, validators=[MaxValueValidator(MAX_APPOINTMENT_MINUTES)])
     reason = models.TextField(blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-created_at']
-        unique_together = ['doctor', 'appointment_date', 'appointment_time']
+        ordering = ['-starts_at']
+        constraints = [
+            # Cancelled and completed bookings free the slot for a new one
+            models.UniqueConstraint(fields=['doctor', 'appointment_date', 'appointment_time'],
+                                    condition=models.Q(status__in=ACTIVE_STATUSES),
+                                    name='unique_active_doctor_slot'),
+        ]
+        indexes = [
+            models.Index(fields=['doctor', 'starts_at']),
+            models.Index(fields=['patient', 'starts_at']),
+            models.Index(fields=['status', 'starts_at']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         return f"{self.patient.username} - {self.doctor.username} on {self.appointment_date} at {self.appointment_time}"
 
 
-class NurseAppointment(models.Model):
+class NurseAppointment(StartsAtMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('approved', 'Approved'),
@@ -41,15 +89,120 @@ class NurseAppointment(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     appointment_date = models.DateField()
     appointment_time = models.TimeField()
+    starts_at = models.DateTimeField(editable=False)
+    duration_minutes = models.PositiveSmallIntegerField(default=30, validators=[MaxValueValidator(MAX_APPOINTMENT_MINUTES)])
     reason = models.TextField(blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-created_at']
-        unique_together = ['nurse', 'appointment_date', 'appointment_time']
+        ordering = ['-starts_at']
+        constraints = [
+            # Cancelled and completed bookings free the slot for a new one
+            models.UniqueConstraint(fields=['nurse', 'appointment_date', 'appointment_time'],
+                                    condition=models.Q(status__in=ACTIVE_STATUSES),
+                                    name='unique_active_nurse_slot'),
+        ]
+        indexes = [
+            models.Index(fields=['nurse', 'starts_at']),
+            models.Index(fields=['patient', 'starts_at']),
+            models.Index(fields=['status', 'starts_at']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         return f"{self.patient.username} - {self.nurse.username} on {self.appointment_date} at {self.appointment_time}"
 
+
+
+class ArchivedAppointment(models.Model):
+    """Completed or cancelled ``Appointment`` moved out of the hot table by ``archive_appointments``."""
+    id = models.BigIntegerField(primary_key=True)
+    patient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    doctor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=10, choices=Appointment.STATUS_CHOICES)
+    appointment_date = models.DateField()
+    appointment_time = models.TimeField()
+    starts_at = models.DateTimeField()
+    duration_minutes = models.PositiveSmallIntegerField(default=30)
+    reason = models.TextField(blank=True)
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-starts_at']
+        indexes = [
+            models.Index(fields=['doctor', 'starts_at']),
+            models.Index(fields=['patient', 'starts_at']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.patient.username} - {self.doctor.username} on {self.appointment_date} at {self.appointment_time} (archived)"
+
+
+class ArchivedNurseAppointment(models.Model):
+    """Completed or cancelled ``NurseAppointment`` moved out of the hot table by ``archive_appointments``."""
+    id = models.BigIntegerField(primary_key=True)
+    patient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    nurse = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=10, choices=NurseAppointment.STATUS_CHOICES)
+    appointment_date = models.DateField()
+    appointment_time = models.TimeField()
+    starts_at = models.DateTimeField()
+    duration_minutes = models.PositiveSmallIntegerField(default=30)
+    reason = models.TextField(blank=True)
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-starts_at']
+        indexes = [
+            models.Index(fields=['nurse', 'starts_at']),
+            models.Index(fields=['patient', 'starts_at']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.patient.username} - {self.nurse.username} on {self.appointment_date} at {self.appointment_time} (archived)"
+
+
+class SentReminder(models.Model):
+    """Ledger of reminders already sent, so each booking gets each reminder once."""
+    KIND_CHOICES = [
+        ('appointment', 'Appointment'),
+        ('nurse_appointment', 'Nurse Appointment'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    appointment_id = models.BigIntegerField()
+    lead = models.CharField(max_length=8, help_text="How long before the start the reminder was for, e.g. 24h")
+    sent_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['kind', 'appointment_id', 'lead']
+    
+    def __str__(self):
+        return f"{self.lead} reminder for {self.kind} #{self.appointment_id}"
+
+
+class ProviderDailyStats(models.Model):
+    """Appointment count and booked minutes per provider, day and status, kept up to date by appointments/rollups.py."""
+    provider = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    status = models.CharField(max_length=10, choices=Appointment.STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+    minutes = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['provider', 'day', 'status']
+        verbose_name_plural = 'provider daily stats'
+    
+    def __str__(self):
+        return f"{self.provider_id} {self.day} {self.status}: {self.count}"
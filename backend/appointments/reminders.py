@@ -0,0 +1,199 @@
+"""
+Appointment reminders.
+
+``send_reminders`` scans approved appointments whose reminder time has just
+arrived and skips the ones already in the ``SentReminder`` ledger.  The rest
+are queued as ``appointments.tasks.send_reminder`` tasks, ledger rows and
+tasks in one transaction, and ``run_tasks`` delivers them through the backend
+named by ``REMINDER_BACKEND``, retrying failures with backoff.  With
+``--inline`` they are sent right away on a bounded thread pool instead.
+"""
+import json
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Appointment, NurseAppointment, SentReminder
+
+logger = logging.getLogger(__name__)
+
+REMINDER_LEADS = {
+    '24h': timedelta(hours=24),
+    '1h': timedelta(hours=1),
+}
+
+# ledger kind -> (model, provider field)
+REMINDER_SOURCES = {
+    'appointment': (Appointment, 'doctor'),
+    'nurse_appointment': (NurseAppointment, 'nurse'),
+}
+
+
+@dataclass(frozen=True)
+class Reminder:
+    kind: str
+    appointment_id: int
+    lead: str
+    starts_at: datetime
+    patient_username: str
+    patient_email: str
+    provider_username: str
+
+
+class BaseReminderBackend:
+    def send(self, reminder):
+        raise NotImplementedError
+
+    def message(self, reminder):
+        when = timezone.localtime(reminder.starts_at).strftime('%Y-%m-%d %H:%M')
+        return f"Reminder: your appointment with {reminder.provider_username} starts at {when}."
+
+
+class ConsoleReminderBackend(BaseReminderBackend):
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def send(self, reminder):
+        with self._lock:
+            self.stream.write(f"[{reminder.lead}] to {reminder.patient_username}: {self.message(reminder)}\n")
+            self.stream.flush()
+
+
+class FileReminderBackend(BaseReminderBackend):
+    """Appends one JSON line per reminder to ``REMINDER_FILE_PATH``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def send(self, reminder):
+        record = asdict(reminder)
+        record['starts_at'] = reminder.starts_at.isoformat()
+        record['message'] = self.message(reminder)
+        line = json.dumps(record) + '\n'
+        with self._lock, open(settings.REMINDER_FILE_PATH, 'a', encoding='utf-8') as handle:
+            handle.write(line)
+
+
+class EmailReminderBackend(BaseReminderBackend):
+    """Sends through Django's ``EMAIL_BACKEND``, e.g. a local SMTP debugging server."""
+
+    def send(self, reminder):
+        if not reminder.patient_email:
+            return
+        send_mail('Appointment reminder', self.message(reminder), None, [reminder.patient_email])
+
+
+def get_backend():
+    return import_string(settings.REMINDER_BACKEND)()
+
+
+def due_reminders(kind, lead, now, lookback, batch_size):
+    """
+    Yield batches of approved appointments whose ``lead`` reminder is due.
+
+    A reminder is due once ``now`` passes ``starts_at - lead``; only bookings
+    that became due within ``lookback`` are considered, so each pass reads a
+    narrow ``(status, starts_at)`` index range, walked in keyset order.
+    """
+    model, provider_field = REMINDER_SOURCES[kind]
+    window_end = now + REMINDER_LEADS[lead]
+    window_start = max(now, window_end - lookback)
+    rows = (
+        model.objects
+        .filter(status='approved', starts_at__gt=window_start, starts_at__lte=window_end)
+        .order_by('starts_at', 'id')
+        .values_list('id', 'starts_at', 'patient__username', 'patient__email', f'{provider_field}__username')
+    )
+    last = None
+    while True:
+        page = rows
+        if last is not None:
+            page = rows.filter(Q(starts_at__gt=last[1]) | Q(starts_at=last[1], id__gt=last[0]))
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+        yield [Reminder(kind, pk, lead, starts_at, patient, email, provider)
+               for pk, starts_at, patient, email, provider in batch]
+        last = batch[-1]
+
+
+def _unsent(kind, lead, batch):
+    already_sent = set(
+        SentReminder.objects
+        .filter(kind=kind, lead=lead, appointment_id__in=[r.appointment_id for r in batch])
+        .values_list('appointment_id', flat=True)
+    )
+    return [r for r in batch if r.appointment_id not in already_sent]
+
+
+def queue_due_reminders(now=None, lookback=timedelta(minutes=15), batch_size=500):
+    """Queue a ``send_reminder`` task for every due reminder not yet in the ledger; returns the number queued."""
+    from .tasks import send_reminder
+
+    now = now or timezone.now()
+    queued = 0
+    for kind in REMINDER_SOURCES:
+        for lead in REMINDER_LEADS:
+            for batch in due_reminders(kind, lead, now, lookback, batch_size):
+                pending = _unsent(kind, lead, batch)
+                with transaction.atomic():
+                    SentReminder.objects.bulk_create(
+                        [SentReminder(kind=kind, appointment_id=r.appointment_id, lead=lead) for r in pending],
+                        ignore_conflicts=True,
+                    )
+                    for reminder in pending:
+                        send_reminder.delay(kind, reminder.appointment_id, lead)
+                queued += len(pending)
+    return queued
+
+
+def send_due_reminders(now=None, lookback=timedelta(minutes=15), batch_size=500, workers=None, backend=None):
+    """Send every due reminder not yet in the ledger right away; returns the number sent."""
+    now = now or timezone.now()
+    backend = backend or get_backend()
+    sent = 0
+    with ThreadPoolExecutor(max_workers=workers or settings.REMINDER_WORKERS) as pool:
+        for kind in REMINDER_SOURCES:
+            for lead in REMINDER_LEADS:
+                for batch in due_reminders(kind, lead, now, lookback, batch_size):
+                    pending = _unsent(kind, lead, batch)
+                    delivered = [r for r, ok in zip(pending, pool.map(lambda r: _deliver(backend, r), pending)) if ok]
+                    SentReminder.objects.bulk_create(
+                        [SentReminder(kind=kind, appointment_id=r.appointment_id, lead=lead) for r in delivered],
+                        ignore_conflicts=True,
+                    )
+                    sent += len(delivered)
+    return sent
+
+
+def load_reminder(kind, appointment_id, lead):
+    """The ``Reminder`` for a booking, or ``None`` if it is gone or no longer approved."""
+    model, provider_field = REMINDER_SOURCES[kind]
+    row = (
+        model.objects
+        .filter(pk=appointment_id, status='approved')
+        .values_list('starts_at', 'patient__username', 'patient__email', f'{provider_field}__username')
+        .first()
+    )
+    return Reminder(kind, appointment_id, lead, *row) if row else None
+
+
+def _deliver(backend, reminder):
+    try:
+        backend.send(reminder)
+        return True
+    except Exception as exc:
+        logger.warning("Failed to send %s reminder for %s #%s: %s",
+                       reminder.lead, reminder.kind, reminder.appointment_id, exc)
+        return False
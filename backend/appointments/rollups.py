@@ -0,0 +1,165 @@
+"""
+Incrementally maintained per-provider daily appointment counts.
+
+Signal handlers adjust ``ProviderDailyStats`` whenever an appointment is
+created, changes provider/day/status/duration, or is deleted, so dashboards
+read a handful of rollup rows instead of aggregating the provider's history.
+Deltas are applied in the writer's transaction (appointment saves and
+deletes are atomic), so a rolled-back write leaves the rollups untouched.
+Writes that bypass signals (``bulk_create``, ``QuerySet.update``) must be
+followed by ``manage.py rebuild_provider_stats``.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .models import (
+    Appointment, ArchivedAppointment, ArchivedNurseAppointment, NurseAppointment, ProviderDailyStats,
+)
+
+# model -> provider field
+PROVIDER_FIELDS = {
+    Appointment: 'doctor',
+    NurseAppointment: 'nurse',
+}
+
+_state = threading.local()
+
+
+@contextmanager
+def suspended():
+    """Leave rollups untouched, e.g. while archiving rows whose history must stay counted."""
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def _is_suspended():
+    return getattr(_state, 'suspended', False)
+
+
+def rollup_key(instance):
+    provider_field = PROVIDER_FIELDS[type(instance)]
+    return (getattr(instance, f'{provider_field}_id'), instance.appointment_date,
+            instance.status, instance.duration_minutes)
+
+
+def apply_delta(provider_id, day, status, count, minutes):
+    updated = ProviderDailyStats.objects.filter(provider_id=provider_id, day=day, status=status).update(
+        count=F('count') + count, minutes=F('minutes') + minutes
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            ProviderDailyStats.objects.create(
+                provider_id=provider_id, day=day, status=status, count=count, minutes=minutes
+            )
+    except IntegrityError:
+        # Another writer created the row first
+        apply_delta(provider_id, day, status, count, minutes)
+
+
+def _remember_previous(sender, instance, **kwargs):
+    instance._rollup_previous = None
+    if instance.pk is None or instance._state.adding or _is_suspended():
+        return
+    provider_field = PROVIDER_FIELDS[sender]
+    row = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list(f'{provider_field}_id', 'appointment_date', 'status', 'duration_minutes')
+        .first()
+    )
+    instance._rollup_previous = row
+
+
+def _on_save(sender, instance, created, **kwargs):
+    if _is_suspended():
+        return
+    current = rollup_key(instance)
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous == current:
+        return
+    if previous is not None:
+        provider_id, day, status, duration = previous
+        apply_delta(provider_id, day, status, -1, -duration)
+    provider_id, day, status, duration = current
+    apply_delta(provider_id, day, status, 1, duration)
+
+
+def _on_delete(sender, instance, **kwargs):
+    if _is_suspended():
+        return
+    provider_id, day, status, duration = rollup_key(instance)
+    apply_delta(provider_id, day, status, -1, -duration)
+
+
+def connect():
+    for model in PROVIDER_FIELDS:
+        pre_save.connect(_remember_previous, sender=model, dispatch_uid=f'rollup_pre_save_{model.__name__}')
+        post_save.connect(_on_save, sender=model, dispatch_uid=f'rollup_post_save_{model.__name__}')
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=f'rollup_post_delete_{model.__name__}')
+
+
+def _lock_rollups():
+    """Hold back every other rollup delta until the current transaction ends."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            # Conflicts with the row locks of UPDATE/INSERT but still lets dashboards read
+            cursor.execute(f'LOCK TABLE {ProviderDailyStats._meta.db_table} IN SHARE ROW EXCLUSIVE MODE')
+    # SQLite has a single writer: the delete below takes the database write lock for the rest of the rebuild
+
+
+def _totals(provider_id):
+    sources = (
+        (Appointment, 'doctor'),
+        (ArchivedAppointment, 'doctor'),
+        (NurseAppointment, 'nurse'),
+        (ArchivedNurseAppointment, 'nurse'),
+    )
+    totals = {}
+    for model, provider_field in sources:
+        rows = model.objects.all()
+        if provider_id is not None:
+            rows = rows.filter(**{provider_field: provider_id})
+        grouped = (
+            rows.values_list(provider_field, 'appointment_date', 'status')
+            .annotate(count=Count('id'), minutes=Sum('duration_minutes'))
+            .order_by()
+        )
+        for provider, day, status, count, minutes in grouped.iterator():
+            key = (provider, day, status)
+            previous_count, previous_minutes = totals.get(key, (0, 0))
+            totals[key] = (previous_count + count, previous_minutes + minutes)
+    return totals
+
+
+def rebuild(provider_id=None):
+    """
+    Recompute rollups from the hot and archive tables; returns the number of rollup rows written.
+
+    Concurrent deltas wait for the rebuild, and the appointments are read
+    after the lock is taken: a write committed earlier is in the totals, and
+    one still in flight applies its delta on top of them.
+    """
+    with transaction.atomic():
+        _lock_rollups()
+        stale = ProviderDailyStats.objects.all()
+        if provider_id is not None:
+            stale = stale.filter(provider_id=provider_id)
+        stale.delete()
+        totals = _totals(provider_id)
+        ProviderDailyStats.objects.bulk_create(
+            [
+                ProviderDailyStats(provider_id=provider, day=day, status=status, count=count, minutes=minutes)
+                for (provider, day, status), (count, minutes) in totals.items()
+            ],
+            batch_size=1000,
+        )
+    return len(totals)
@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Appointment, NurseAppointment
+from .availability import MAX_DURATION_MINUTES, find_conflict, provider_duration
 from accounts.serializers import UserSerializer
+from healthhub.fastserializers import FastSerializer
 
 User = get_user_model()
 
@@ -15,9 +17,10 @@ class AppointmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Appointment
         fields = ('id', 'patient', 'doctor', 'patient_id', 'doctor_id', 'status', 
-                 'appointment_date', 'appointment_time', 'reason', 'notes', 
+                 'appointment_date', 'appointment_time', 'starts_at', 'duration_minutes', 'reason', 'notes', 
                  'created_at', 'updated_at')
-        read_only_fields = ('id', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'starts_at', 'created_at', 'updated_at')
+        extra_kwargs = {'duration_minutes': {'min_value': 1, 'max_value': MAX_DURATION_MINUTES}}
     
     def validate(self, attrs):
         patient_id = attrs.get('patient_id')
@@ -43,26 +46,25 @@ class AppointmentSerializer(serializers.ModelSerializer):
             except User.DoesNotExist:
                 raise serializers.ValidationError("Invalid doctor ID")
         
-        # Check for conflicting appointments
+        # Check for overlapping appointments
         appointment_date = attrs.get('appointment_date')
         appointment_time = attrs.get('appointment_time')
         
         if doctor_id and appointment_date and appointment_time:
-            try:
-                doctor = User.objects.get(id=doctor_id, user_type='doctor')
-                if Appointment.objects.filter(
-                    doctor=doctor,
-                    appointment_date=appointment_date,
-                    appointment_time=appointment_time,
-                    status__in=['pending', 'approved']
-                ).exists():
-                    raise serializers.ValidationError("Doctor already has an appointment at this time")
-            except User.DoesNotExist:
-                raise serializers.ValidationError("Doctor not found")
+            doctor = attrs['doctor']
+            if 'duration_minutes' not in attrs:
+                attrs['duration_minutes'] = provider_duration(doctor)
+            if find_conflict(Appointment, 'doctor', doctor, appointment_date, appointment_time,
+                             attrs['duration_minutes']) is not None:
+                raise serializers.ValidationError("Doctor already has an appointment at this time")
         
         return attrs
 
 
+class FastAppointmentSerializer(FastSerializer):
+    serializer_class = AppointmentSerializer
+
+
 class AppointmentUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Appointment
@@ -83,9 +85,10 @@ class NurseAppointmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = NurseAppointment
         fields = ('id', 'patient', 'nurse', 'patient_id', 'nurse_id', 'status', 
-                 'appointment_date', 'appointment_time', 'reason', 'notes', 
+                 'appointment_date', 'appointment_time', 'starts_at', 'duration_minutes', 'reason', 'notes', 
                  'created_at', 'updated_at')
-        read_only_fields = ('id', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'starts_at', 'created_at', 'updated_at')
+        extra_kwargs = {'duration_minutes': {'min_value': 1, 'max_value': MAX_DURATION_MINUTES}}
     
     def validate(self, attrs):
         from django.contrib.auth import get_user_model
@@ -108,20 +111,19 @@ class NurseAppointmentSerializer(serializers.ModelSerializer):
         appointment_date = attrs.get('appointment_date')
         appointment_time = attrs.get('appointment_time')
         if nurse_id and appointment_date and appointment_time:
-            try:
-                nurse = User.objects.get(id=nurse_id, user_type='nurse')
-                if NurseAppointment.objects.filter(
-                    nurse=nurse,
-                    appointment_date=appointment_date,
-                    appointment_time=appointment_time,
-                    status__in=['pending', 'approved']
-                ).exists():
-                    raise serializers.ValidationError("Nurse already has an appointment at this time")
-            except User.DoesNotExist:
-                raise serializers.ValidationError("Nurse not found")
+            nurse = attrs['nurse']
+            if 'duration_minutes' not in attrs:
+                attrs['duration_minutes'] = provider_duration(nurse)
+            if find_conflict(NurseAppointment, 'nurse', nurse, appointment_date, appointment_time,
+                             attrs['duration_minutes']) is not None:
+                raise serializers.ValidationError("Nurse already has an appointment at this time")
         return attrs
 
 
+class FastNurseAppointmentSerializer(FastSerializer):
+    serializer_class = NurseAppointmentSerializer
+
+
 class NurseAppointmentUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = NurseAppointment
@@ -0,0 +1,19 @@
+from functools import cache
+
+from taskqueue.queue import task
+
+from .reminders import get_backend, load_reminder
+
+
+@cache
+def reminder_backend():
+    # One instance per worker process, so its lock covers every worker thread
+    return get_backend()
+
+
+@task
+def send_reminder(kind, appointment_id, lead):
+    """Deliver one queued reminder; failures are retried by the task queue."""
+    reminder = load_reminder(kind, appointment_id, lead)
+    if reminder is not None:
+        reminder_backend().send(reminder)
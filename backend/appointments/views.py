@@ -1,27 +1,95 @@
 from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django.contrib.auth import get_user_model
-from .models import Appointment, NurseAppointment
-from .serializers import AppointmentSerializer, AppointmentUpdateSerializer, NurseAppointmentSerializer, NurseAppointmentUpdateSerializer
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.conf import settings
+from datetime import timedelta
+from django.utils.decorators import method_decorator
+from audit.buffer import record_changes, snapshot
+from healthhub.exports import EXPORT_FORMATS, EXPORT_RENDERERS, streaming_export
+from healthhub.fastserializers import FastListMixin
+from healthhub.idempotency import idempotent
+from .models import Appointment, NurseAppointment, ProviderDailyStats
+from .archive import ARCHIVES, ArchivedChain, wants_archived
+from .exports import APPOINTMENT_EXPORTS
+from .serializers import (
+    AppointmentSerializer, AppointmentUpdateSerializer, NurseAppointmentSerializer, NurseAppointmentUpdateSerializer,
+    FastAppointmentSerializer, FastNurseAppointmentSerializer
+)
 
 User = get_user_model()
 
+AUDITED_FIELDS = ('status', 'notes')
 
-class AppointmentListCreateView(generics.ListCreateAPIView):
+
+def filter_by_start(queryset, params):
+    """
+    Narrow appointments to the ``starts_after``/``starts_before`` ISO datetimes in ``params``.
+
+    Both bounds hit the (provider, starts_at) and (patient, starts_at) indexes.
+    """
+    for param, lookup in (('starts_after', 'starts_at__gte'), ('starts_before', 'starts_at__lt')):
+        value = params.get(param)
+        if not value:
+            continue
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValidationError({param: 'Enter a valid ISO 8601 datetime.'})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        queryset = queryset.filter(**{lookup: parsed})
+    return queryset
+
+
+def scoped_appointments(model, provider_field, user):
+    """Rows of ``model`` visible to ``user``: their own as patient or provider, everything for admins."""
+    if user.user_type == 'patient':
+        return model.objects.filter(patient=user)
+    elif user.user_type == provider_field:
+        return model.objects.filter(**{provider_field: user})
+    elif user.user_type == 'admin':
+        return model.objects.all()
+    return model.objects.none()
+
+
+def with_archived(queryset, request):
+    """Fold the matching archive rows into ``queryset`` when ``?include_archived=1`` is set."""
+    if not wants_archived(request):
+        return queryset
+    archive_model, provider_field = ARCHIVES[queryset.model]
+    archived = scoped_appointments(archive_model, provider_field, request.user)
+    return ArchivedChain(queryset, filter_by_start(archived, request.query_params))
+
+
+class AuditedUpdateMixin:
+    """Records status/notes changes made through the detail view in the audit trail."""
+
+    def perform_update(self, serializer):
+        before = snapshot(serializer.instance, AUDITED_FIELDS)
+        serializer.save()
+        record_changes(serializer.instance, before, self.request.user)
+
+
+class IncludeArchivedMixin(FastListMixin):
+    """List appointments from the hot table, plus the archive on ``?include_archived=1``."""
+
+    def list_rows(self):
+        return with_archived(super().list_rows(), self.request)
+
+
+@method_decorator(idempotent, name='create')
+class AppointmentListCreateView(IncludeArchivedMixin, generics.ListCreateAPIView):
     serializer_class = AppointmentSerializer
+    fast_serializer_class = FastAppointmentSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        user = self.request.user
-        if user.user_type == 'patient':
-            return Appointment.objects.filter(patient=user)
-        elif user.user_type == 'doctor':
-            return Appointment.objects.filter(doctor=user)
-        elif user.user_type == 'admin':
-            return Appointment.objects.all()
-        return Appointment.objects.none()
+        queryset = scoped_appointments(Appointment, 'doctor', self.request.user)
+        return filter_by_start(queryset, self.request.query_params)
     
     def perform_create(self, serializer):
         print("Creating appointment with data:", serializer.validated_data)
@@ -32,7 +100,7 @@ class AppointmentListCreateView(generics.ListCreateAPIView):
             serializer.save()
 
 
-class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AppointmentDetailView(AuditedUpdateMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated]
     
@@ -65,8 +133,9 @@ def my_appointments(request):
     elif user.user_type == 'admin':
         appointments = Appointment.objects.all()
     
-    serializer = AppointmentSerializer(appointments, many=True)
-    return Response(serializer.data)
+    appointments = filter_by_start(appointments, request.query_params)
+    appointments = with_archived(appointments, request)
+    return Response(FastAppointmentSerializer(appointments).data)
 
 
 @api_view(['PATCH'])
@@ -85,7 +154,9 @@ def update_appointment_status(request, pk):
         
         serializer = AppointmentUpdateSerializer(appointment, data=request.data, partial=True)
         if serializer.is_valid():
+            before = snapshot(appointment, AUDITED_FIELDS)
             serializer.save()
+            record_changes(appointment, before, request.user)
             return Response(AppointmentSerializer(appointment).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -93,19 +164,15 @@ def update_appointment_status(request, pk):
         return Response({'error': 'Appointment not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
-class NurseAppointmentListCreateView(generics.ListCreateAPIView):
+@method_decorator(idempotent, name='create')
+class NurseAppointmentListCreateView(IncludeArchivedMixin, generics.ListCreateAPIView):
     serializer_class = NurseAppointmentSerializer
+    fast_serializer_class = FastNurseAppointmentSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        user = self.request.user
-        if user.user_type == 'patient':
-            return NurseAppointment.objects.filter(patient=user)
-        elif user.user_type == 'nurse':
-            return NurseAppointment.objects.filter(nurse=user)
-        elif user.user_type == 'admin':
-            return NurseAppointment.objects.all()
-        return NurseAppointment.objects.none()
+        queryset = scoped_appointments(NurseAppointment, 'nurse', self.request.user)
+        return filter_by_start(queryset, self.request.query_params)
     
     def perform_create(self, serializer):
         if self.request.user.user_type == 'patient':
@@ -114,7 +181,7 @@ class NurseAppointmentListCreateView(generics.ListCreateAPIView):
             serializer.save()
 
 
-class NurseAppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class NurseAppointmentDetailView(AuditedUpdateMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = NurseAppointmentSerializer
     permission_classes = [IsAuthenticated]
     
@@ -145,8 +212,9 @@ def my_nurse_appointments(request):
         appointments = NurseAppointment.objects.filter(nurse=user)
     elif user.user_type == 'admin':
         appointments = NurseAppointment.objects.all()
-    serializer = NurseAppointmentSerializer(appointments, many=True)
-    return Response(serializer.data)
+    appointments = filter_by_start(appointments, request.query_params)
+    appointments = with_archived(appointments, request)
+    return Response(FastNurseAppointmentSerializer(appointments).data)
 
 
 @api_view(['PATCH'])
@@ -162,8 +230,116 @@ def update_nurse_appointment_status(request, pk):
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         serializer = NurseAppointmentUpdateSerializer(appointment, data=request.data, partial=True)
         if serializer.is_valid():
+            before = snapshot(appointment, AUDITED_FIELDS)
             serializer.save()
+            record_changes(appointment, before, request.user)
             return Response(NurseAppointmentSerializer(appointment).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     except NurseAppointment.DoesNotExist:
         return Response({'error': 'Appointment not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
+DASHBOARD_MAX_DAYS = 366
+UTILIZED_STATUSES = ('approved', 'completed')
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def provider_dashboard(request):
+    """
+    Workload of a doctor or nurse, read only from the daily rollups.
+
+    Returns per-day counts by status between ``start`` and ``end`` (dates,
+    default: the last four weeks and the next two) and weekly utilization:
+    approved and completed minutes over PROVIDER_WEEKLY_CAPACITY_MINUTES.
+    Admins pass ``provider_id``.
+    """
+    user = request.user
+    if user.user_type in ['doctor', 'nurse']:
+        provider_id = user.pk
+    elif user.user_type == 'admin' and request.query_params.get('provider_id', '').isdigit():
+        provider_id = int(request.query_params['provider_id'])
+    else:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    today = timezone.localdate()
+    start = parse_date(request.query_params.get('start', '')) or today - timedelta(days=27)
+    end = parse_date(request.query_params.get('end', '')) or today + timedelta(days=14)
+    if end < start or (end - start).days >= DASHBOARD_MAX_DAYS:
+        return Response({'error': f'start/end must span 1 to {DASHBOARD_MAX_DAYS} days'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
+    statuses = [choice for choice, _ in Appointment.STATUS_CHOICES]
+    days = {}
+    day = start
+    while day <= end:
+        days[day] = dict.fromkeys(statuses, 0)
+        day += timedelta(days=1)
+    weeks = {}
+    
+    rollups = ProviderDailyStats.objects.filter(provider_id=provider_id, day__range=(start, end))
+    for day, row_status, count, minutes in rollups.values_list('day', 'status', 'count', 'minutes'):
+        days[day][row_status] = count
+        week_start = day - timedelta(days=day.weekday())
+        if row_status in UTILIZED_STATUSES:
+            weeks[week_start] = weeks.get(week_start, 0) + minutes
+    
+    capacity = settings.PROVIDER_WEEKLY_CAPACITY_MINUTES
+    week_start = start - timedelta(days=start.weekday())
+    utilization = []
+    while week_start <= end:
+        booked = weeks.get(week_start, 0)
+        utilization.append({
+            'week_start': week_start,
+            'booked_minutes': booked,
+            'capacity_minutes': capacity,
+            'utilization': round(booked / capacity, 4) if capacity else None,
+        })
+        week_start += timedelta(days=7)
+    
+    return Response({
+        'provider_id': provider_id,
+        'start': start,
+        'end': end,
+        'days': [{'day': day, **counts} for day, counts in days.items()],
+        'weeks': utilization,
+    })
+
+
+def _export(request, name, fmt):
+    if request.user.user_type != 'admin' and not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    if fmt not in EXPORT_FORMATS:
+        return Response({'error': f"Unsupported format; use one of {', '.join(EXPORT_FORMATS)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    model, archive_model, columns = APPOINTMENT_EXPORTS[name]
+    querysets = [model.objects.all()]
+    if wants_archived(request):
+        querysets.append(archive_model.objects.all())
+    status_filter = request.query_params.get('status')
+    querysets = [
+        filter_by_start(queryset.filter(status=status_filter) if status_filter else queryset, request.query_params)
+        .order_by('starts_at', 'pk')
+        for queryset in querysets
+    ]
+    return streaming_export(querysets, columns, fmt, name)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes(EXPORT_RENDERERS)
+def export_appointments(request, fmt):
+    """
+    Stream every doctor appointment as CSV or NDJSON (admins only).
+
+    Accepts ``status``, ``starts_after``/``starts_before`` and ``include_archived``.
+    """
+    return _export(request, 'appointments', fmt)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes(EXPORT_RENDERERS)
+def export_nurse_appointments(request, fmt):
+    """Nurse appointment counterpart of ``export_appointments``."""
+    return _export(request, 'nurse-appointments', fmt)
@@ -0,0 +1,53 @@
+from django.contrib import admin
+from django.core.exceptions import FieldDoesNotExist
+from .buffer import record_changes, snapshot
+from .models import AuditEvent
+
+
+@admin.register(AuditEvent)
+class AuditEventAdmin(admin.ModelAdmin):
+    list_display = ('model_label', 'object_id', 'field', 'old_value', 'new_value', 'actor', 'created_at')
+    list_filter = ('model_label', 'field')
+    search_fields = ('actor__username',)
+    date_hierarchy = 'created_at'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class AuditedAdminMixin:
+    """
+    Records admin edits of existing objects in the audit trail.
+
+    The edited fields are read from the database before ``save_model`` and
+    compared once ``save_related`` has also saved the many-to-many fields.
+    """
+    audit_exclude = ('password', 'last_login')
+    
+    def audited_fields(self, form):
+        fields = []
+        for name in form.changed_data:
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if name not in self.audit_exclude and field.concrete:
+                fields.append(name)
+        return fields
+    
+    def save_model(self, request, obj, form, change):
+        fields = self.audited_fields(form) if change else []
+        if fields:
+            # ``obj`` already holds the submitted values
+            stored = self.model._default_manager.get(pk=obj.pk)
+            form._audit_before = snapshot(stored, fields)
+        super().save_model(request, obj, form, change)
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        before = getattr(form, '_audit_before', None)
+        if before:
+            record_changes(form.instance, before, request.user)
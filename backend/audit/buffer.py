@@ -0,0 +1,135 @@
+"""
+Buffered audit trail.
+
+Write paths call ``record_changes`` with a snapshot taken before the change.
+Events are only appended to an in-process buffer there; a background thread
+writes them with one ``bulk_create`` when ``AUDIT_FLUSH_SIZE`` events are
+waiting or ``AUDIT_FLUSH_INTERVAL`` seconds have passed, and once more when
+the process exits.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+
+def field_value(instance, name):
+    """The stored value of a model field: the pk of a foreign key, sorted pks of a many-to-many."""
+    field = instance._meta.get_field(name)
+    if field.many_to_many:
+        return sorted(related.pk for related in field.value_from_object(instance))
+    return field.value_from_object(instance)
+
+
+def snapshot(instance, fields):
+    return {field: field_value(instance, field) for field in fields}
+
+
+class AuditBuffer:
+    def __init__(self, flush_size=None, flush_interval=None, retries=None):
+        self.flush_size = flush_size or settings.AUDIT_FLUSH_SIZE
+        self.flush_interval = flush_interval or settings.AUDIT_FLUSH_INTERVAL
+        self.retries = retries or settings.AUDIT_FLUSH_RETRIES
+        self._events = []
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add(self, events):
+        with self._lock:
+            self._events.extend(events)
+            pending = len(self._events)
+            if self._thread is None:
+                self._start()
+        if pending >= self.flush_size:
+            self._wakeup.set()
+
+    def flush(self, final=False):
+        """
+        Write the buffered events; returns the number written.
+
+        A failed write (the database is down or locked) puts the events back
+        in front of the buffer for the next flush.  After ``retries`` failures
+        in a row, or on the last flush at exit, they are inserted one by one,
+        and only events that still fail on their own are dropped.
+        """
+        with self._lock:
+            events, self._events = self._events, []
+            failures = self._failures
+        if not events:
+            return 0
+        try:
+            AuditEvent.objects.bulk_create(events, batch_size=500)
+        except Exception as exc:
+            if not final and failures + 1 < self.retries:
+                logger.warning("Audit flush of %s events failed (attempt %s), retrying: %s",
+                               len(events), failures + 1, exc)
+                with self._lock:
+                    self._events[:0] = events
+                    self._failures += 1
+                return 0
+            written = self._insert_each(events)
+        else:
+            written = len(events)
+        with self._lock:
+            self._failures = 0
+        return written
+
+    def _insert_each(self, events):
+        written = 0
+        for event in events:
+            try:
+                AuditEvent.objects.bulk_create([event])
+            except Exception:
+                logger.exception("Dropping audit event %s #%s %s: %r -> %r", event.model_label, event.object_id,
+                                 event.field, event.old_value, event.new_value)
+            else:
+                written += 1
+        return written
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='audit-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush, final=True)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            close_old_connections()
+
+
+buffer = AuditBuffer()
+
+
+def record_changes(instance, before, actor=None):
+    """Queue one ``AuditEvent`` per field of ``before`` whose value on ``instance`` changed."""
+    now = timezone.now()
+    label = instance._meta.label_lower
+    actor_id = actor.pk if actor is not None and actor.is_authenticated else None
+    after = snapshot(instance, before)
+    events = [
+        AuditEvent(
+            model_label=label,
+            object_id=instance.pk,
+            actor_id=actor_id,
+            field=field,
+            old_value='' if old is None else str(old),
+            new_value='' if after[field] is None else str(after[field]),
+            created_at=now,
+        )
+        for field, old in before.items()
+        if after[field] != old
+    ]
+    if events:
+        buffer.add(events)
+    return len(events)
@@ -0,0 +1,24 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+
+class AuditEvent(models.Model):
+    model_label = models.CharField(max_length=100, help_text="app_label.model_name of the changed object")
+    object_id = models.BigIntegerField()
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    field = models.CharField(max_length=50)
+    old_value = models.TextField(blank=True)
+    new_value = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now, help_text="When the change happened, not when it was flushed")
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['model_label', 'object_id', 'created_at']),
+            models.Index(fields=['actor', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.model_label}#{self.object_id} {self.field}: {self.old_value!r} -> {self.new_value!r}"
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+from .models import AuditEvent
+
+
+class AuditEventSerializer(serializers.ModelSerializer):
+    actor_username = serializers.CharField(source='actor.username', read_only=True, default=None)
+    
+    class Meta:
+        model = AuditEvent
+        fields = ('id', 'model_label', 'object_id', 'actor', 'actor_username', 'field',
+                  'old_value', 'new_value', 'created_at')
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('events/', views.AuditEventListView.as_view(), name='audit_events'),
+]
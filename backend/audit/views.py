@@ -0,0 +1,41 @@
+from rest_framework import generics
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from django.utils.dateparse import parse_datetime
+from .buffer import buffer
+from .models import AuditEvent
+from .serializers import AuditEventSerializer
+
+
+class AuditEventListView(generics.ListAPIView):
+    """
+    Audit trail for admins, newest first.
+
+    Filters: ``model`` (e.g. ``appointments.appointment``) with optional
+    ``object_id``, ``actor`` (user id), and ``since``/``until`` ISO datetimes.
+    """
+    serializer_class = AuditEventSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        user = self.request.user
+        if user.user_type != 'admin' and not user.is_staff:
+            raise PermissionDenied('Permission denied')
+        # Make this process's own pending events visible before querying
+        buffer.flush()
+        
+        params = self.request.query_params
+        queryset = AuditEvent.objects.select_related('actor')
+        if params.get('model'):
+            queryset = queryset.filter(model_label=params['model'])
+            if params.get('object_id'):
+                queryset = queryset.filter(object_id=params['object_id'])
+        if params.get('actor'):
+            queryset = queryset.filter(actor_id=params['actor'])
+        for param, lookup in (('since', 'created_at__gte'), ('until', 'created_at__lt')):
+            if params.get(param):
+                value = parse_datetime(params[param])
+                if value is None:
+                    raise ValidationError({param: 'Enter a valid ISO 8601 datetime.'})
+                queryset = queryset.filter(**{lookup: value})
+        return queryset
@@ -0,0 +1,60 @@
+"""
+Write-path overhead of the buffered audit trail.
+
+Times ``PATCH /api/appointments/<id>/update-status/`` with auditing on and
+with ``record_changes`` stubbed out, interleaving the two so drift affects
+both equally.
+"""
+from benchmarks.common import measure, parser, report, setup_django, summarize
+
+
+def main():
+    arg_parser = parser(__doc__)
+    arg_parser.add_argument('--requests', type=int, default=2000)
+    arg_parser.add_argument('--rounds', type=int, default=10)
+    args = arg_parser.parse_args()
+    setup_django()
+
+    import datetime
+    from rest_framework.test import APIClient
+    from accounts.models import User
+    from appointments import views
+    from appointments.models import Appointment
+    from audit.buffer import buffer
+
+    doctor = User.objects.create_user('bench_doctor', 'doctor@bench.local', 'x', user_type='doctor')
+    patient = User.objects.create_user('bench_patient', 'patient@bench.local', 'x', user_type='patient')
+    appointment = Appointment.objects.create(
+        patient=patient, doctor=doctor,
+        appointment_date=datetime.date(2030, 1, 1), appointment_time=datetime.time(9, 0),
+    )
+    client = APIClient()
+    client.force_authenticate(doctor)
+    url = f'/api/appointments/{appointment.pk}/update-status/'
+    toggle = {'status': 'approved'}
+
+    def patch():
+        toggle['status'] = 'pending' if toggle['status'] == 'approved' else 'approved'
+        client.patch(url, {'status': toggle['status']}, format='json')
+
+    audited, plain = [], []
+    real_record = views.record_changes
+    for _ in range(args.rounds):
+        views.record_changes = real_record
+        audited += measure(patch, args.requests // args.rounds)
+        views.record_changes = lambda *a, **kw: 0
+        plain += measure(patch, args.requests // args.rounds)
+    views.record_changes = real_record
+    buffer.flush()
+
+    audited_stats, plain_stats = summarize(audited), summarize(plain)
+    overhead = (audited_stats['mean_us'] - plain_stats['mean_us']) / plain_stats['mean_us'] * 100
+    report('audit_overhead', {
+        'with_audit': audited_stats,
+        'without_audit': plain_stats,
+        'overhead_percent': round(overhead, 2),
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
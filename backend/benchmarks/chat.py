@@ -0,0 +1,115 @@
+"""
+Chat endpoint against a local mock of the completion API.
+
+Sends concurrent ``POST /api/chat/`` requests through Django's ASGI handler
+(``django.test.AsyncClient``) to ``benchmarks.mock_llm`` and reports, for
+each phase, requests/sec, latency, how many replies fell back to the
+placeholder, and the client's counters (``healthhub.llm.stats()``):
+
+* ``healthy``: the upstream answers after ``--latency`` seconds; the mock's
+  connection count shows the pooled client reusing connections;
+* ``outage``: the upstream hangs past ``LLM_TIMEOUT``; the first calls time
+  out, then the circuit breaker opens and replies come back immediately;
+* ``recovered``: the upstream is healthy again and ``LLM_BREAKER_RESET`` has
+  passed, so the trial call closes the breaker.
+"""
+import asyncio
+import os
+import time
+
+from benchmarks.common import fail, parser, report, setup_django, summarize
+from benchmarks.mock_llm import MockLLMServer
+
+PLACEHOLDER = "This is an AI response placeholder"
+
+
+async def run_phase(client, headers, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    samples, placeholders, statuses = [], 0, {}
+
+    async def one(index):
+        nonlocal placeholders
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post('/api/chat/', {'message': f'Question {index}'},
+                                         content_type='application/json', headers=headers)
+            samples.append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code == 200 and response.json()['reply'] == PLACEHOLDER:
+            placeholders += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': requests,
+        'statuses': statuses,
+        'placeholder_replies': placeholders,
+        'requests_per_s': round(requests / elapsed, 1),
+        'latency': summarize(samples),
+    }
+
+
+def main():
+    arg_parser = parser(__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--requests', type=int, default=300, help="Requests per phase")
+    arg_parser.add_argument('--concurrency', type=int, default=50, help="Requests in flight")
+    arg_parser.add_argument('--latency', type=float, default=0.2, help="Seconds the mock upstream takes to reply")
+    args = arg_parser.parse_args()
+
+    mock = MockLLMServer(latency=args.latency).start()
+    os.environ.update({
+        'AI_CHAT_ENABLED': 'True',
+        'OPENAI_API_KEY': 'mock',
+        'OPENAI_BASE_URL': mock.base_url,
+    })
+    os.environ.setdefault('LLM_TIMEOUT', str(max(1.0, args.latency * 5)))
+    os.environ.setdefault('LLM_BREAKER_RESET', '2')
+    setup_django()
+
+    from django.conf import settings
+    from django.test import AsyncClient
+    from accounts.authentication import RoleRefreshToken
+    from accounts.models import User
+    from healthhub import llm
+
+    user = User.objects.create_user('bench_chat', 'bench_chat@example.com', 'bench-pass-123', user_type='patient')
+    headers = {'Authorization': f'Bearer {RoleRefreshToken.for_user(user).access_token}'}
+    client = AsyncClient()
+
+    async def run():
+        results = {}
+        # Warm up the client and its connections
+        await run_phase(client, headers, min(args.concurrency, args.requests), args.concurrency)
+        await llm.reset()
+        calls, connections = mock.calls, mock.connections
+        results['healthy'] = await run_phase(client, headers, args.requests, args.concurrency)
+        results['healthy']['upstream_calls'] = mock.calls - calls
+        results['healthy']['upstream_connections'] = mock.connections - connections
+        results['healthy']['client'] = await llm.stats()
+
+        mock.latency = settings.LLM_TIMEOUT + 5
+        await llm.reset()
+        results['outage'] = await run_phase(client, headers, args.requests, args.concurrency)
+        results['outage']['client'] = await llm.stats()
+
+        mock.latency = args.latency
+        await asyncio.sleep(settings.LLM_BREAKER_RESET)
+        results['recovered'] = await run_phase(client, headers, args.requests, args.concurrency)
+        results['recovered']['client'] = await llm.stats()
+        return results
+
+    results = asyncio.run(run())
+    if results['healthy']['placeholder_replies']:
+        fail(f"{results['healthy']['placeholder_replies']} healthy requests fell back to the placeholder")
+    report('chat', {
+        'settings': {name: getattr(settings, name) for name in (
+            'LLM_TIMEOUT', 'LLM_MAX_CONCURRENCY', 'LLM_QUEUE_TIMEOUT', 'LLM_BREAKER_FAILURES', 'LLM_BREAKER_RESET')},
+        'upstream_latency_s': args.latency,
+        'concurrency': args.concurrency,
+        **results,
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Chat reply cache: latency of cached and uncached questions, and hit rates.
+
+Sends ``POST /api/chat/`` to a local mock of the completion API
+(``benchmarks.mock_llm``, answering after ``--latency`` seconds) and reports
+the latency of uncached and cached replies, the cost of computing a cache
+key, and for a traffic mix where ``--faq-share`` of the messages are common
+questions (skewed towards the first ones, reworded, re-cased and
+re-punctuated), the hit rate and upstream calls with exact and with fuzzy
+(``CHAT_CACHE_FUZZY``) matching.
+"""
+import os
+import random
+import string
+import time
+
+from benchmarks.common import fail, measure, parser, report, setup_django, summarize
+from benchmarks.mock_llm import MockLLMServer
+
+# Phrasings of each common question
+FAQS = [
+    ('What does a cardiologist do?', 'what do cardiologists do', 'What does a cardiologist do'),
+    ('How do I book an appointment?', 'how to book an appointment', 'How can I book appointments?'),
+    ('What are the symptoms of flu?', 'symptoms of the flu', 'What are flu symptoms?'),
+    ('When should I see a neurologist?', 'when should I see a neurologist'),
+    ('How can I cancel an appointment?', 'how do I cancel appointments'),
+    ('What is a dermatologist?', 'what is a dermatologist'),
+    ('Which hospitals have a heart surgery unit?', 'which hospitals have heart surgery units'),
+    ('How much does a consultation cost?', 'how much does a consultation cost'),
+    ('What vaccines do children need?', 'what vaccines do children need'),
+    ('How do I reset my password?', 'how to reset password'),
+]
+
+
+def vary(phrase, rng):
+    """The phrase as a user might type it: different case, spacing and punctuation."""
+    words = phrase.rstrip('?').split()
+    case = rng.choice((str.lower, str.capitalize, str.upper, lambda word: word))
+    return '  '.join(case(word) for word in words) if rng.random() < 0.2 else \
+        ' '.join(case(word) for word in words) + rng.choice(('', '?', '??', ' ?', '!'))
+
+
+def one_off(rng):
+    """A question nobody else asks (no digits, which would bypass the cache)."""
+    return 'Is ' + ' '.join(''.join(rng.choices(string.ascii_lowercase, k=8)) for _ in range(3)) + ' contagious?'
+
+
+def traffic(count, faq_share, rng):
+    weights = [1 / rank for rank in range(1, len(FAQS) + 1)]
+    for _ in range(count):
+        if rng.random() < faq_share:
+            yield vary(rng.choice(rng.choices(FAQS, weights)[0]), rng)
+        else:
+            yield one_off(rng)
+
+
+def main():
+    arg_parser = parser(__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--requests', type=int, default=500, help="Messages in the traffic mix")
+    arg_parser.add_argument('--faq-share', type=float, default=0.6, help="Share of common questions in the mix")
+    arg_parser.add_argument('--latency', type=float, default=0.1, help="Seconds the mock upstream takes to reply")
+    arg_parser.add_argument('--repeat', type=int, default=30, help="Requests per latency measurement")
+    args = arg_parser.parse_args()
+
+    mock = MockLLMServer(latency=args.latency).start()
+    os.environ.update({
+        'AI_CHAT_ENABLED': 'True',
+        'OPENAI_API_KEY': 'mock',
+        'OPENAI_BASE_URL': mock.base_url,
+    })
+    setup_django()
+
+    from django.conf import settings
+    from rest_framework.test import APIClient
+    from accounts.authentication import RoleRefreshToken
+    from accounts.models import User
+    from healthhub import chatcache
+
+    user = User.objects.create_user('bench_chat', 'bench_chat@example.com', 'bench-pass-123', user_type='patient')
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RoleRefreshToken.for_user(user).access_token}')
+    rng = random.Random(0)
+
+    def chat(message):
+        response = client.post('/api/chat/', {'message': message}, format='json')
+        if response.status_code != 200 or not response.json()['reply'].startswith('Mock reply'):
+            fail(f"Unexpected reply to {message!r}: {response.status_code} {response.content[:200]}")
+
+    uncached = measure(lambda: chat(one_off(rng)), args.repeat, warmup=3)
+    chat(FAQS[0][0])
+    cached = measure(lambda: chat(vary(FAQS[0][0], rng)), args.repeat, warmup=3)
+    variants = [vary(phrase, rng) for phrases in FAQS for phrase in phrases]
+    keys = iter(variants * (2000 // len(variants) + 2))
+    key_cost = measure(lambda: chatcache.cache_key(next(keys)), 2000)
+
+    mixes = {}
+    for fuzzy in (False, True):
+        settings.CHAT_CACHE_FUZZY = fuzzy
+        chatcache.replies.clear()
+        chatcache.replies.hits = chatcache.replies.misses = 0
+        calls, bypassed = mock.calls, chatcache.stats()['bypassed']
+        samples = []
+        for message in traffic(args.requests, args.faq_share, random.Random(1)):
+            started = time.perf_counter()
+            chat(message)
+            samples.append(time.perf_counter() - started)
+        mixes['fuzzy' if fuzzy else 'exact'] = {
+            'cache': {**chatcache.stats(), 'bypassed': chatcache.stats()['bypassed'] - bypassed},
+            'upstream_calls': mock.calls - calls,
+            'latency': summarize(samples),
+        }
+
+    report('chat_cache', {
+        'upstream_latency_s': args.latency,
+        'uncached': summarize(uncached),
+        'cached': summarize(cached),
+        'cache_key': summarize(key_cost),
+        'traffic': {'requests': args.requests, 'faq_share': args.faq_share, **mixes},
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Chat intent router: latency of directory questions answered from the database.
+
+Sends ``POST /api/chat/`` for directory questions ("find an eye specialist
+in Sylhet") and general ones, the upstream being a local mock of the
+completion API (``benchmarks.mock_llm``, answering after ``--latency``
+seconds), against ``--doctors`` doctors, a tenth as many nurses and
+``--hospitals`` hospitals.  It reports the latency of routed and of model
+replies, the cost of matching a message, and for a traffic mix where
+``--directory-share`` of the messages are directory questions, the share
+routed and the upstream calls with and without the router
+(``CHAT_ROUTER_ENABLED``).
+"""
+import os
+import random
+import time
+
+from benchmarks.common import fail, measure, parser, report, setup_django, summarize
+from benchmarks.mock_llm import MockLLMServer
+
+DIRECTORY = [
+    'find an eye specialist in Sylhet',
+    'Which cardiologists are available in Dhaka?',
+    'any nurses in chattogram?',
+    'I need a skin doctor near Khulna',
+    'which hospitals do bypass surgery abroad',
+    'Show me hospitals for knee replacement in Bangladesh',
+    'recommend a child specialist',
+    'find a neurologist in Rajshahi',
+]
+GENERAL = [
+    'What does a cardiologist do?',
+    'How do I book an appointment?',
+    'Is bypass surgery risky?',
+    'What are the symptoms of flu?',
+    'Which doctor should I see for a headache?',
+    'How much sleep do teenagers need?',
+]
+
+
+def seed(doctors, hospitals, rng):
+    from django.contrib.auth.hashers import make_password
+    from accounts.models import Doctor, Nurse, User
+    from hospitals.models import Hospital
+
+    password = make_password('bench-pass-123')
+    users = User.objects.bulk_create(
+        User(username=f'bench_staff_{index}', email=f'bench_staff_{index}@example.com', password=password,
+             first_name='Bench', last_name=str(index), user_type='doctor' if index < doctors else 'nurse')
+        for index in range(doctors + doctors // 10))
+    specialists = [value for value, _ in Doctor.SPECIALIST_CHOICES]
+    locations = [value for value, _ in Doctor.LOCATION_CHOICES]
+    Doctor.objects.bulk_create(
+        Doctor(user=user, specialist=rng.choice(specialists), location=rng.choice(locations),
+               experience_years=rng.randrange(30), consultation_fee=rng.randrange(300, 2000))
+        for user in users[:doctors])
+    Nurse.objects.bulk_create(
+        Nurse(user=user, location=rng.choice(locations), experience_years=rng.randrange(20),
+              consultation_fee=rng.randrange(200, 800))
+        for user in users[doctors:])
+    surgery_types = [value for value, _ in Hospital.SURGERY_TYPE_CHOICES]
+    Hospital.objects.bulk_create(
+        Hospital(name=f'Bench Hospital {index}', country=rng.choice(('bangladesh', 'abroad')),
+                 city=rng.choice(('Dhaka', 'Sylhet', 'Chennai', 'Bangkok')), address='Bench Road',
+                 surgery_types=rng.sample(surgery_types, 3), rating=round(rng.uniform(3, 5), 1))
+        for index in range(hospitals))
+
+
+def main():
+    arg_parser = parser(__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--doctors', type=int, default=2000, help="Doctors to create")
+    arg_parser.add_argument('--hospitals', type=int, default=200, help="Hospitals to create")
+    arg_parser.add_argument('--requests', type=int, default=300, help="Messages in the traffic mix")
+    arg_parser.add_argument('--directory-share', type=float, default=0.4,
+                            help="Share of directory questions in the mix")
+    arg_parser.add_argument('--latency', type=float, default=0.1, help="Seconds the mock upstream takes to reply")
+    arg_parser.add_argument('--repeat', type=int, default=30, help="Requests per latency measurement")
+    args = arg_parser.parse_args()
+
+    mock = MockLLMServer(latency=args.latency).start()
+    os.environ.update({
+        'AI_CHAT_ENABLED': 'True',
+        'OPENAI_API_KEY': 'mock',
+        'OPENAI_BASE_URL': mock.base_url,
+        # Every question reaches the model or the router
+        'CHAT_CACHE_SIZE': '0',
+    })
+    setup_django()
+
+    from django.conf import settings
+    from rest_framework.test import APIClient
+    from accounts.authentication import RoleRefreshToken
+    from accounts.models import User
+    from healthhub import intents
+
+    rng = random.Random(0)
+    seed(args.doctors, args.hospitals, rng)
+    user = User.objects.create_user('bench_chat', 'bench_chat@example.com', 'bench-pass-123', user_type='patient')
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RoleRefreshToken.for_user(user).access_token}')
+
+    def chat(message, routed):
+        response = client.post('/api/chat/', {'message': message}, format='json')
+        if response.status_code != 200 or ('intent' in response.json()) != routed:
+            fail(f"Unexpected reply to {message!r}: {response.status_code} {response.content[:200]}")
+
+    for message in DIRECTORY:
+        chat(message, routed=True)
+    directory = iter(DIRECTORY * (args.repeat // len(DIRECTORY) + 2))
+    general = iter(GENERAL * (args.repeat // len(GENERAL) + 2))
+    routed = measure(lambda: chat(next(directory), routed=True), args.repeat, warmup=3)
+    upstream = measure(lambda: chat(next(general), routed=False), args.repeat, warmup=3)
+    messages = iter((DIRECTORY + GENERAL) * (5000 // len(DIRECTORY + GENERAL) + 2))
+    match_cost = measure(lambda: intents.match(next(messages)), 5000)
+
+    mixes = {}
+    for enabled in (False, True):
+        settings.CHAT_ROUTER_ENABLED = enabled
+        intents.router_stats.reset()
+        calls = mock.calls
+        mix_rng = random.Random(1)
+        samples = []
+        for _ in range(args.requests):
+            is_directory = mix_rng.random() < args.directory_share
+            message = mix_rng.choice(DIRECTORY if is_directory else GENERAL)
+            started = time.perf_counter()
+            chat(message, routed=enabled and is_directory)
+            samples.append(time.perf_counter() - started)
+        mixes['router' if enabled else 'no_router'] = {
+            'router': intents.stats() if enabled else None,
+            'upstream_calls': mock.calls - calls,
+            'latency': summarize(samples),
+        }
+
+    report('chat_router', {
+        'upstream_latency_s': args.latency,
+        'rows': {'doctors': args.doctors, 'nurses': args.doctors // 10, 'hospitals': args.hospitals},
+        'routed': summarize(routed),
+        'upstream': summarize(upstream),
+        'match': summarize(match_cost),
+        'traffic': {'requests': args.requests, 'directory_share': args.directory_share, **mixes},
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
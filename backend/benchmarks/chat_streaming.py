@@ -0,0 +1,165 @@
+"""
+Time to first byte of streamed chat replies, against a local mock of the completion API.
+
+Calls ``healthhub.asgi.application`` in-process with concurrent
+``POST /api/chat/`` requests, the upstream being ``benchmarks.mock_llm``
+generating ``--tokens`` words, one every ``--token-interval`` seconds after
+``--latency``.  For the buffered JSON reply and for the SSE and NDJSON
+streams it reports time to the first body byte and to the end of the
+response.  A last phase disconnects clients after ``--disconnect-after``
+frames and checks that their upstream streams are cancelled too.
+"""
+import asyncio
+import json
+import os
+import time
+
+from benchmarks.common import fail, parser, report, setup_django, summarize
+from benchmarks.mock_llm import MockLLMServer
+
+ACCEPT = {
+    'buffered': 'application/json',
+    'sse': 'text/event-stream',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def parse_frames(body, media_type):
+    if media_type == 'text/event-stream':
+        return [json.loads(event[len('data: '):]) for event in body.decode().split('\n\n') if event]
+    return [json.loads(line) for line in body.decode().splitlines()]
+
+
+async def post(app, token, message, accept, disconnect_after=None):
+    """One request through the ASGI app: (status, seconds to first body byte, seconds to end, body)."""
+    body = json.dumps({'message': message}).encode()
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST', 'scheme': 'http',
+        'path': '/api/chat/', 'raw_path': b'/api/chat/', 'query_string': b'', 'root_path': '',
+        'headers': [(b'content-type', b'application/json'), (b'accept', accept.encode()),
+                    (b'authorization', f'Bearer {token}'.encode()), (b'content-length', str(len(body)).encode())],
+        'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+    }
+    disconnected = asyncio.Event()
+    received = False
+    status, first, chunks = None, None, []
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status, first
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message.get('body'):
+            if first is None:
+                first = time.perf_counter() - started
+            chunks.append(message['body'])
+            if disconnect_after is not None and len(chunks) >= disconnect_after:
+                disconnected.set()
+
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    return status, first, time.perf_counter() - started, b''.join(chunks)
+
+
+async def run_phase(app, token, accept, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    ttfb, total, errors = [], [], 0
+
+    async def one(index):
+        nonlocal errors
+        message = f'Question {index}'
+        async with semaphore:
+            status, first, elapsed, body = await post(app, token, message, accept)
+        ttfb.append(first)
+        total.append(elapsed)
+        if accept == ACCEPT['buffered']:
+            ok = status == 200 and json.loads(body)['reply'].startswith('Mock reply')
+        else:
+            frames = parse_frames(body, accept)
+            deltas = ''.join(frame['delta'] for frame in frames[:-1])
+            ok = (status == 200 and frames[-1]['done'] and not frames[-1]['truncated']
+                  and frames[-1]['reply'] == deltas and deltas.startswith(f'Mock reply to: {message}.'))
+        errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    return {
+        'requests': requests,
+        'errors': errors,
+        'requests_per_s': round(requests / (time.perf_counter() - started), 1),
+        'ttfb': summarize(ttfb),
+        'total': summarize(total),
+    }
+
+
+def main():
+    arg_parser = parser(__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--requests', type=int, default=100, help="Requests per phase")
+    arg_parser.add_argument('--concurrency', type=int, default=20, help="Requests in flight")
+    arg_parser.add_argument('--latency', type=float, default=0.2, help="Seconds before the upstream's first word")
+    arg_parser.add_argument('--tokens', type=int, default=40, help="Words per reply")
+    arg_parser.add_argument('--token-interval', type=float, default=0.02, help="Seconds per word")
+    arg_parser.add_argument('--disconnect-after', type=int, default=3, help="Frames read before disconnecting")
+    args = arg_parser.parse_args()
+
+    mock = MockLLMServer(latency=args.latency, tokens=args.tokens, token_interval=args.token_interval).start()
+    os.environ.update({
+        'AI_CHAT_ENABLED': 'True',
+        'OPENAI_API_KEY': 'mock',
+        'OPENAI_BASE_URL': mock.base_url,
+    })
+    setup_django()
+
+    from accounts.authentication import RoleRefreshToken
+    from accounts.models import User
+    from healthhub import llm
+    from healthhub.asgi import application
+
+    user = User.objects.create_user('bench_chat', 'bench_chat@example.com', 'bench-pass-123', user_type='patient')
+    token = str(RoleRefreshToken.for_user(user).access_token)
+
+    async def run():
+        results = {}
+        # Warm up the client and its connections
+        await run_phase(application, token, ACCEPT['sse'], args.concurrency, args.concurrency)
+        for name, accept in ACCEPT.items():
+            results[name] = await run_phase(application, token, accept, args.requests, args.concurrency)
+
+        aborted = mock.streams_aborted
+        replies = await asyncio.gather(*(
+            post(application, token, f'Question {index}', ACCEPT['sse'], args.disconnect_after)
+            for index in range(args.concurrency)))
+        # Let the upstream notice the closed connections
+        await asyncio.sleep(args.token_interval * 5 + 0.1)
+        results['disconnect'] = {
+            'requests': args.concurrency,
+            'frames_read': args.disconnect_after,
+            'seconds_to_disconnect': summarize([elapsed for _, _, elapsed, _ in replies]),
+            'upstream_streams_aborted': mock.streams_aborted - aborted,
+        }
+        results['client'] = await llm.stats()
+        return results
+
+    results = asyncio.run(run())
+    failed = {name: phase['errors'] for name, phase in results.items() if phase.get('errors')}
+    if failed:
+        fail(f"Unexpected replies: {failed}")
+    if results['disconnect']['upstream_streams_aborted'] < args.concurrency:
+        fail(f"Only {results['disconnect']['upstream_streams_aborted']} of {args.concurrency} "
+             f"upstream streams were cancelled on disconnect")
+    report('chat_streaming', {
+        'upstream': {'latency_s': args.latency, 'tokens': args.tokens, 'token_interval_s': args.token_interval},
+        'concurrency': args.concurrency,
+        **results,
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Shared helpers for the benchmark scripts in this package.
+
+Run a benchmark from the backend directory, e.g.::
+
+    python -m benchmarks.audit_overhead --json audit.json
+
+Benchmarks that need data work on a throwaway test database, never on db.sqlite3.
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# Load generators send every login/registration from one address; an empty rate disables a throttle
+UNTHROTTLED_ENV = {'THROTTLE_LOGIN_IP_RATE': '', 'THROTTLE_LOGIN_USERNAME_RATE': '', 'THROTTLE_REGISTER_RATE': ''}
+
+
+def setup_django(test_db=True, throttles=False):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'healthhub.settings')
+    if not throttles:
+        for name, value in UNTHROTTLED_ENV.items():
+            os.environ.setdefault(name, value)
+    import django
+    django.setup()
+    if test_db:
+        from django.db import connection
+        from django.test.utils import setup_test_environment
+        setup_test_environment()
+        if connection.vendor == 'sqlite':
+            # A file rather than shared-cache memory, so background threads
+            # (audit flusher, worker pools) wait for locks instead of failing.
+            handle, path = tempfile.mkstemp(prefix='healthhub-bench-', suffix='.sqlite3')
+            os.close(handle)
+            connection.settings_dict['TEST']['NAME'] = path
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        atexit.register(connection.creation.destroy_test_db, old_name, verbosity=0)
+
+
+def parser(description):
+    arg_parser = argparse.ArgumentParser(description=description)
+    arg_parser.add_argument('--json', metavar='PATH', help="Also write the report to PATH")
+    return arg_parser
+
+
+def measure(func, repeat, warmup=10):
+    """Call ``func`` ``repeat`` times and return the per-call durations in seconds."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'n': len(ordered),
+        'mean_us': round(statistics.fmean(ordered) * 1e6, 2),
+        'p50_us': round(ordered[len(ordered) // 2] * 1e6, 2),
+        'p99_us': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6, 2),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(name, results, path=None):
+    """Print ``results`` as JSON (and write it to ``path``) tagged with the commit and interpreter."""
+    document = {
+        'benchmark': name,
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'results': results,
+    }
+    text = json.dumps(document, indent=2, sort_keys=True)
+    print(text)
+    if path:
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(text + '\n')
+    return document
+
+
+def fail(message):
+    print(message, file=sys.stderr)
+    sys.exit(1)
@@ -0,0 +1,68 @@
+"""
+Bytes on the wire and CPU per request with response compression.
+
+For the doctor, nurse and hospital list pages, reports the payload size
+uncompressed, with per-request gzip/brotli and precompressed at the best
+ratio, plus the time to compress it each way.  It then times full requests
+through the middleware stack: uncached without compression, uncached with
+per-request compression, and cache hits served precompressed.
+"""
+import gzip
+import time
+from io import StringIO
+
+from benchmarks.common import measure, parser, report, setup_django, summarize
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, round((time.perf_counter() - started) * 1e6, 1)
+
+
+def main():
+    arg_parser = parser(__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--rows', type=int, default=500, help="Providers and hospitals to seed")
+    arg_parser.add_argument('--requests', type=int, default=300)
+    args = arg_parser.parse_args()
+    setup_django()
+
+    from django.core.management import call_command
+    from rest_framework.test import APIClient
+    from accounts.models import User
+    from healthhub import compression, responsecache
+
+    call_command('seed_scale', '--patients', '10', '--doctors', str(args.rows), '--nurses', str(args.rows),
+                 '--hospitals', str(args.rows), '--appointments', '0', '--skip-stats', stdout=StringIO())
+    client = APIClient()
+    client.force_authenticate(User.objects.get(username='seed_patient_0'))
+    endpoints = {'doctors': '/api/auth/doctors/', 'nurses': '/api/auth/nurses/', 'hospitals': '/api/hospitals/'}
+    real_cacheable = responsecache._cacheable
+
+    results = {}
+    for name, url in endpoints.items():
+        responsecache._cacheable = lambda request: False
+        content = client.get(url).content
+        sizes = {'identity': {'bytes': len(content)}}
+        for encoding in compression.ENCODINGS:
+            for label, best in (('dynamic', False), ('precompressed', True)):
+                compressed, elapsed = timed(lambda: compression.compress(content, encoding, best=best))
+                sizes[f'{encoding}_{label}'] = {'bytes': len(compressed), 'compress_us': elapsed,
+                                                'ratio': round(len(content) / len(compressed), 1)}
+        assert gzip.decompress(compression.compress(content, 'gzip')) == content
+
+        requests = {}
+        preferred = compression.ENCODINGS[0]
+        requests['uncached_identity'] = summarize(measure(lambda: client.get(url), args.requests))
+        requests[f'uncached_{preferred}'] = summarize(measure(
+            lambda: client.get(url, HTTP_ACCEPT_ENCODING=preferred), args.requests))
+        responsecache._cacheable = real_cacheable
+        requests[f'cached_{preferred}'] = summarize(measure(
+            lambda: client.get(url, HTTP_ACCEPT_ENCODING=preferred), args.requests))
+        results[name] = {'payload': sizes, 'request': requests}
+    responsecache._cacheable = real_cacheable
+    report('compression', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Login throughput per core for each password hasher.
+
+For every hasher in ``--hashers`` (those whose library is installed), makes
+it the preferred one and reports the cost of one hash and the logins/sec that
+``--threads`` concurrent clients get through ``POST /api/auth/login/``,
+overall and per core.  Also counts the hashes one registration computes.
+"""
+import os
+import threading
+import time
+
+from benchmarks.common import fail, parser, report, setup_django
+
+PASSWORD = 'bench-pass-123'
+HASHERS = {
+    'pbkdf2_sha256': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt_sha256': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+}
+
+
+def load_test(usernames, duration):
+    from django.db import connection
+    from django.test import Client
+
+    counts, errors = [0] * len(usernames), [0] * len(usernames)
+    deadline = time.perf_counter() + duration
+
+    def run(index):
+        client = Client()
+        body = {'username': usernames[index], 'password': PASSWORD}
+        while time.perf_counter() < deadline:
+            if client.post('/api/auth/login/', body, content_type='application/json').status_code == 200:
+                counts[index] += 1
+            else:
+                errors[index] += 1
+        connection.close()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(len(usernames))]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts), sum(errors), time.perf_counter() - started
+
+
+def count_registration_hashes():
+    from unittest import mock
+    from django.contrib.auth import hashers
+    from django.test import Client
+
+    body = {'user': {'username': 'bench_register', 'email': 'bench_register@example.com', 'password': PASSWORD,
+                     'password_confirm': PASSWORD, 'first_name': 'B', 'last_name': 'R', 'user_type': 'patient'},
+            'phone': '0'}
+    with mock.patch.object(hashers, 'make_password', wraps=hashers.make_password) as spy:
+        response = Client().post('/api/auth/register/patient/', body, content_type='application/json')
+    if response.status_code != 201:
+        fail(f"Registration failed: {response.status_code} {response.content[:200]}")
+    return spy.call_count
+
+
+def main():
+    arg_parser = parser(__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--hashers', default=','.join(HASHERS), help="Comma-separated subset of: " + ', '.join(HASHERS))
+    arg_parser.add_argument('--threads', type=int, default=2 * (os.cpu_count() or 1), help="Concurrent login clients")
+    arg_parser.add_argument('--duration', type=float, default=10.0, help="Measured seconds per hasher")
+    args = arg_parser.parse_args()
+    setup_django()
+
+    from django.conf import settings
+    from django.contrib.auth import hashers
+    from django.test import override_settings
+    from accounts.models import User
+
+    cores = os.cpu_count() or 1
+    results = {'cores': cores, 'threads': args.threads, 'hashing_workers': settings.PASSWORD_HASHING_WORKERS or cores,
+               'hashers': {}}
+    for name in args.hashers.split(','):
+        if name not in HASHERS:
+            fail(f"Unknown hasher {name!r}")
+        preferred = [HASHERS[name], *(path for path in settings.PASSWORD_HASHERS if path != HASHERS[name])]
+        with override_settings(PASSWORD_HASHERS=preferred):
+            try:
+                started = time.perf_counter()
+                encoded = hashers.make_password(PASSWORD)
+                hash_ms = (time.perf_counter() - started) * 1000
+            except ValueError as exc:
+                # The hasher's library is not installed
+                results['hashers'][name] = {'skipped': str(exc)}
+                continue
+            usernames = [f'bench_{name}_{index}' for index in range(args.threads)]
+            User.objects.bulk_create([User(username=username, email=f'{username}@example.com', password=encoded)
+                                      for username in usernames])
+            logins, errors, elapsed = load_test(usernames, args.duration)
+        results['hashers'][name] = {
+            'hash_ms': round(hash_ms, 1),
+            'logins': logins,
+            'errors': errors,
+            'logins_per_sec': round(logins / elapsed, 1),
+            'logins_per_sec_per_core': round(logins / elapsed / cores, 1),
+        }
+    results['hashes_per_registration'] = count_registration_hashes()
+    report('hashing', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,536 @@
+"""
+HTTP load test for the API.
+
+Drives the flows of ``comprehensive_test.py`` (login, doctor list, hospital
+search, booking, status updates, my-appointments, chat, registration) with an
+asyncio client at a fixed concurrency, and reports requests/sec and latency
+percentiles per operation.
+
+Targets:
+
+* default: starts ``manage.py runserver`` (or ``--server-cmd``) on a free port
+  against a fresh temporary database filled by ``seed_scale --seed-args``;
+* ``--url http://host:port``: an already running server whose database was
+  seeded with ``seed_scale`` (default prefix and password), started with the
+  login/registration throttles disabled (see ``common.UNTHROTTLED_ENV``);
+* ``--wsgi``: calls the WSGI application in-process from a thread pool, with
+  no sockets, to separate Django/DRF cost from the network and server.
+
+Examples::
+
+    python -m benchmarks.loadtest --concurrency 20 --duration 15 --json load.json
+    python -m benchmarks.loadtest --wsgi --scenarios login,doctor_list
+    python -m benchmarks.loadtest --baseline load-main.json --json load.json
+"""
+import asyncio
+import json
+import os
+import random
+import shlex
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from io import BytesIO
+from itertools import count
+from urllib.parse import urlsplit
+
+from benchmarks.common import UNTHROTTLED_ENV, fail, parser, report, setup_django
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SEED_ARGS = '--patients 500 --doctors 100 --nurses 40 --hospitals 200 --appointments 20000'
+SEED_PASSWORD = 'testpass123'
+SPECIALISTS = ('eye', 'cardiologist', 'gynecologist', 'neurologist', 'orthopedic', 'dermatologist',
+               'pediatrician', 'psychiatrist', 'general')
+SURGERY_TYPES = ('open_heart', 'bypass', 'valve_replacement', 'pacemaker', 'brain_tumor', 'spinal_cord',
+                 'joint_replacement', 'spine_fixation', 'lasik', 'retinal_detachment', 'prostate_cancer',
+                 'lung_cancer')
+SLOTS_PER_DAY = 16
+
+
+class HttpConnection:
+    """One keep-alive HTTP/1.1 connection on asyncio streams."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=b'', headers=()):
+        head = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}', f'Content-Length: {len(body)}']
+        head += [f'{name}: {value}' for name, value in headers]
+        message = ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+        for _ in range(2):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            self.writer.write(message)
+            try:
+                await self.writer.drain()
+                status_line = await self.reader.readline()
+            except ConnectionError:
+                status_line = b''
+            if status_line:
+                break
+            # The server dropped an idle keep-alive connection before reading the request
+            self.close()
+        else:
+            raise ConnectionError("Server closed the connection")
+
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+        if 'content-length' in response_headers:
+            payload = await self.reader.readexactly(int(response_headers['content-length']))
+        elif response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            payload = await self._read_chunked()
+        else:
+            payload = await self.reader.read()
+            response_headers['connection'] = 'close'
+        if response_headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, payload
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b';')[0], 16)
+            if not size:
+                await self.reader.readline()
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class WsgiConnection:
+    """Calls the WSGI application directly on a worker thread."""
+
+    def __init__(self, app, executor):
+        self.app = app
+        self.executor = executor
+
+    async def request(self, method, path, body=b'', headers=()):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._call, method, path, body, headers)
+
+    def _call(self, method, path, body, headers):
+        path_info, _, query = path.partition('?')
+        environ = {
+            'REQUEST_METHOD': method, 'PATH_INFO': path_info, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+            'SERVER_NAME': '127.0.0.1', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1', 'CONTENT_LENGTH': str(len(body)), 'wsgi.input': BytesIO(body),
+            'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http', 'wsgi.version': (1, 0),
+            'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+        }
+        for name, value in headers:
+            key = name.upper().replace('-', '_')
+            environ[key if key == 'CONTENT_TYPE' else f'HTTP_{key}'] = value
+        started = []
+        result = self.app(environ, lambda status, response_headers, exc_info=None: started.append(status))
+        try:
+            payload = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return int(started[0].split()[0]), payload
+
+    def close(self):
+        pass
+
+
+class Stats:
+    """Latencies of successful requests and error counts per operation, while recording."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+        self.recording = False
+        self.started = self.stopped = None
+
+    def start(self):
+        self.recording = True
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.recording = False
+        self.stopped = time.perf_counter()
+
+    def record(self, name, elapsed, outcome=None):
+        if not self.recording:
+            return
+        if outcome is None:
+            self.latencies[name].append(elapsed)
+        else:
+            self.errors[name][str(outcome)] += 1
+
+    def summary(self):
+        elapsed = self.stopped - self.started
+        operations = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            samples = sorted(self.latencies[name])
+            operations[name] = {
+                'requests': len(samples),
+                'errors': dict(self.errors[name]),
+                'rps': round(len(samples) / elapsed, 1),
+                'latency_ms': _percentiles(samples),
+            }
+        return operations
+
+
+def _percentiles(samples):
+    if not samples:
+        return None
+
+    def pick(fraction):
+        return round(samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000, 2)
+    return {
+        'mean': round(sum(samples) / len(samples) * 1000, 2),
+        'p50': pick(0.5), 'p90': pick(0.9), 'p99': pick(0.99),
+        'max': round(samples[-1] * 1000, 2),
+    }
+
+
+class Session:
+    """One virtual user: a connection plus JSON/JWT request helpers."""
+
+    def __init__(self, connection, stats):
+        self.connection = connection
+        self.stats = stats
+
+    async def call(self, name, method, path, payload=None, token=None, expect=(200,)):
+        """Time one request under ``name``; returns the body, or ``None`` for unexpected statuses."""
+        headers = [('Accept', 'application/json')]
+        body = b''
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            headers.append(('Content-Type', 'application/json'))
+        if token:
+            headers.append(('Authorization', f'Bearer {token}'))
+        started = time.perf_counter()
+        try:
+            status, content = await self.connection.request(method, path, body, headers)
+        except (OSError, asyncio.IncompleteReadError) as exc:
+            self.stats.record(name, None, type(exc).__name__)
+            return None
+        if status not in expect:
+            self.stats.record(name, None, status)
+            return None
+        self.stats.record(name, time.perf_counter() - started)
+        return content
+
+
+class Fixtures:
+    """Accounts and counters shared by all virtual users, prepared through the API."""
+
+    def __init__(self, prefix, password, users):
+        self.prefix = prefix
+        self.password = password
+        self.users = users
+        self.patients = []   # (user id, username, access token)
+        self.doctors = []
+        self.doctor_appointments = []   # (appointment id, doctor token)
+        self.bookings = count()
+        self.registrations = count()
+        self.run_id = f'{int(time.time()):x}'
+        # Far beyond seeded bookings and randomized per run, so repeated runs
+        # against the same server do not collide on slots
+        self.booking_start = date.today() + timedelta(days=400 + random.randrange(50000))
+
+    async def prepare(self, session):
+        for user_type, accounts in (('patient', self.patients), ('doctor', self.doctors)):
+            for i in range(self.users):
+                username = f'{self.prefix}_{user_type}_{i}'
+                content = await session.call('setup_login', 'POST', '/api/auth/login/',
+                                             {'username': username, 'password': self.password})
+                if content is None:
+                    break
+                data = json.loads(content)
+                accounts.append((data['user']['id'], username, data['tokens']['access']))
+        if not self.patients or not self.doctors:
+            fail(f"Could not log in as {self.prefix}_patient_0 / {self.prefix}_doctor_0; "
+                 "is the target seeded with seed_scale?")
+        for doctor_id, _, doctor_token in self.doctors:
+            content = await book(session, self, name='setup_booking', doctor=(doctor_id, doctor_token))
+            if content is not None:
+                self.doctor_appointments.append((json.loads(content)['id'], doctor_token))
+
+
+async def book(session, fixtures, name='book_appointment', patient=None, doctor=None):
+    n = next(fixtures.bookings)
+    doctor_id = doctor[0] if doctor else fixtures.doctors[n % len(fixtures.doctors)][0]
+    patient_id, _, token = patient or fixtures.patients[n % len(fixtures.patients)]
+    slot = n // len(fixtures.doctors)
+    day = fixtures.booking_start + timedelta(days=slot // SLOTS_PER_DAY)
+    minutes = (slot % SLOTS_PER_DAY) * 30
+    return await session.call(name, 'POST', '/api/appointments/', {
+        'patient_id': patient_id,
+        'doctor_id': doctor_id,
+        'appointment_date': day.isoformat(),
+        'appointment_time': f'{9 + minutes // 60:02d}:{minutes % 60:02d}',
+        'duration_minutes': 30,
+        'reason': 'Load test booking',
+    }, token=token, expect=(201,))
+
+
+async def login(session, fixtures, rng):
+    _, username, _ = rng.choice(fixtures.patients)
+    await session.call('login', 'POST', '/api/auth/login/', {'username': username, 'password': fixtures.password})
+
+
+async def doctor_list(session, fixtures, rng):
+    specialist = rng.choice(SPECIALISTS + (None,))
+    await session.call('doctor_list', 'GET', f'/api/auth/doctors/?specialist={specialist}' if specialist
+                       else '/api/auth/doctors/')
+
+
+async def search_hospitals(session, fixtures, rng):
+    await session.call('search_hospitals', 'POST', '/api/hospitals/search/', {
+        'surgery_type': rng.choice(SURGERY_TYPES), 'country': rng.choice(('bangladesh', 'abroad')),
+    }, token=rng.choice(fixtures.patients)[2])
+
+
+async def book_appointment(session, fixtures, rng):
+    await book(session, fixtures)
+
+
+async def update_status(session, fixtures, rng):
+    appointment_id, token = rng.choice(fixtures.doctor_appointments)
+    await session.call('update_status', 'PATCH', f'/api/appointments/{appointment_id}/update-status/',
+                       {'status': rng.choice(('approved', 'pending'))}, token=token)
+
+
+async def my_appointments(session, fixtures, rng):
+    await session.call('my_appointments', 'GET', '/api/appointments/my-appointments/',
+                       token=rng.choice(fixtures.patients)[2])
+
+
+async def chat(session, fixtures, rng):
+    await session.call('chat', 'POST', '/api/chat/', {'message': 'What are common symptoms of the flu?'},
+                       token=rng.choice(fixtures.patients)[2])
+
+
+async def register_patient(session, fixtures, rng):
+    username = f'load_{fixtures.run_id}_{next(fixtures.registrations)}'
+    await session.call('register_patient', 'POST', '/api/auth/register/patient/', {
+        'user': {
+            'username': username, 'email': f'{username}@load.test', 'password': SEED_PASSWORD,
+            'password_confirm': SEED_PASSWORD, 'first_name': 'Load', 'last_name': 'Test', 'user_type': 'patient',
+        },
+        'phone': '01700000000',
+    }, expect=(201,))
+
+
+async def patient_flow(session, fixtures, rng):
+    """The comprehensive_test.py journey: log in, browse doctors, book, list own appointments."""
+    patient = rng.choice(fixtures.patients)
+    await session.call('flow_login', 'POST', '/api/auth/login/',
+                       {'username': patient[1], 'password': fixtures.password})
+    await session.call('flow_doctor_list', 'GET', '/api/auth/doctors/')
+    await book(session, fixtures, name='flow_book_appointment', patient=patient)
+    await session.call('flow_my_appointments', 'GET', '/api/appointments/my-appointments/', token=patient[2])
+
+
+SCENARIOS = {
+    'login': login,
+    'doctor_list': doctor_list,
+    'search_hospitals': search_hospitals,
+    'book_appointment': book_appointment,
+    'update_status': update_status,
+    'my_appointments': my_appointments,
+    'chat': chat,
+    'register_patient': register_patient,
+    'patient_flow': patient_flow,
+}
+
+
+async def run_scenario(name, make_connection, fixtures, concurrency, duration, warmup):
+    stats = Stats()
+    running = True
+
+    async def virtual_user(index):
+        rng = random.Random(f'{name}:{index}')
+        session = Session(make_connection(), stats)
+        try:
+            while running:
+                await SCENARIOS[name](session, fixtures, rng)
+        finally:
+            session.connection.close()
+
+    users = [asyncio.create_task(virtual_user(i)) for i in range(concurrency)]
+    await asyncio.sleep(warmup)
+    stats.start()
+    await asyncio.sleep(duration)
+    stats.stop()
+    running = False
+    await asyncio.gather(*users)
+    return stats.summary()
+
+
+async def run_all(args, make_connection):
+    fixtures = Fixtures(args.prefix, args.password, max(args.concurrency, 10))
+    setup = Session(make_connection(), Stats())
+    await fixtures.prepare(setup)
+    setup.connection.close()
+    results = {}
+    for name in args.scenarios:
+        results[name] = await run_scenario(name, make_connection, fixtures, args.concurrency,
+                                           args.duration, args.warmup)
+        print(f"{name}: " + ', '.join(
+            f"{op} {stats['rps']} req/s p99 {stats['latency_ms']['p99'] if stats['latency_ms'] else '-'} ms"
+            + (f" errors {stats['errors']}" if stats['errors'] else '')
+            for op, stats in results[name].items()
+        ), file=sys.stderr)
+    return results
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_server(host, port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            fail(f"Server exited with status {process.returncode}")
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    fail("Server did not start in time")
+
+
+def start_local_server(args):
+    """Migrate and seed a temporary database, then start the server on it; returns (process, url, cleanup)."""
+    workdir = tempfile.mkdtemp(prefix='healthhub-load-')
+    env = {**UNTHROTTLED_ENV, **os.environ, 'DATABASE_NAME': os.path.join(workdir, 'db.sqlite3'),
+           'DEBUG': str(args.debug)}
+    manage = [sys.executable, 'manage.py']
+    print("Preparing database...", file=sys.stderr)
+    subprocess.run(manage + ['migrate', '--noinput', '-v', '0'], cwd=BACKEND_DIR, env=env, check=True)
+    subprocess.run(manage + ['seed_scale', *shlex.split(args.seed_args), '--prefix', args.prefix,
+                             '--password', args.password, '-v', '0'],
+                   cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+    port = _free_port()
+    if args.server_cmd:
+        command = shlex.split(args.server_cmd.format(host='127.0.0.1', port=port))
+    else:
+        command = manage + ['runserver', '--noreload', f'127.0.0.1:{port}']
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def cleanup():
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    _wait_for_server('127.0.0.1', port, process)
+    return f'http://127.0.0.1:{port}', cleanup
+
+
+def compare(baseline_path, results):
+    """Print per-operation throughput and p99 changes against an earlier report."""
+    with open(baseline_path, encoding='utf-8') as handle:
+        baseline = json.load(handle)['results']['scenarios']
+    print(f"Compared with {baseline_path}:", file=sys.stderr)
+    for scenario, operations in results.items():
+        for op, current in operations.items():
+            previous = baseline.get(scenario, {}).get(op)
+            if not previous or not previous['latency_ms'] or not current['latency_ms']:
+                continue
+            rps_change = (current['rps'] - previous['rps']) / previous['rps'] * 100 if previous['rps'] else 0
+            p99_change = ((current['latency_ms']['p99'] - previous['latency_ms']['p99'])
+                          / previous['latency_ms']['p99'] * 100)
+            print(f"  {scenario}/{op}: {previous['rps']} -> {current['rps']} req/s ({rps_change:+.1f}%), "
+                  f"p99 {previous['latency_ms']['p99']} -> {current['latency_ms']['p99']} ms ({p99_change:+.1f}%)",
+                  file=sys.stderr)
+
+
+def main():
+    arg_parser = parser(__doc__.split('\n\n')[0])
+    target = arg_parser.add_mutually_exclusive_group()
+    target.add_argument('--url', help="Benchmark an already running server instead of starting one")
+    target.add_argument('--wsgi', action='store_true', help="Call the WSGI application in-process")
+    arg_parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                            help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    arg_parser.add_argument('--concurrency', type=int, default=10, help="Concurrent virtual users")
+    arg_parser.add_argument('--duration', type=float, default=10, help="Measured seconds per scenario")
+    arg_parser.add_argument('--warmup', type=float, default=2, help="Unmeasured seconds before each scenario")
+    arg_parser.add_argument('--seed-args', default=DEFAULT_SEED_ARGS, help="seed_scale options for the local database")
+    arg_parser.add_argument('--server-cmd', help="Server command with {host}/{port} placeholders, "
+                                                 "e.g. 'gunicorn healthhub.wsgi -w 4 -b {host}:{port}'")
+    arg_parser.add_argument('--debug', action='store_true', help="Run the server with DEBUG=True")
+    arg_parser.add_argument('--prefix', default='seed', help="seed_scale username prefix of the test accounts")
+    arg_parser.add_argument('--password', default=SEED_PASSWORD, help="Password of the seeded accounts")
+    arg_parser.add_argument('--baseline', metavar='PATH', help="Earlier --json report to compare against")
+    args = arg_parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        fail(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    cleanup = None
+    if args.wsgi:
+        setup_django()
+        from django.conf import settings
+        from django.core.management import call_command
+        from django.core.wsgi import get_wsgi_application
+        settings.DEBUG = args.debug
+        call_command('seed_scale', *shlex.split(args.seed_args), '--prefix', args.prefix,
+                     '--password', args.password, verbosity=0)
+        app = get_wsgi_application()
+        executor = ThreadPoolExecutor(max_workers=args.concurrency)
+        mode = 'wsgi'
+
+        def make_connection():
+            return WsgiConnection(app, executor)
+    else:
+        if args.url:
+            url, mode = args.url, 'url'
+        else:
+            url, cleanup = start_local_server(args)
+            mode = 'runserver' if not args.server_cmd else 'server-cmd'
+        parts = urlsplit(url)
+
+        def make_connection():
+            return HttpConnection(parts.hostname, parts.port or 80)
+
+    try:
+        results = asyncio.run(run_all(args, make_connection))
+    finally:
+        if cleanup is not None:
+            cleanup()
+
+    if args.baseline:
+        compare(args.baseline, results)
+    report('loadtest', {
+        'mode': mode,
+        'server_cmd': args.server_cmd,
+        'concurrency': args.concurrency,
+        'duration_s': args.duration,
+        'seed_args': None if args.url else args.seed_args,
+        'scenarios': results,
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
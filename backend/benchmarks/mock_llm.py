@@ -0,0 +1,175 @@
+"""
+Local stand-in for the chat completion API.
+
+Serves ``POST /v1/chat/completions`` over keep-alive HTTP/1.1 on asyncio
+streams.  The reply echoes the last message followed by ``tokens`` words.
+It starts after ``latency`` (+ up to ``jitter``) seconds, and each word
+takes ``token_interval`` more; a 503 answers ``error_rate`` of the calls.
+Requests with ``"stream": true`` get the reply as server-sent events, one
+word at a time.  The attributes can be changed while it runs, to make the
+upstream slow or failing mid-benchmark.  It counts calls, opened connections
+(to check connection reuse) and streams cut short by the client.
+
+Point the app at it with ``OPENAI_BASE_URL=http://127.0.0.1:8765/v1``::
+
+    python -m benchmarks.mock_llm --port 8765 --latency 0.3
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+
+class MockLLMServer:
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.2, jitter=0.0, error_rate=0.0, tokens=20,
+                 token_interval=0.0, seed=0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.tokens = tokens
+        self.token_interval = token_interval
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.connections = 0
+        self.deltas_sent = 0
+        self.streams_completed = 0
+        self.streams_aborted = 0
+        self.loop = None
+
+    @property
+    def base_url(self):
+        return f'http://{self.host}:{self.port}/v1'
+
+    def start(self):
+        """Serve on a background thread; returns once the port is bound."""
+        ready = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            server = self.loop.run_until_complete(asyncio.start_server(self.handle, self.host, self.port))
+            self.port = server.sockets[0].getsockname()[1]
+            ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, name='mock-llm', daemon=True).start()
+        ready.wait()
+        return self
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length') or 0))
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                if method != 'POST' or path.rstrip('/') != '/v1/chat/completions':
+                    await self.send(writer, '404 Not Found', {'error': {'message': 'Not found'}})
+                    continue
+                self.calls += 1
+                request = json.loads(body or b'{}')
+                if request.get('stream'):
+                    if not await self.stream(reader, writer, request):
+                        break
+                else:
+                    await self.send(writer, *await self.respond(request))
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def send(self, writer, status, payload):
+        data = json.dumps(payload).encode()
+        writer.write(f'HTTP/1.1 {status}\r\nContent-Type: application/json\r\n'
+                     f'Content-Length: {len(data)}\r\n\r\n'.encode('latin-1') + data)
+        await writer.drain()
+
+    def deltas(self, request):
+        messages = request.get('messages') or [{}]
+        yield f"Mock reply to: {messages[-1].get('content', '')}."
+        for index in range(self.tokens):
+            yield f' word{index}'
+
+    def failing(self):
+        return self.rng.random() < self.error_rate
+
+    async def respond(self, request):
+        await asyncio.sleep(self.latency + self.rng.uniform(0, self.jitter) + self.tokens * self.token_interval)
+        if self.failing():
+            return '503 Service Unavailable', {'error': {'message': 'Overloaded'}}
+        return '200 OK', {
+            'id': f'chatcmpl-mock-{self.calls}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'mock'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': ''.join(self.deltas(request))},
+                'finish_reason': 'stop',
+            }],
+        }
+
+    async def stream(self, reader, writer, request):
+        """Send the reply as server-sent events, a delta every ``token_interval``; False if the client left."""
+        await asyncio.sleep(self.latency + self.rng.uniform(0, self.jitter))
+        if self.failing():
+            await self.send(writer, '503 Service Unavailable', {'error': {'message': 'Overloaded'}})
+            return True
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n')
+        for index, delta in enumerate(self.deltas(request)):
+            if index:
+                await asyncio.sleep(self.token_interval)
+            chunk = {'id': f'chatcmpl-mock-{self.calls}', 'object': 'chat.completion.chunk',
+                     'choices': [{'index': 0, 'delta': {'content': delta}, 'finish_reason': None}]}
+            try:
+                if reader.at_eof() or writer.is_closing():
+                    raise ConnectionResetError
+                self.write_chunk(writer, b'data: ' + json.dumps(chunk).encode() + b'\n\n')
+                await writer.drain()
+            except ConnectionError:
+                # The client closed the connection mid-stream
+                self.streams_aborted += 1
+                return False
+            self.deltas_sent += 1
+        self.write_chunk(writer, b'data: [DONE]\n\n')
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+        self.streams_completed += 1
+        return True
+
+    @staticmethod
+    def write_chunk(writer, data):
+        writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--latency', type=float, default=0.2, help="Seconds before the reply starts")
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help="Extra random delay, up to this many seconds")
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help="Share of calls answered with a 503")
+    arg_parser.add_argument('--tokens', type=int, default=20, help="Words generated after the echo")
+    arg_parser.add_argument('--token-interval', type=float, default=0.02, help="Seconds per generated word")
+    args = arg_parser.parse_args()
+    server = MockLLMServer(args.host, args.port, args.latency, args.jitter, args.error_rate, args.tokens,
+                           args.token_interval).start()
+    print(f"Mock chat completion API at {server.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Encode time and payload size of the directory endpoints per renderer.
+
+Renders the doctor, nurse and hospital list payloads (a 20-row page and the
+full directory, as the views build them) with DRF's ``JSONRenderer``, the
+``ORJSONRenderer`` and the ``MessagePackRenderer``, and checks that the orjson
+bytes match ``JSONRenderer`` exactly.
+"""
+from io import StringIO
+
+from benchmarks.common import fail, measure, parser, report, setup_django, summarize
+
+
+def main():
+    arg_parser = parser(__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--rows', type=int, default=2000, help="Directory size per provider type")
+    arg_parser.add_argument('--repeat', type=int, default=200)
+    args = arg_parser.parse_args()
+    setup_django()
+
+    from django.core.management import call_command
+    from rest_framework.renderers import JSONRenderer
+    from accounts.models import Doctor, Nurse
+    from accounts.serializers import FastDoctorSerializer, FastNurseSerializer
+    from healthhub.renderers import MessagePackRenderer, ORJSONRenderer
+    from hospitals.models import Hospital
+    from hospitals.serializers import FastHospitalSerializer
+
+    call_command('seed_scale', '--patients', '10', '--doctors', str(args.rows), '--nurses', str(args.rows),
+                 '--hospitals', str(args.rows), '--appointments', '0', '--skip-stats', stdout=StringIO())
+
+    payloads = {}
+    for name, model, serializer in (('doctors', Doctor, FastDoctorSerializer),
+                                    ('nurses', Nurse, FastNurseSerializer),
+                                    ('hospitals', Hospital, FastHospitalSerializer)):
+        rows = serializer(model.objects.order_by('pk')).data
+        payloads[f'{name}_page'] = {'count': len(rows), 'next': None, 'previous': None, 'results': rows[:20]}
+        payloads[f'{name}_all'] = rows
+
+    renderers = {'json': JSONRenderer(), 'orjson': ORJSONRenderer(), 'msgpack': MessagePackRenderer()}
+    results = {}
+    for name, data in payloads.items():
+        expected = renderers['json'].render(data)
+        if renderers['orjson'].render(data) != expected:
+            fail(f"{name}: ORJSONRenderer output differs from JSONRenderer")
+        repeat = args.repeat if name.endswith('_page') else max(args.repeat // 20, 5)
+        results[name] = {}
+        for renderer_name, renderer in renderers.items():
+            stats = summarize(measure(lambda: renderer.render(data), repeat))
+            stats['bytes'] = len(renderer.render(data))
+            results[name][renderer_name] = stats
+        for renderer_name in ('orjson', 'msgpack'):
+            results[name][renderer_name]['speedup'] = round(
+                results[name]['json']['mean_us'] / results[name][renderer_name]['mean_us'], 1)
+    report('renderers', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Per-row cost of the list serializers, DRF versus ``healthhub.fastserializers``.
+
+Seeds a throwaway database with ``seed_scale`` and, for each list payload,
+times one page of rows three ways:
+
+* ``drf``: what the views used to do, instances fetched lazily and nested
+  users loaded on access;
+* ``drf_serialize``: the ``ModelSerializer`` alone, on instances already
+  loaded with ``select_related``/``prefetch_related``;
+* ``fast``: ``values()`` fetch plus rendering with the ``FastSerializer``.
+
+Every case first checks that both render to identical JSON bytes and fails
+otherwise.
+"""
+import time
+from io import StringIO
+
+from benchmarks.common import fail, parser, report, setup_django
+
+
+def per_row(func, rows, repeat):
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return round((time.perf_counter() - started) / repeat / rows * 1e6, 2)
+
+
+def main():
+    arg_parser = parser(__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--rows', type=int, default=500, help="Rows serialized per call")
+    arg_parser.add_argument('--repeat', type=int, default=20)
+    args = arg_parser.parse_args()
+    setup_django()
+
+    from django.core.management import call_command
+    from rest_framework.renderers import JSONRenderer
+    from accounts.models import Doctor, Nurse
+    from accounts.serializers import DoctorSerializer, FastDoctorSerializer, FastNurseSerializer, NurseSerializer
+    from appointments.archive import ArchivedChain
+    from appointments.models import Appointment, ArchivedAppointment, NurseAppointment
+    from appointments.serializers import (
+        AppointmentSerializer, FastAppointmentSerializer, FastNurseAppointmentSerializer, NurseAppointmentSerializer,
+    )
+    from hospitals.models import Hospital
+    from hospitals.serializers import FastHospitalSerializer, HospitalSerializer
+
+    rows = args.rows
+    call_command('seed_scale', '--patients', str(rows), '--doctors', str(rows), '--nurses', str(rows),
+                 '--hospitals', str(rows), '--appointments', str(rows * 4), '--skip-stats', stdout=StringIO())
+    # Archive some history so the merged hot + archive listing is covered too
+    moved = list(Appointment.objects.order_by('starts_at').values()[:rows // 2])
+    ArchivedAppointment.objects.bulk_create([ArchivedAppointment(**row) for row in moved])
+    Appointment.objects.filter(pk__in=[row['id'] for row in moved]).delete()
+
+    def chain(*related):
+        return ArchivedChain(Appointment.objects.select_related(*related),
+                             ArchivedAppointment.objects.select_related(*related))
+
+    # name -> (serializer, fast serializer, rows, the same rows with relations preloaded).
+    # Appointments are ordered by pk within equal start times so both sides see the same rows.
+    cases = {
+        'doctor': (DoctorSerializer, FastDoctorSerializer, Doctor.objects.order_by('pk'),
+                   Doctor.objects.order_by('pk').select_related('user')),
+        'nurse': (NurseSerializer, FastNurseSerializer, Nurse.objects.order_by('pk'),
+                  Nurse.objects.order_by('pk').select_related('user')),
+        'appointment': (AppointmentSerializer, FastAppointmentSerializer, Appointment.objects.order_by('-starts_at', '-pk'),
+                        Appointment.objects.order_by('-starts_at', '-pk').select_related('patient', 'doctor')),
+        'appointment_with_archive': (AppointmentSerializer, FastAppointmentSerializer, chain(),
+                                     chain('patient', 'doctor')),
+        'nurse_appointment': (NurseAppointmentSerializer, FastNurseAppointmentSerializer,
+                              NurseAppointment.objects.order_by('-starts_at', '-pk'),
+                              NurseAppointment.objects.order_by('-starts_at', '-pk').select_related('patient', 'nurse')),
+        'hospital': (HospitalSerializer, FastHospitalSerializer, Hospital.objects.order_by('pk'),
+                     Hospital.objects.order_by('pk').prefetch_related('specialists')),
+    }
+    renderer = JSONRenderer()
+    results = {}
+    for name, (serializer_class, fast_class, queryset, preloaded) in cases.items():
+        loaded = list(preloaded[:rows])
+        count = len(loaded)
+        expected = renderer.render(serializer_class(queryset[:rows], many=True).data)
+        actual = renderer.render(fast_class(list(fast_class.values(queryset)[:rows])).data)
+        if expected != actual:
+            fail(f"{name}: fast serializer output differs from {serializer_class.__name__}")
+
+        drf = per_row(lambda: serializer_class(queryset[:rows], many=True).data, count, args.repeat)
+        drf_serialize = per_row(lambda: serializer_class(loaded, many=True).data, count, args.repeat)
+        fast = per_row(lambda: fast_class(list(fast_class.values(queryset)[:rows])).data, count, args.repeat)
+        results[name] = {
+            'rows': count,
+            'identical_json': True,
+            'drf_us_per_row': drf,
+            'drf_serialize_us_per_row': drf_serialize,
+            'fast_us_per_row': fast,
+            'speedup': round(drf / fast, 1),
+        }
+    report('serializers', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Cost of the login throttles, and of the attacks they stop.
+
+Reports the time of one throttle check (allowed and rejected), the latency
+of a rejected login next to a failed login that reaches password hashing,
+and how many passwords a credential-stuffing burst against one username
+gets hashed, with the CPU time it costs.  Uses the configured
+``THROTTLE_*_RATE`` limits and ``throttle`` cache.
+"""
+import time
+from itertools import count
+from unittest import mock
+
+from benchmarks.common import fail, measure, parser, report, setup_django, summarize
+
+USERNAME = 'bench_victim'
+
+
+def main():
+    arg_parser = parser(__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--repeat', type=int, default=2000, help="Calls per throttle check measurement")
+    arg_parser.add_argument('--logins', type=int, default=20, help="Requests per login latency measurement")
+    arg_parser.add_argument('--burst', type=int, default=500, help="Login attempts in the credential-stuffing burst")
+    args = arg_parser.parse_args()
+    setup_django(throttles=True)
+
+    from django.contrib.auth import hashers
+    from django.core.cache import caches
+    from rest_framework.parsers import JSONParser
+    from rest_framework.request import Request
+    from rest_framework.settings import api_settings
+    from rest_framework.test import APIClient, APIRequestFactory
+    from accounts.models import User
+    from healthhub.throttling import LoginIPThrottle, LoginUsernameThrottle
+
+    rates = api_settings.DEFAULT_THROTTLE_RATES
+    if not rates['login_username']:
+        fail("THROTTLE_LOGIN_USERNAME_RATE is disabled")
+    User.objects.create_user(USERNAME, f'{USERNAME}@example.com', 'correct-horse-battery')
+    factory = APIRequestFactory()
+    addresses = (f'10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}' for n in count(1))
+
+    def login_request(username, address):
+        request = factory.post('/api/auth/login/', {'username': username, 'password': 'guess'}, format='json',
+                               REMOTE_ADDR=address)
+        return Request(request, parsers=[JSONParser()])
+
+    # One check of both login throttles, for fresh keys (allowed) and an exhausted username (rejected)
+    # (requests are built beforehand, so only the checks are timed)
+    usernames = (f'bench_user_{n}' for n in count())
+    fresh = iter([login_request(next(usernames), next(addresses)) for _ in range(args.repeat + 10)])
+
+    def check_both():
+        request = next(fresh)
+        return LoginIPThrottle().allow_request(request, None) and LoginUsernameThrottle().allow_request(request, None)
+
+    allowed = measure(check_both, args.repeat)
+    while LoginUsernameThrottle().allow_request(login_request('bench_exhausted', next(addresses)), None):
+        pass
+    exhausted = iter([login_request('bench_exhausted', next(addresses)) for _ in range(args.repeat + 10)])
+    rejected = measure(lambda: LoginUsernameThrottle().allow_request(next(exhausted), None), args.repeat)
+
+    client = APIClient()
+
+    def attempt(username):
+        return client.post('/api/auth/login/', {'username': username, 'password': 'guess'}, format='json',
+                           REMOTE_ADDR=next(addresses))
+
+    failed = measure(lambda: attempt(next(usernames)), args.logins, warmup=2)
+    rejected_login = measure(lambda: attempt('bench_exhausted'), args.logins, warmup=2)
+
+    # Credential stuffing: every attempt from a new address, all against one account
+    caches['throttle'].clear()
+    statuses = {}
+    with mock.patch.object(hashers, 'check_password', wraps=hashers.check_password) as spy:
+        started_cpu, started = time.process_time(), time.perf_counter()
+        for _ in range(args.burst):
+            status_code = attempt(USERNAME).status_code
+            statuses[status_code] = statuses.get(status_code, 0) + 1
+        burst_cpu, burst_wall = time.process_time() - started_cpu, time.perf_counter() - started
+
+    report('throttling', {
+        'rates': dict(rates),
+        'throttle_check': {'allowed_both': summarize(allowed), 'rejected': summarize(rejected)},
+        'login': {'failed_with_hashing': summarize(failed), 'rejected_by_throttle': summarize(rejected_login)},
+        'burst': {
+            'attempts': args.burst,
+            'statuses': statuses,
+            'passwords_hashed': spy.call_count,
+            'cpu_s': round(burst_cpu, 3),
+            'wall_s': round(burst_wall, 3),
+        },
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
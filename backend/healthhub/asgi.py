@@ -2,11 +2,61 @@
 ASGI config for healthhub project.
 """
 
+import asyncio
 import os
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'healthhub.settings')
 
-application = get_asgi_application()
 
+class CancelOnDisconnect:
+    """
+    Cancel a request whose client disconnects before the response is complete.
+
+    Django 4.2 does not watch for ``http.disconnect`` once it has read the
+    request body, so a streamed chat reply would keep its upstream completion
+    running to the end for nobody.  This listens for the disconnect after
+    the body is read and cancels the request, which closes the stream.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        body_read = asyncio.Event()
+
+        async def receive_body():
+            message = await receive()
+            if message['type'] != 'http.request' or not message.get('more_body', False):
+                body_read.set()
+            return message
+
+        async def listen_for_disconnect():
+            await body_read.wait()
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        app = asyncio.ensure_future(self.app(scope, receive_body, send))
+        listener = asyncio.ensure_future(listen_for_disconnect())
+        try:
+            await asyncio.wait((app, listener), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            app.cancel()
+            raise
+        finally:
+            listener.cancel()
+        if not app.done():
+            app.cancel()
+            try:
+                await app
+            except asyncio.CancelledError:
+                pass
+            return
+        return app.result()
+
+
+application = CancelOnDisconnect(get_asgi_application())
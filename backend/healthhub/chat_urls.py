@@ -1,9 +1,10 @@
 from django.urls import path
-from .chat_views import ChatAPIView
+from .chat_views import ChatAPIView, chat_metrics
 
 
 urlpatterns = [
     path('', ChatAPIView.as_view(), name='chat'),
+    path('metrics/', chat_metrics, name='chat_metrics'),
 ]
 
 
@@ -1,49 +1,227 @@
-from rest_framework.views import APIView
-from rest_framework.response import Response
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
 from django.conf import settings
 import logging
 
+from . import chatcache, intents, llm
+from .renderers import ORJSONRenderer
+
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = ("You are a helpful healthcare information assistant. You provide general information and "
+                 "disclaimers. You do not provide medical diagnosis.")
+PLACEHOLDER = "This is an AI response placeholder"
+
+
+def encode_sse(data):
+    return b'data: ' + ORJSONRenderer().render(data) + b'\n\n'
+
+
+def encode_ndjson(data):
+    return ORJSONRenderer().render(data) + b'\n'
+
+
+# Accept media type -> frame encoder of the streaming mode
+STREAM_FORMATS = {
+    'text/event-stream': encode_sse,
+    'application/x-ndjson': encode_ndjson,
+}
+
+
+def closing_frames(reply, stream, message, encode, key):
+    """The placeholder if nothing was generated, then the full reply."""
+    truncated = bool(reply) and stream.failed
+    if key is not None and reply and not truncated:
+        chatcache.remember(key, ''.join(reply))
+    if not reply:
+        reply = [PLACEHOLDER]
+        yield encode({'delta': PLACEHOLDER})
+    yield encode({'done': True, 'reply': ''.join(reply), 'echo': message, 'truncated': truncated})
+
+
+def stream_frames(stream, message, encode, key):
+    reply = []
+    if stream is not None:
+        try:
+            for delta in stream:
+                reply.append(delta)
+                yield encode({'delta': delta})
+        finally:
+            # Also reached when the WSGI server closes the response after a client disconnect
+            stream.close()
+    yield from closing_frames(reply, stream, message, encode, key)
+
+
+async def astream_frames(stream, message, encode, key):
+    reply = []
+    if stream is not None:
+        try:
+            async for delta in stream:
+                reply.append(delta)
+                yield encode({'delta': delta})
+        finally:
+            # Also reached when the request is cancelled on a client disconnect (see healthhub.asgi)
+            stream.close()
+    for frame in closing_frames(reply, stream, message, encode, key):
+        yield frame
+
+
+class ChatAPIView(View):
+    """
+    Async chat endpoint.
+
+    DRF 3.14 views are sync-only, so this is a plain async Django view that
+    authenticates and parses through DRF (in a thread, as both may hit the
+    database) and awaits the completion on ``healthhub.llm``'s pooled client.
+    Under ASGI a slow upstream holds no worker thread while it answers.
 
-class ChatAPIView(APIView):
+    Clients that accept ``text/event-stream`` (SSE) or ``application/x-ndjson``
+    get the reply as it is generated: ``{"delta": ...}`` frames, then
+    ``{"done": true, "reply": ..., "echo": ..., "truncated": ...}``.
+
+    Directory questions are answered from the database by
+    ``healthhub.intents``, with the matched ``intent`` and its ``results``
+    added to the reply.  Replies to repeated questions come from
+    ``healthhub.chatcache``.
+    """
+    http_method_names = ['post', 'options']
     permission_classes = [IsAuthenticated]
 
-    def post(self, request):
-        message = request.data.get('message', '')
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Django 4.2's csrf_exempt() wraps the view in a sync function; JWT auth needs no CSRF check
+        view.csrf_exempt = True
+        return view
+
+    def initialize(self, request):
+        request = Request(
+            request,
+            parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+            authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+        )
+        for permission in (permission() for permission in self.permission_classes):
+            if not permission.has_permission(request, self):
+                if request.authenticators and not request.successful_authenticator:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+        data = request.data
+        return data.get('message', '') if hasattr(data, 'get') else ''
+
+    def render(self, data, status=200, headers=None):
+        return HttpResponse(ORJSONRenderer().render(data), status=status, headers=headers,
+                            content_type='application/json')
+
+    def handle_exception(self, request, exc):
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            authenticator = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]()
+            exc.auth_header = authenticator.authenticate_header(request)
+            if not exc.auth_header:
+                exc.status_code = 403
+        response = exception_handler(exc, {'view': self, 'request': request})
+        if response is None:
+            raise exc
+        headers = {name: value for name, value in response.items() if name.lower() != 'content-type'}
+        return self.render(response.data, response.status_code, headers)
+
+    def http_method_not_allowed(self, request, *args, **kwargs):
+        response = self.handle_exception(request, exceptions.MethodNotAllowed(request.method))
+        response['Allow'] = ', '.join(self._allowed_methods())
+
+        async def func():
+            return response
+
+        return func()
+
+    def ai_enabled(self):
+        return getattr(settings, 'AI_CHAT_ENABLED', False) and getattr(settings, 'OPENAI_API_KEY', '')
+
+    def messages(self, message):
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": str(message)},
+        ]
+
+    def stream_format(self, request):
+        for media_type in request.headers.get('Accept', '').split(','):
+            media_type = media_type.split(';')[0].strip().lower()
+            if media_type in STREAM_FORMATS:
+                return media_type
+        return None
+
+    def instant(self, message, media_type, data):
+        """A reply that is ready at once, as one frame of the stream that was asked for."""
+        if media_type is None:
+            return self.render({'reply': data['reply'], 'echo': message, **data})
+        encode = STREAM_FORMATS[media_type]
+        return HttpResponse(encode({'delta': data['reply']}) + encode(
+            {'done': True, 'echo': message, 'truncated': False, **data}), content_type=media_type)
+
+    def stream(self, request, message, media_type, key):
+        encode = STREAM_FORMATS[media_type]
+        stream = llm.stream_completion(self.messages(message), temperature=0.2) if self.ai_enabled() else None
+        if isinstance(request, ASGIRequest):
+            frames = astream_frames(stream, message, encode, key)
+        else:
+            # WSGI servers iterate synchronously; each frame is still written as it arrives
+            frames = stream_frames(stream, message, encode, key)
+        response = StreamingHttpResponse(frames, content_type=media_type)
+        response['Cache-Control'] = 'no-cache'
+        # Keeps nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def post(self, request):
+        try:
+            message = await sync_to_async(self.initialize)(request)
+        except exceptions.APIException as exc:
+            return self.handle_exception(request, exc)
+
+        media_type = self.stream_format(request)
+        intent = intents.match(message) if settings.CHAT_ROUTER_ENABLED else None
+        if intent is not None:
+            return self.instant(message, media_type, await sync_to_async(intents.answer)(intent))
+
+        key = chatcache.cache_key(message) if self.ai_enabled() else None
+        cached = chatcache.cached_reply(key) if key is not None else None
+        if cached is not None:
+            return self.instant(message, media_type, {'reply': cached})
+        if media_type is not None:
+            return self.stream(request, message, media_type, key)
 
         # Default placeholder reply
-        ai_reply = "This is an AI response placeholder"
-
-        # Conditional OpenAI call (non-breaking if not configured)
-        if getattr(settings, 'AI_CHAT_ENABLED', False) and getattr(settings, 'OPENAI_API_KEY', ''):
-            try:
-                # Lazy import so package is optional until user installs it
-                from openai import OpenAI
-                client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
-                # Minimal chat completion request; model configurable via env
-                model_name = getattr(settings, 'OPENAI_MODEL', 'gpt-4o-mini')
-                completion = client.chat.completions.create(
-                    model=model_name,
-                    messages=[
-                        {"role": "system", "content": "You are a helpful healthcare information assistant. You provide general information and disclaimers. You do not provide medical diagnosis."},
-                        {"role": "user", "content": str(message)},
-                    ],
-                    temperature=0.2,
-                )
-                content = completion.choices[0].message.content if completion.choices else None
-                if content:
-                    ai_reply = content
-            except Exception as exc:
-                # Log and gracefully fall back to placeholder
-                logger.warning("OpenAI call failed, falling back to placeholder: %s", exc)
-
-        return Response({
+        ai_reply = PLACEHOLDER
+
+        # Conditional completion (non-breaking if not configured; None on failure or an open breaker)
+        if self.ai_enabled():
+            content = await llm.chat_completion(self.messages(message), temperature=0.2)
+            if content:
+                ai_reply = content
+                if key is not None:
+                    chatcache.remember(key, content)
+
+        return self.render({
             'reply': ai_reply,
             'echo': message,
-        }, status=status.HTTP_200_OK)
+        })
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def chat_metrics(request):
+    if request.user.user_type != 'admin' and not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    return Response({
+        'router': intents.stats(),
+        'cache': chatcache.stats(),
+        'upstream': async_to_sync(llm.stats)(),
+    })
@@ -0,0 +1,81 @@
+"""
+Cache of chat replies to repeated questions.
+
+Much of the chat traffic is the same few questions ("What does a
+cardiologist do?", "how to book"), each costing a full completion.  Replies
+are kept per process in a TTL LRU (``CHAT_CACHE_SIZE`` entries, for
+``CHAT_CACHE_TTL`` seconds) keyed by the message with case, Unicode forms,
+punctuation and whitespace folded.  ``CHAT_CACHE_FUZZY`` also drops
+stopwords, plural endings and word order, so that "what do cardiologists
+do" and "What does a cardiologist do?" share a reply.
+
+Messages that look personal (first-person words such as "I", "my" or "our", digits such as dates or
+phone numbers, e-mail addresses) or are longer than
+``CHAT_CACHE_MAX_LENGTH`` bypass the cache, and only upstream replies are
+stored, never the placeholder.
+"""
+import re
+import threading
+import unicodedata
+
+from django.conf import settings
+
+from .lru import TTLCache
+
+STOPWORDS = frozenset((
+    'a', 'an', 'the', 'is', 'are', 'am', 'be', 'do', 'does', 'did', 'to', 'of', 'for', 'in', 'on', 'at', 'and',
+    'or', 'what', 'whats', 'how', 'can', 'could', 'should', 'would', 'will', 'you', 'it', 'its', 'this',
+    'that', 'with', 'about', 'please', 'tell',
+))
+# First-person words, after normalization (so "I'm" is "im"; "I'll" and "we're" would be "ill" and "were")
+PERSONAL_WORDS = frozenset((
+    'i', 'me', 'my', 'mine', 'myself', 'im', 'ive', 'id', 'we', 'us', 'our', 'ours', 'ourselves', 'weve',
+))
+
+_APOSTROPHES = re.compile(r"['’]")
+_PERSONAL_CHARS = re.compile(r'[\d@]')
+
+replies = TTLCache(settings.CHAT_CACHE_SIZE, settings.CHAT_CACHE_TTL)
+_bypassed = 0
+_lock = threading.Lock()
+
+
+def normalize(message):
+    """Casefolded words of ``message``, with punctuation and symbols dropped."""
+    text = unicodedata.normalize('NFKC', message).casefold()
+    text = _APOSTROPHES.sub('', text)
+    text = ''.join(' ' if unicodedata.category(char)[0] in 'PSZC' else char for char in text)
+    return text.split()
+
+
+def fuzzy(words):
+    stems = {word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss') else word
+             for word in words if word not in STOPWORDS}
+    # Questions made only of stopwords keep their exact words
+    return sorted(stems) or words
+
+
+def cache_key(message):
+    """The cache key of ``message``, or ``None`` if its reply must not be cached."""
+    global _bypassed
+    if not settings.CHAT_CACHE_SIZE:
+        return None
+    words = normalize(message) if isinstance(message, str) else []
+    if (not words or len(message) > settings.CHAT_CACHE_MAX_LENGTH or _PERSONAL_CHARS.search(message)
+            or PERSONAL_WORDS.intersection(words)):
+        with _lock:
+            _bypassed += 1
+        return None
+    return ' '.join(fuzzy(words) if settings.CHAT_CACHE_FUZZY else words)
+
+
+def cached_reply(key):
+    return replies.get(key)
+
+
+def remember(key, reply):
+    replies.set(key, reply)
+
+
+def stats():
+    return {**replies.stats(), 'ttl': replies.ttl, 'bypassed': _bypassed}
@@ -0,0 +1,128 @@
+"""
+gzip / brotli compression of API responses.
+
+``CompressionMiddleware`` picks an encoding from ``Accept-Encoding`` (brotli
+when the ``brotli`` package is installed and the client accepts it, else
+gzip) and compresses responses of the ``COMPRESSION_TYPES`` content types
+that are at least ``COMPRESSION_MIN_SIZE`` bytes, streaming exports included.
+Dynamic responses use fast settings (brotli quality
+``COMPRESSION_BROTLI_QUALITY``, gzip level ``COMPRESSION_GZIP_LEVEL``).
+
+Responses that carry a ``precompressed`` dict (encoding -> bytes), such as
+the hits of ``healthhub.responsecache``, are sent as they are without being
+compressed again per request.
+
+Paths in ``COMPRESSION_EXCLUDE_PATHS`` are never compressed.  By default these
+are the endpoints that return JWTs, since compressing secrets next to request
+input invites BREACH-style attacks.
+"""
+import gzip
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding):
+    """The preferred supported encoding in an ``Accept-Encoding`` header, or ``None``."""
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip().replace(' ', '')
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            weights[name] = quality
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = weights.get(encoding, weights.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(content, encoding, best=False):
+    """Compress ``content``; ``best`` trades CPU for size, for payloads compressed once and served many times."""
+    if encoding == 'br':
+        quality = 11 if best else settings.COMPRESSION_BROTLI_QUALITY
+        return brotli.compress(content, quality=quality, mode=brotli.MODE_TEXT)
+    level = 9 if best else settings.COMPRESSION_GZIP_LEVEL
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY, mode=brotli.MODE_TEXT)
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    # gzip container: wbits 16 + MAX_WBITS
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def precompress(content):
+    """Every supported encoding of ``content`` at the best ratio, if it is worth compressing."""
+    if len(content) < settings.COMPRESSION_MIN_SIZE:
+        return {}
+    return {encoding: compress(content, encoding, best=True) for encoding in ENCODINGS}
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type in settings.COMPRESSION_TYPES
+
+
+class CompressionMiddleware(MiddlewareMixin):
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not is_compressible(response):
+            return response
+        if response.streaming and response.is_async:
+            return response
+        if request.path.startswith(tuple(settings.COMPRESSION_EXCLUDE_PATHS)):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+        else:
+            precompressed = getattr(response, 'precompressed', None) or {}
+            content = precompressed.get(encoding) or compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
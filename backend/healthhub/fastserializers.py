@@ -0,0 +1,236 @@
+"""
+Read-only serializers for list endpoints, rendered from ``values()`` rows.
+
+A ``ModelSerializer`` builds a model instance per row and then pays for a
+``get_attribute``/``to_representation`` call and an ``OrderedDict`` per
+field, again for every nested serializer.  ``FastSerializer`` walks the
+fields of an existing ``ModelSerializer`` once and compiles them into a plan:
+the ``values()`` lookups to fetch (nested serializers become ``user__email``
+style joins) and one getter per output key.  Rows are then rendered straight
+from dicts; nested ``many=True`` serializers cost one extra query per page.
+
+The output is the same JSON the wrapped serializer produces, byte for byte
+(``benchmarks.serializers`` checks this).  Fields the plan cannot reproduce
+from a row raise ``ImproperlyConfigured`` when the plan is built.
+"""
+import datetime
+import re
+import threading
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+# to_representation implementations that return database values unchanged
+PASSTHROUGH = {
+    serializers.CharField.to_representation,
+    serializers.IntegerField.to_representation,
+    serializers.BooleanField.to_representation,
+    serializers.ChoiceField.to_representation,
+    serializers.ReadOnlyField.to_representation,
+}
+UNSUPPORTED = (serializers.RelatedField, serializers.ManyRelatedField, serializers.SerializerMethodField)
+DISPLAY_SOURCE = re.compile(r'get_(\w+)_display')
+
+# The timezone DateTimeFields render in, looked up once per ``data`` call rather than per value
+_render = threading.local()
+
+
+class Plan:
+    def __init__(self, paths, getters, prefetches=()):
+        self.paths = list(dict.fromkeys(paths))
+        self.getters = tuple(getters)
+        self.prefetches = tuple(prefetches)
+
+    def render(self, row):
+        return {key: get(row) for key, get in self.getters}
+
+
+def _convert(field):
+    """A function turning a non-null database value into ``field``'s output, or ``None`` if it is unchanged."""
+    method = type(field).to_representation
+    if method in PASSTHROUGH:
+        return None
+    if isinstance(field, serializers.JSONField) and not field.binary:
+        return None
+    for field_class, default in ((serializers.DateField, api_settings.DATE_FORMAT),
+                                 (serializers.TimeField, api_settings.TIME_FORMAT)):
+        if method is field_class.to_representation and getattr(field, 'format', default) == ISO_8601:
+            return lambda value: value if isinstance(value, str) else value.isoformat()
+    if (method is serializers.DateTimeField.to_representation and not hasattr(field, 'timezone')
+            and type(field).enforce_timezone is serializers.DateTimeField.enforce_timezone
+            and getattr(field, 'format', api_settings.DATETIME_FORMAT) == ISO_8601):
+        return _iso_datetime
+    return field.to_representation
+
+
+def _iso_datetime(value):
+    """``DateTimeField.to_representation`` for the ISO 8601 format and the default timezone."""
+    if isinstance(value, str):
+        return value
+    field_timezone = _render.timezone
+    if field_timezone is not None:
+        value = value.astimezone(field_timezone) if timezone.is_aware(value) else \
+            timezone.make_aware(value, field_timezone)
+    elif timezone.is_aware(value):
+        value = timezone.make_naive(value, datetime.timezone.utc)
+    value = value.isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def _value_getter(path, convert):
+    if convert is None:
+        return itemgetter(path)
+
+    def get(row):
+        value = row[path]
+        return None if value is None else convert(value)
+    return get
+
+
+def _nested_getter(fk_path, render):
+    def get(row):
+        return None if row[fk_path] is None else render(row)
+    return get
+
+
+def _many_prefetch(key, relation, child_plan, parent_path):
+    fk = relation.field
+    ordering = relation.related_model._meta.ordering or ['pk']
+
+    def prefetch(rows):
+        # Related managers use the child's default ordering; without one, fall back to pk order
+        groups = {}
+        parents = {row[parent_path] for row in rows}
+        children = (relation.related_model._default_manager.filter(**{f'{fk.name}__in': parents})
+                    .order_by(fk.attname, *ordering).values(fk.attname, *child_plan.paths))
+        for child in children:
+            groups.setdefault(child[fk.attname], []).append(child_plan.render(child))
+        for row in rows:
+            row[key] = groups.get(row[parent_path], [])
+    return prefetch
+
+
+def compile_plan(serializer, model, owner=None, prefix=''):
+    """
+    Plan for ``serializer`` over ``model`` rows.  ``SerializerMethodField``s
+    call ``get_<name>(row)`` on ``owner`` and are only allowed at the top level,
+    like nested ``many=True`` serializers.
+    """
+    paths, getters, prefetches = [], [], []
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        key = field.field_name
+        if isinstance(field, serializers.SerializerMethodField) and owner is not None:
+            method = getattr(owner, field.method_name, None)
+            if method is None:
+                raise ImproperlyConfigured(f"{type(owner).__name__} needs a {field.method_name}(row) method")
+            paths += getattr(owner, 'extra_values', ())
+            getters.append((key, method))
+            continue
+        if isinstance(field, UNSUPPORTED) or len(field.source_attrs) != 1:
+            raise ImproperlyConfigured(f"Field {key!r} of {type(serializer).__name__} cannot be read from values()")
+
+        source = field.source
+        if isinstance(field, serializers.ListSerializer):
+            relation = model._meta.get_field(source)
+            if owner is None or not relation.one_to_many:
+                raise ImproperlyConfigured(f"Nested list {key!r} must be a reverse foreign key on the top level")
+            parent_path = relation.field.target_field.attname
+            child_plan = compile_plan(field.child, relation.related_model)
+            paths.append(parent_path)
+            prefetches.append(_many_prefetch(key, relation, child_plan, parent_path))
+            getters.append((key, itemgetter(key)))
+            continue
+        if isinstance(field, serializers.BaseSerializer):
+            relation = model._meta.get_field(source)
+            if not (relation.many_to_one or relation.one_to_one) or not relation.concrete:
+                raise ImproperlyConfigured(f"Nested {key!r} must follow a forward foreign key")
+            nested = compile_plan(field, relation.related_model, prefix=f'{prefix}{source}__')
+            paths += nested.paths
+            if relation.null:
+                paths.append(prefix + relation.attname)
+                getters.append((key, _nested_getter(prefix + relation.attname, nested.render)))
+            else:
+                getters.append((key, nested.render))
+            continue
+
+        convert = _convert(field)
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            match = DISPLAY_SOURCE.fullmatch(source)
+            if match is None:
+                raise ImproperlyConfigured(f"Field {key!r} of {type(serializer).__name__} is not a model field")
+            model_field = model._meta.get_field(match[1])
+            labels = {value: str(label) for value, label in model_field.flatchoices}
+            convert = _then(lambda value, labels=labels: labels.get(value, value), convert)
+        if model_field.is_relation:
+            raise ImproperlyConfigured(f"Field {key!r} of {type(serializer).__name__} is a relation")
+        paths.append(prefix + model_field.attname)
+        getters.append((key, _value_getter(prefix + model_field.attname, convert)))
+    return Plan(paths, getters, prefetches)
+
+
+def _then(first, second):
+    if second is None:
+        return first
+    return lambda value: second(first(value))
+
+
+class FastSerializer:
+    """
+    Read-only, ``many=True`` stand-in for ``serializer_class``::
+
+        FastDoctorSerializer(Doctor.objects.filter(...)).data
+
+    accepts a queryset (or anything else with ``values()``), or a list of rows
+    already fetched with ``FastDoctorSerializer.values(queryset)``, e.g. a page.
+    Method fields are computed by ``get_<name>(self, row)`` on the subclass;
+    list any extra columns they read in ``extra_values``.
+    """
+    serializer_class = None
+    extra_values = ()
+
+    def __init__(self, rows=None):
+        self.rows = rows
+
+    @classmethod
+    def plan(cls):
+        if '_plan' not in cls.__dict__:
+            serializer = cls.serializer_class()
+            cls._plan = compile_plan(serializer, serializer.Meta.model, owner=cls())
+        return cls._plan
+
+    @classmethod
+    def values(cls, queryset):
+        return queryset.values(*cls.plan().paths)
+
+    @property
+    def data(self):
+        plan = self.plan()
+        _render.timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+        rows = self.rows if isinstance(self.rows, list) else list(self.values(self.rows))
+        for prefetch in plan.prefetches:
+            prefetch(rows)
+        return [plan.render(row) for row in rows]
+
+
+class FastListMixin:
+    """``ListAPIView.list`` through ``fast_serializer_class``; other actions keep ``serializer_class``."""
+    fast_serializer_class = None
+
+    def list_rows(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def list(self, request, *args, **kwargs):
+        rows = self.fast_serializer_class.values(self.list_rows())
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.fast_serializer_class(list(page)).data)
+        return Response(self.fast_serializer_class(list(rows)).data)
@@ -0,0 +1,87 @@
+"""
+Password hashing on a dedicated, bounded thread pool.
+
+PBKDF2, scrypt and Argon2 release the GIL while they hash, so running them on
+``PASSWORD_HASHING_WORKERS`` threads (one per core by default) uses every
+core while request threads wait cheaply, and caps how many hashes run at once
+however many logins are in flight.  ``User.set_password`` and
+``User.check_password`` go through here, so registration, login (including
+the dummy hash for unknown usernames and the rehash when ``PASSWORD_HASHERS``
+prefers another algorithm), the admin and imports all share the pool.
+
+Async callers await ``amake_password`` / ``acheck_password`` instead, which
+keeps the event loop free while the pool hashes.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import hashers
+
+THREAD_NAME_PREFIX = 'password-hasher'
+
+_executor = None
+_lock = threading.Lock()
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers = settings.PASSWORD_HASHING_WORKERS or os.cpu_count() or 1
+                _executor = ThreadPoolExecutor(workers, thread_name_prefix=THREAD_NAME_PREFIX)
+    return _executor
+
+
+def _after_fork():
+    # Pool threads do not survive fork(); pre-forking servers get a fresh pool per worker
+    global _executor
+    _executor = None
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _run(func, *args):
+    if threading.current_thread().name.startswith(THREAD_NAME_PREFIX):
+        return func(*args)
+    return executor().submit(func, *args).result()
+
+
+def _verify(password, encoded):
+    # Django decides whether the stored hash is outdated; the upgrade itself is
+    # saved by the caller, on the thread that owns its database connection
+    outdated = []
+    return hashers.check_password(password, encoded, outdated.append), bool(outdated)
+
+
+def make_password(password):
+    return _run(hashers.make_password, password)
+
+
+def make_passwords(passwords):
+    """Hash many passwords in parallel, in order."""
+    return list(executor().map(hashers.make_password, passwords))
+
+
+def check_password(password, encoded, setter=None):
+    """Like ``django.contrib.auth.hashers.check_password``; ``setter(password)`` is called to upgrade the hash."""
+    correct, outdated = _run(_verify, password, encoded)
+    if outdated and setter is not None:
+        setter(password)
+    return correct
+
+
+async def amake_password(password):
+    return await asyncio.wrap_future(executor().submit(hashers.make_password, password))
+
+
+async def acheck_password(password, encoded, setter=None):
+    correct, outdated = await asyncio.wrap_future(executor().submit(_verify, password, encoded))
+    if outdated and setter is not None:
+        await sync_to_async(setter)(password)
+    return correct
@@ -0,0 +1,150 @@
+"""
+Idempotency-Key support for POST endpoints that clients retry.
+
+The first request carrying a key runs the view and its response is stored in
+the ``idempotency`` cache; repeats of the same key replay that response
+without running the view again.  Duplicates that arrive while the first
+request is still running wait for it instead of racing it.
+"""
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+MAX_KEY_LENGTH = 255
+
+PENDING = 'pending'
+DONE = 'done'
+
+
+class IdempotencyStore:
+    """Cache-backed record of in-flight and completed idempotent requests."""
+
+    def __init__(self, alias='idempotency', ttl=None, lock_timeout=None, poll_interval=0.05):
+        self.alias = alias
+        self.ttl = ttl if ttl is not None else getattr(settings, 'IDEMPOTENCY_KEY_TTL', 86400)
+        self.lock_timeout = lock_timeout if lock_timeout is not None else getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 30)
+        self.poll_interval = poll_interval
+        # Wakes up duplicates waiting in this process as soon as the first request finishes;
+        # waiters in other processes fall back to polling the cache.
+        self._finished = threading.Condition()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, scope, key):
+        digest = hashlib.sha256(f'{scope}\x00{key}'.encode()).hexdigest()
+        return f'idem:{digest}'
+
+    def begin(self, cache_key, fingerprint):
+        """
+        Claim ``cache_key`` for this request.
+
+        Returns ``None`` when the caller owns the key and should run the view,
+        otherwise the completed record of the original request.  Raises
+        ``TimeoutError`` if the original request is still running after
+        ``lock_timeout`` seconds.
+        """
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            if self.cache.add(cache_key, {'state': PENDING, 'fingerprint': fingerprint}, self.lock_timeout):
+                return None
+            record = self.cache.get(cache_key)
+            if record is not None and record['state'] == DONE:
+                return record
+            if time.monotonic() >= deadline:
+                raise TimeoutError(cache_key)
+            if record is None:
+                # The owner gave up (error or expired lock); try to claim the key ourselves.
+                continue
+            with self._finished:
+                self._finished.wait(self.poll_interval)
+
+    def complete(self, cache_key, fingerprint, response):
+        record = {
+            'state': DONE,
+            'fingerprint': fingerprint,
+            'status': response.status_code,
+            'data': response.data,
+        }
+        self.cache.set(cache_key, record, self.ttl)
+        self._notify()
+
+    def release(self, cache_key):
+        self.cache.delete(cache_key)
+        self._notify()
+
+    def _notify(self):
+        with self._finished:
+            self._finished.notify_all()
+
+
+store = IdempotencyStore()
+
+
+def request_fingerprint(request):
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def idempotent(view_func):
+    """
+    Make a DRF POST handler honour the ``Idempotency-Key`` request header.
+
+    Works on function views (below ``@api_view``) and, through
+    ``method_decorator``, on generic view methods such as ``create``.
+    """
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = request.META.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_func(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({'error': 'Idempotency-Key is too long'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = request.user.pk if request.user.is_authenticated else 'anon'
+        cache_key = store.make_key(f'{request.path}:{user_id}', key)
+        fingerprint = request_fingerprint(request)
+
+        try:
+            record = store.begin(cache_key, fingerprint)
+        except TimeoutError:
+            return Response(
+                {'error': 'A request with this Idempotency-Key is still being processed'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        if record is not None:
+            if record['fingerprint'] != fingerprint:
+                return Response(
+                    {'error': 'Idempotency-Key was already used with a different request body'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            response = Response(record['data'], status=record['status'])
+            response['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = view_func(request, *args, **kwargs)
+        except Exception:
+            store.release(cache_key)
+            raise
+
+        if isinstance(response, Response) and response.status_code < 500:
+            store.complete(cache_key, fingerprint, response)
+        else:
+            store.release(cache_key)
+        return response
+
+    return wrapper
@@ -0,0 +1,308 @@
+"""
+Bulk CSV / JSON Lines imports.
+
+Rows are streamed from the file, checked against the field rules of the
+existing DRF serializers, and written a batch at a time with
+``bulk_create``/``bulk_update`` inside one transaction per batch.  Rows that
+fail validation, or whose batch fails to write, are reported with their line
+number instead of aborting the import.
+
+Importers (``accounts.imports``, ``hospitals.imports``) subclass ``Importer``;
+``ImportCommand`` and ``ImportAdminMixin`` expose them to ``manage.py`` and
+the Django admin.
+"""
+import csv
+import io
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.contrib import messages
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from django.shortcuts import redirect, render
+from django.urls import path
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import SkipField, empty
+from rest_framework.validators import UniqueValidator
+
+from .responsecache import invalidate
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+DEFAULT_BATCH_SIZE = 1000
+
+
+class SerializerRules:
+    """
+    Field-level validation borrowed from an existing serializer.
+
+    Runs each field's ``run_validation`` plus the serializer's
+    ``validate_<field>`` method, like ``Serializer.to_internal_value`` does.
+    ``UniqueValidator``s are dropped because they query once per row; importers
+    check uniqueness for a whole batch at once instead.
+    """
+
+    def __init__(self, serializer, field_names, optional=()):
+        self.optional = set(optional)
+        self.fields = {}
+        for name in field_names:
+            field_obj = serializer.fields[name]
+            field_obj.validators = [v for v in field_obj.validators if not isinstance(v, UniqueValidator)]
+            self.fields[name] = (field_obj, getattr(serializer, f'validate_{name}', None))
+
+    def validate(self, data):
+        values, errors = {}, {}
+        for name, (field_obj, method) in self.fields.items():
+            primitive = data.get(name, empty)
+            if primitive is empty and name in self.optional:
+                continue
+            try:
+                value = field_obj.run_validation(primitive)
+                if method is not None:
+                    value = method(value)
+            except ValidationError as exc:
+                errors[name] = exc.detail
+            except SkipField:
+                continue
+            else:
+                values[name] = value
+        return values, errors
+
+
+class Importer:
+    """
+    One kind of record.  Subclasses set ``name`` and implement ``validate``
+    (row -> ``(record, errors)``), ``key`` (record -> natural key) and
+    ``write`` (list of ``(line, record)`` -> ``(created, updated, errors)``,
+    where ``errors`` maps line numbers to messages for rows that were skipped).
+    Bulk writes skip model signals, so ``cache_scopes`` lists the
+    ``healthhub.responsecache`` scopes to invalidate after an import.
+    """
+    name = None
+    cache_scopes = ()
+
+    def prepare(self, row):
+        """Normalize a raw row before validation; blank cells count as missing."""
+        return {key: value for key, value in row.items() if value not in ('', None)}
+
+    def validate(self, row):
+        raise NotImplementedError
+
+    def key(self, record):
+        raise NotImplementedError
+
+    def write(self, batch):
+        raise NotImplementedError
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def processed(self):
+        return self.created + self.updated + len(self.errors)
+
+    @property
+    def rate(self):
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+
+def detect_format(filename, fmt=None):
+    fmt = fmt or Path(filename).suffix.lstrip('.').lower()
+    if fmt in ('json', 'ndjson'):
+        fmt = 'jsonl'
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format {fmt!r}; use one of {', '.join(IMPORT_FORMATS)}")
+    return fmt
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line number, row dict or error message)`` from a text stream."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, "Each line must be a JSON object"
+            continue
+        yield line_number, row
+
+
+def _batches(rows, size):
+    batch = []
+    for item in rows:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_import(importer, rows, batch_size=DEFAULT_BATCH_SIZE, dry_run=False, progress=None):
+    """Validate and upsert ``rows`` (from ``read_rows``) with ``importer``."""
+    result = ImportResult()
+    started = time.monotonic()
+    for raw_batch in _batches(rows, batch_size):
+        valid, seen = [], {}
+        for line, row in raw_batch:
+            if isinstance(row, str):
+                result.errors.append({'line': line, 'errors': {'non_field_errors': [row]}})
+                continue
+            record, errors = importer.validate(importer.prepare(row))
+            if not errors:
+                key = importer.key(record)
+                if key in seen:
+                    errors = {'non_field_errors': [f"Duplicate of line {seen[key]}"]}
+                seen[key] = line
+            if errors:
+                result.errors.append({'line': line, 'errors': errors})
+            else:
+                valid.append((line, record))
+
+        if valid and not dry_run:
+            try:
+                with transaction.atomic():
+                    created, updated, skipped = importer.write(valid)
+            except DatabaseError as exc:
+                result.errors.extend(
+                    {'line': line, 'errors': {'non_field_errors': [f"Batch failed: {exc}"]}} for line, _ in valid
+                )
+            else:
+                result.created += created
+                result.updated += updated
+                result.errors.extend(
+                    {'line': line, 'errors': {'non_field_errors': [message]}} for line, message in skipped.items()
+                )
+        elif valid:
+            # Dry runs count rows that would be written
+            result.created += len(valid)
+        if progress is not None:
+            progress(result)
+    result.errors.sort(key=lambda error: error['line'])
+    if not dry_run and result.created + result.updated:
+        invalidate(*importer.cache_scopes)
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def _plain(errors):
+    return json.loads(json.dumps(errors, default=str))
+
+
+class ImportCommand(BaseCommand):
+    """Base for ``manage.py import_*`` commands; subclasses set ``importers`` (name -> class)."""
+    importers = {}
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(self.importers))
+        parser.add_argument('path', help="CSV or JSON Lines file ('-' for stdin)")
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help="Defaults to the file extension")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Rows per transaction")
+        parser.add_argument('--errors', help="Write the per-row error report to this JSON Lines file")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; write nothing")
+
+    def handle(self, *args, **options):
+        importer = self.importers[options['kind']]()
+        try:
+            fmt = detect_format(options['path'], options['format'])
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        def progress(result):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{result.processed} rows, {len(result.errors)} errors")
+
+        if options['path'] == '-':
+            result = run_import(importer, read_rows(self.stdin_text(), fmt), options['batch_size'],
+                                options['dry_run'], progress)
+        else:
+            with open(options['path'], newline='', encoding='utf-8-sig') as stream:
+                result = run_import(importer, read_rows(stream, fmt), options['batch_size'],
+                                    options['dry_run'], progress)
+
+        if options['errors']:
+            with open(options['errors'], 'w', encoding='utf-8') as report:
+                for error in result.errors:
+                    report.write(json.dumps(_plain(error)) + '\n')
+        else:
+            for error in result.errors[:20]:
+                self.stderr.write(f"line {error['line']}: {json.dumps(_plain(error['errors']))}")
+            if len(result.errors) > 20:
+                self.stderr.write(f"... {len(result.errors) - 20} more; use --errors for the full report")
+
+        style = self.style.SUCCESS if not result.errors else self.style.WARNING
+        if options['dry_run']:
+            summary = f"Validated {importer.name}: {result.created} valid"
+        else:
+            summary = f"Imported {importer.name}: {result.created} created, {result.updated} updated"
+        self.stdout.write(style(
+            f"{summary}, {len(result.errors)} failed in {result.elapsed:.2f}s ({result.rate:.0f} rows/s)"
+        ))
+
+    def stdin_text(self):
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+
+
+class ImportAdminMixin:
+    """Adds an "Import" upload page to a ``ModelAdmin``; set ``importer_class``."""
+    importer_class = None
+    change_list_template = 'admin/import_change_list.html'
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view),
+                 name=f'{opts.app_label}_{opts.model_name}_import'),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request) or not self.has_change_permission(request):
+            return redirect('admin:index')
+        opts = self.model._meta
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': opts,
+            'title': f"Import {opts.verbose_name_plural}",
+            'formats': IMPORT_FORMATS,
+            'batch_size': DEFAULT_BATCH_SIZE,
+        }
+        upload = request.FILES.get('file') if request.method == 'POST' else None
+        if upload is not None:
+            try:
+                fmt = detect_format(upload.name, request.POST.get('format') or None)
+                batch_size = max(1, int(request.POST.get('batch_size') or DEFAULT_BATCH_SIZE))
+            except ValueError as exc:
+                self.message_user(request, str(exc), messages.ERROR)
+                return render(request, 'admin/import_form.html', context)
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            result = run_import(self.importer_class(), read_rows(stream, fmt), batch_size,
+                                dry_run='dry_run' in request.POST)
+            level = messages.SUCCESS if not result.errors else messages.WARNING
+            self.message_user(
+                request,
+                f"{result.created} created, {result.updated} updated, {len(result.errors)} failed "
+                f"in {result.elapsed:.2f}s",
+                level,
+            )
+            context['errors'] = [
+                {'line': error['line'], 'errors': json.dumps(_plain(error['errors']))}
+                for error in result.errors[:200]
+            ]
+            context['error_count'] = len(result.errors)
+        return render(request, 'admin/import_form.html', context)
@@ -0,0 +1,315 @@
+"""
+Local answers to directory questions in chat.
+
+``match(message)`` recognizes requests such as "find an eye specialist in
+Sylhet" or "which hospitals do bypass surgery abroad", and ``answer()``
+replies from the doctor, nurse and hospital tables instead of the
+completion API.  Slots are the labels (plus a few synonyms) of
+``Doctor.SPECIALIST_CHOICES``, ``Doctor.LOCATION_CHOICES``,
+``Hospital.SURGERY_TYPE_CHOICES`` and ``Hospital.COUNTRY_CHOICES``, found
+longest-first with a word trie, so matching costs a few dictionary lookups
+per word.  A message is only routed when it asks for a listing: a verb such
+as "find", "show" or "book", or a place in a message that does not open like
+a question about a topic.  A surgery also needs a hospital or a place.
+"What does a cardiologist do?" and "any side effects after knee
+replacement?" still go to the model.
+"""
+import threading
+import time
+from collections import Counter, namedtuple
+
+from django.conf import settings
+
+from accounts.models import Doctor, Nurse
+from hospitals.models import Hospital
+from .chatcache import normalize
+
+Intent = namedtuple('Intent', 'name slots')
+
+# (slot, value) -> phrases besides the choice label
+SYNONYMS = {
+    ('specialist', 'eye'): ('eye doctor', 'ophthalmologist', 'ophthalmology'),
+    ('specialist', 'cardiologist'): ('heart specialist', 'heart doctor', 'cardiology'),
+    ('specialist', 'gynecologist'): ('gynaecologist', 'gynecology', 'gynaecology', 'obgyn'),
+    ('specialist', 'neurologist'): ('neurology', 'nerve specialist'),
+    ('specialist', 'orthopedic'): ('orthopaedic', 'orthopedist', 'bone doctor', 'bone specialist'),
+    ('specialist', 'dermatologist'): ('dermatology', 'skin doctor', 'skin specialist'),
+    ('specialist', 'pediatrician'): ('paediatrician', 'pediatrics', 'child specialist', 'child doctor'),
+    ('specialist', 'psychiatrist'): ('psychiatry', 'mental health doctor'),
+    ('specialist', 'general'): ('general practitioner', 'gp', 'family doctor'),
+    ('location', 'chittagong'): ('chattogram', 'ctg'),
+    ('location', 'barisal'): ('barishal',),
+    ('location', 'sylhet'): ('srihotto',),
+    ('surgery_type', 'bypass'): ('heart bypass', 'coronary bypass'),
+    ('surgery_type', 'joint_replacement'): ('knee replacement', 'hip replacement'),
+    ('surgery_type', 'lasik'): ('laser eye surgery',),
+    ('surgery_type', 'brain_tumor'): ('brain tumour',),
+    ('country', 'abroad'): ('overseas', 'foreign', 'international', 'outside bangladesh', 'outside the country'),
+}
+SLOT_CHOICES = {
+    'specialist': Doctor.SPECIALIST_CHOICES,
+    'location': Doctor.LOCATION_CHOICES,
+    'surgery_type': Hospital.SURGERY_TYPE_CHOICES,
+    'country': Hospital.COUNTRY_CHOICES,
+}
+# Trailing words a surgery can be named without ("bypass", "pacemaker")
+SURGERY_SUFFIXES = ('surgery', 'repair', 'implantation')
+
+# Verbs that ask for a listing; "find out" asks for an explanation
+LOOKUP_WORDS = frozenset(('find', 'search', 'list', 'show', 'recommend', 'suggest', 'book', 'locate'))
+# Openings of questions about a topic rather than for a listing ("Is bypass surgery risky abroad?")
+QUESTION_WORDS = frozenset((
+    'what', 'whats', 'why', 'how', 'is', 'are', 'does', 'do', 'can', 'could', 'should', 'would', 'will',
+))
+DOCTOR_WORDS = frozenset(('doctor', 'specialist', 'physician', 'dr'))
+NURSE_WORDS = frozenset(('nurse',))
+HOSPITAL_WORDS = frozenset(('hospital', 'clinic'))
+
+_END = object()
+
+
+def _phrases(label):
+    # "LASIK / Vision Correction Surgery" names both; "Bypass Surgery (CABG)" adds an abbreviation, but
+    # "(Knee / Hip)" is too vague on its own
+    main, _, extra = label.partition('(')
+    parts = main.split('/')
+    if extra and '/' not in extra:
+        parts.append(extra.rstrip(')'))
+    for part in parts:
+        words = normalize(part)
+        if words:
+            yield words
+
+
+def build_trie():
+    trie = {}
+
+    def add(words, slot, value):
+        node = trie
+        for word in words:
+            node = node.setdefault(word, {})
+        node.setdefault(_END, (slot, value))
+
+    for slot, choices in SLOT_CHOICES.items():
+        for value, label in choices:
+            for words in _phrases(label):
+                add(words, slot, value)
+                if slot == 'surgery_type' and len(words) > 1 and words[-1] in SURGERY_SUFFIXES:
+                    add(words[:-1], slot, value)
+    for (slot, value), phrases in SYNONYMS.items():
+        for phrase in phrases:
+            add(normalize(phrase), slot, value)
+    return trie
+
+
+TRIE = build_trie()
+
+
+def _singular(word):
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    if word.endswith('s') and not word.endswith('ss') and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def find_slots(words):
+    """The first value of each slot found in ``words``, longest phrase first."""
+    slots = {}
+    position = 0
+    while position < len(words):
+        node, found, end = TRIE, None, position
+        for index in range(position, len(words)):
+            word = words[index]
+            node = node.get(word) or node.get(_singular(word))
+            if node is None:
+                break
+            if _END in node:
+                found, end = node[_END], index + 1
+        if found is None:
+            position += 1
+            continue
+        slots.setdefault(*found)
+        position = end
+    return slots
+
+
+class RouterStats:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.messages = 0
+        self.intents = Counter()
+        self.match_seconds = self.answer_seconds = self.answer_max = 0.0
+
+    def matched(self, intent, elapsed):
+        with self._lock:
+            self.messages += 1
+            self.match_seconds += elapsed
+            if intent is not None:
+                self.intents[intent.name] += 1
+
+    def answered(self, elapsed):
+        with self._lock:
+            self.answer_seconds += elapsed
+            self.answer_max = max(self.answer_max, elapsed)
+
+    def as_dict(self):
+        routed = sum(self.intents.values())
+        return {
+            'messages': self.messages,
+            'routed': routed,
+            'hit_rate': round(routed / self.messages, 4) if self.messages else None,
+            'intents': dict(self.intents),
+            'match_us_mean': round(self.match_seconds / self.messages * 1e6, 2) if self.messages else None,
+            'answer_ms_mean': round(self.answer_seconds / routed * 1e3, 3) if routed else None,
+            'answer_ms_max': round(self.answer_max * 1e3, 3),
+        }
+
+
+router_stats = RouterStats()
+
+
+def match(message):
+    """The ``Intent`` of a directory question, or ``None`` to ask the model."""
+    started = time.perf_counter()
+    intent = _match(message) if isinstance(message, str) else None
+    router_stats.matched(intent, time.perf_counter() - started)
+    return intent
+
+
+def _asks_for_listing(words):
+    return any(word in LOOKUP_WORDS and words[index + 1:index + 2] != ['out'] for index, word in enumerate(words))
+
+
+def _match(message):
+    words = normalize(message)
+    slots = find_slots(words)
+    kinds = {_singular(word) for word in words}
+    place = 'location' in slots or 'country' in slots
+    # A listing verb, or a place in a message that is not a question about a topic
+    if not (_asks_for_listing(words) or (place and words[0] not in QUESTION_WORDS)):
+        return None
+    if 'surgery_type' in slots or 'country' in slots:
+        # A surgery alone is a medical topic; it needs a hospital or a place to be a lookup
+        if not (place or HOSPITAL_WORDS.intersection(kinds)):
+            return None
+        return Intent('find_hospitals', {slot: slots[slot] for slot in ('surgery_type', 'country', 'location')
+                                         if slot in slots})
+    if NURSE_WORDS.intersection(kinds):
+        return Intent('find_nurses', {slot: slots[slot] for slot in ('location',) if slot in slots})
+    if 'specialist' in slots or ('location' in slots and DOCTOR_WORDS.intersection(kinds)):
+        return Intent('find_doctors', {slot: slots[slot] for slot in ('specialist', 'location') if slot in slots})
+    return None
+
+
+def _name(row):
+    return f"{row['user__first_name']} {row['user__last_name']}".strip() or row['user__username']
+
+
+def _doctors(slots, limit):
+    queryset = Doctor.objects.filter(is_available=True, **slots).order_by('-experience_years', 'pk')
+    rows = list(queryset.values('id', 'user__first_name', 'user__last_name', 'user__username', 'specialist',
+                                'location', 'consultation_fee', 'experience_years')[:limit])
+    specialists, locations = dict(Doctor.SPECIALIST_CHOICES), dict(Doctor.LOCATION_CHOICES)
+    results = [{
+        'id': row['id'],
+        'name': f"Dr. {_name(row)}",
+        'specialist': specialists[row['specialist']],
+        'location': locations[row['location']],
+        'consultation_fee': row['consultation_fee'],
+        'experience_years': row['experience_years'],
+    } for row in rows]
+    lines = [f"{result['name']}, {result['specialist']}, {result['location']}, {result['experience_years']} years, "
+             f"fee {result['consultation_fee']}" for result in results]
+    return queryset, results, lines
+
+
+def _nurses(slots, limit):
+    queryset = Nurse.objects.filter(is_available=True, **slots).order_by('-experience_years', 'pk')
+    rows = list(queryset.values('id', 'user__first_name', 'user__last_name', 'user__username', 'location',
+                                'consultation_fee', 'experience_years')[:limit])
+    locations = dict(Nurse.LOCATION_CHOICES)
+    results = [{
+        'id': row['id'],
+        'name': _name(row),
+        'location': locations[row['location']],
+        'consultation_fee': row['consultation_fee'],
+        'experience_years': row['experience_years'],
+    } for row in rows]
+    lines = [f"{result['name']}, {result['location']}, {result['experience_years']} years, "
+             f"fee {result['consultation_fee']}" for result in results]
+    return queryset, results, lines
+
+
+def _hospitals(slots, limit):
+    queryset = Hospital.objects.filter(is_active=True)
+    if 'country' in slots:
+        queryset = queryset.filter(country=slots['country'])
+    if 'location' in slots:
+        queryset = queryset.filter(city__iexact=dict(Doctor.LOCATION_CHOICES)[slots['location']])
+    if 'surgery_type' in slots:
+        queryset = queryset.performing(slots['surgery_type'])
+    queryset = queryset.order_by('-rating', 'name')
+    countries = dict(Hospital.COUNTRY_CHOICES)
+    results = [{
+        'id': row['id'],
+        'name': row['name'],
+        'city': row['city'],
+        'country': countries[row['country']],
+        'rating': row['rating'],
+    } for row in queryset.values('id', 'name', 'city', 'country', 'rating')[:limit]]
+    lines = [f"{result['name']}, {result['city']} ({result['country']}), rated {result['rating']}"
+             for result in results]
+    return queryset, results, lines
+
+
+ANSWERS = {
+    'find_doctors': (_doctors, 'available doctor', 'available doctors'),
+    'find_nurses': (_nurses, 'available nurse', 'available nurses'),
+    'find_hospitals': (_hospitals, 'hospital', 'hospitals'),
+}
+
+
+def describe(slots):
+    labels = {slot: dict(SLOT_CHOICES[slot])[value] for slot, value in slots.items()}
+    parts = []
+    if 'specialist' in labels:
+        parts.append(f"for {labels['specialist']}")
+    if 'surgery_type' in labels:
+        parts.append(f"for {labels['surgery_type']}")
+    if 'location' in labels:
+        parts.append(f"in {labels['location']}")
+    if 'country' in labels:
+        parts.append('abroad' if slots['country'] == 'abroad' else f"in {labels['country']}")
+    return ' '.join(parts)
+
+
+def answer(intent):
+    """The chat payload answering ``intent``: ``reply`` text, the ``intent`` and the top ``results``."""
+    started = time.perf_counter()
+    query, singular, plural = ANSWERS[intent.name]
+    limit = settings.CHAT_ROUTER_LIMIT
+    queryset, results, lines = query(intent.slots, limit)
+    total = len(results) if len(results) < limit else queryset.count()
+    criteria = describe(intent.slots)
+    subject = f"{singular if total == 1 else plural} {criteria}".strip()
+    if not results:
+        reply = f"I couldn't find any {plural} {criteria}".rstrip() + " right now."
+    else:
+        shown = '' if total == len(results) else f" Here are the top {len(results)}:"
+        reply = f"I found {total} {subject}.{shown}\n" + '\n'.join(f"- {line}" for line in lines)
+    router_stats.answered(time.perf_counter() - started)
+    return {
+        'reply': reply,
+        'intent': {'name': intent.name, 'slots': intent.slots},
+        'results': results,
+        'total': total,
+    }
+
+
+def stats():
+    return router_stats.as_dict()
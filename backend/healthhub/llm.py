@@ -0,0 +1,384 @@
+"""
+Pooled, bounded client for the chat completion API.
+
+Every upstream call runs on one background event loop per process, through
+a single ``httpx.AsyncClient``.  Its keep-alive connections are therefore
+reused by all requests, whether the view runs on the ASGI server's loop or
+on a per-request loop under WSGI.  Callers await ``chat_completion()`` from
+any loop; the call is bounded by:
+
+* ``LLM_TIMEOUT``: deadline for the whole completion (``LLM_CONNECT_TIMEOUT``
+  for the connection);
+* ``LLM_MAX_CONCURRENCY`` calls in flight, where callers that wait longer
+  than ``LLM_QUEUE_TIMEOUT`` for a slot give up;
+* a circuit breaker: after ``LLM_BREAKER_FAILURES`` consecutive failures
+  (timeouts, transport errors, 429/5xx) calls fail immediately for
+  ``LLM_BREAKER_RESET`` seconds, then a single trial call decides whether
+  to close it again.
+
+``chat_completion()`` returns ``None`` instead of raising, and the caller
+falls back to its placeholder reply.  ``stream_completion()`` yields the
+reply's content deltas as the upstream generates them, to sync or async
+readers, and cancels the upstream call when the reader closes it early.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+
+import httpx
+import orjson
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker; only used from the client's event loop."""
+
+    def __init__(self, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if self.trial or self.clock() - self.opened_at >= self.reset_timeout else 'open'
+
+    def allow(self):
+        if self.opened_at is None:
+            return True
+        if not self.trial and self.clock() - self.opened_at >= self.reset_timeout:
+            # Half-open: one call probes the upstream, the others keep failing fast
+            self.trial = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.trial or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self.trial = False
+
+    def record_abandoned(self):
+        """The trial call ended without a verdict on the upstream; let the next call probe."""
+        self.trial = False
+
+
+class LLMClient:
+
+    def __init__(self, base_url, api_key, model, timeout, connect_timeout, max_concurrency, queue_timeout,
+                 breaker):
+        self.model = model
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.breaker = breaker
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.http = httpx.AsyncClient(
+            base_url=base_url.rstrip('/') + '/',
+            headers={'Authorization': f'Bearer {api_key}'},
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+        self.counters = dict.fromkeys(
+            ('calls', 'succeeded', 'failed', 'short_circuited', 'queue_timeouts', 'abandoned'), 0)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            base_url=settings.OPENAI_BASE_URL,
+            api_key=settings.OPENAI_API_KEY,
+            model=settings.OPENAI_MODEL,
+            timeout=settings.LLM_TIMEOUT,
+            connect_timeout=settings.LLM_CONNECT_TIMEOUT,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            queue_timeout=settings.LLM_QUEUE_TIMEOUT,
+            breaker=CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET),
+        )
+
+    async def admit(self):
+        """Pass the breaker and take a concurrency slot; ``False`` if the call is refused."""
+        self.counters['calls'] += 1
+        if not self.breaker.allow():
+            self.counters['short_circuited'] += 1
+            return False
+        probe = self.breaker.opened_at is not None
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.counters['queue_timeouts'] += 1
+            if probe:
+                # The probe never ran; let the next call probe instead
+                self.breaker.record_abandoned()
+            return False
+        except asyncio.CancelledError:
+            if probe:
+                self.breaker.record_abandoned()
+            raise
+        if not probe and self.breaker.opened_at is not None:
+            # Opened while this call was queued
+            self.semaphore.release()
+            self.counters['short_circuited'] += 1
+            return False
+        return True
+
+    def failed(self, exc):
+        self.counters['failed'] += 1
+        self.breaker.record_failure()
+        logger.warning("Chat completion failed: %r", exc)
+
+    def check_status(self, response):
+        if response.status_code == 429 or response.status_code >= 500:
+            raise httpx.HTTPStatusError(f"Upstream returned {response.status_code}", request=response.request,
+                                        response=response)
+
+    async def complete(self, messages, **params):
+        if not await self.admit():
+            return None
+        # admit() returns without yielding once it has checked the breaker, so this is still its view
+        probe = self.breaker.opened_at is not None
+        try:
+            response = await asyncio.wait_for(
+                self.http.post('chat/completions', json={'model': self.model, 'messages': messages, **params}),
+                self.timeout,
+            )
+            self.check_status(response)
+        except (asyncio.TimeoutError, httpx.HTTPError) as exc:
+            self.failed(exc)
+            return None
+        except asyncio.CancelledError:
+            # The caller went away before the upstream answered
+            if probe:
+                self.breaker.record_abandoned()
+            raise
+        finally:
+            self.semaphore.release()
+
+        self.breaker.record_success()
+        if response.status_code != 200:
+            # Our request was rejected; the upstream itself is healthy
+            self.counters['failed'] += 1
+            logger.warning("Chat completion rejected with %s: %s", response.status_code, response.text[:200])
+            return None
+        try:
+            content = response.json()['choices'][0]['message']['content']
+        except (ValueError, LookupError, TypeError):
+            self.counters['failed'] += 1
+            logger.warning("Unexpected chat completion response: %s", response.text[:200])
+            return None
+        self.counters['succeeded'] += 1
+        return content
+
+    async def stream(self, messages, queue, **params):
+        """
+        Put the reply's content deltas on ``queue`` as they arrive; ``True`` if the reply completed.
+
+        ``LLM_TIMEOUT`` bounds the wait for the response headers, each read of
+        the body, and each wait for room in ``queue``: a reader that stops
+        reading for that long abandons the call.
+        """
+        if not await self.admit():
+            return False
+        probe = self.breaker.opened_at is not None
+        request = self.http.build_request(
+            'POST', 'chat/completions', json={'model': self.model, 'messages': messages, **params, 'stream': True})
+        response = None
+        try:
+            response = await asyncio.wait_for(self.http.send(request, stream=True), self.timeout)
+            self.check_status(response)
+            if response.status_code != 200:
+                self.breaker.record_success()
+                self.counters['failed'] += 1
+                logger.warning("Chat completion rejected with %s", response.status_code)
+                return False
+            async for line in response.aiter_lines():
+                if not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    break
+                try:
+                    delta = orjson.loads(data)['choices'][0]['delta'].get('content')
+                except (orjson.JSONDecodeError, LookupError, TypeError, AttributeError):
+                    continue
+                if not delta:
+                    continue
+                try:
+                    # Backpressure: upstream reads pause while the reader is behind
+                    await asyncio.wait_for(queue.put(delta), self.timeout)
+                except asyncio.TimeoutError:
+                    self.counters['abandoned'] += 1
+                    if probe:
+                        self.breaker.record_abandoned()
+                    return False
+        except (asyncio.TimeoutError, httpx.HTTPError) as exc:
+            self.failed(exc)
+            return False
+        except asyncio.CancelledError:
+            # The reader went away; closing the response drops the upstream connection
+            self.counters['abandoned'] += 1
+            if probe:
+                self.breaker.record_abandoned()
+            raise
+        finally:
+            if response is not None:
+                await response.aclose()
+            self.semaphore.release()
+        self.breaker.record_success()
+        self.counters['succeeded'] += 1
+        return True
+
+    def stats(self):
+        return {**self.counters, 'breaker': self.breaker.state, 'consecutive_failures': self.breaker.failures}
+
+
+_loop = None
+_client = None
+_lock = threading.Lock()
+
+
+def _background_loop():
+    global _loop
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='llm-client', daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def _after_fork():
+    # The loop thread does not survive fork(); pre-forking servers start their own
+    global _loop, _client
+    _loop = _client = None
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _on_loop(coroutine):
+    return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, _background_loop()))
+
+
+async def _complete(messages, params):
+    global _client
+    if _client is None:
+        _client = LLMClient.from_settings()
+    return await _client.complete(messages, **params)
+
+
+async def chat_completion(messages, **params):
+    """The reply content of a chat completion, or ``None`` if it failed or was refused."""
+    return await _on_loop(_complete(messages, params))
+
+
+class CompletionStream:
+    """
+    The content deltas of a streamed completion, iterable from any thread or event loop.
+
+    The upstream call runs on the client's loop and buffers up to
+    ``LLM_STREAM_BUFFER`` deltas ahead of the reader.  Iteration ends early
+    (with ``failed`` set) if the call was refused or broke off; ``close()``
+    cancels the upstream call, and must be called if iteration stops early.
+    """
+
+    def __init__(self, messages, params):
+        self.messages = messages
+        self.params = params
+        self.failed = False
+        self._queue = self._task = None
+        self._closed = self._done = False
+
+    async def _next(self):
+        if self._closed:
+            return False
+        if self._task is None:
+            self._queue = asyncio.Queue(settings.LLM_STREAM_BUFFER)
+            self._task = asyncio.create_task(_produce(self.messages, self.params, self._queue))
+        return await self._queue.get()
+
+    def _item(self, item):
+        if isinstance(item, str):
+            return item
+        self._done = True
+        self.failed = not item
+        return None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._done:
+            item = self._item(asyncio.run_coroutine_threadsafe(self._next(), _background_loop()).result())
+            if item is not None:
+                return item
+        raise StopIteration
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._done:
+            item = self._item(await _on_loop(self._next()))
+            if item is not None:
+                return item
+        raise StopAsyncIteration
+
+    def _cancel(self):
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+
+    def close(self):
+        if not self._done:
+            self._done = True
+            _background_loop().call_soon_threadsafe(self._cancel)
+
+    async def aclose(self):
+        self.close()
+
+
+async def _produce(messages, params, queue):
+    global _client
+    if _client is None:
+        _client = LLMClient.from_settings()
+    completed = await _client.stream(messages, queue, **params)
+    # Ends the reader's iteration; a reader that is gone gets the task cancelled
+    await queue.put(completed)
+
+
+def stream_completion(messages, **params):
+    """A ``CompletionStream`` of the reply's content as it is generated."""
+    return CompletionStream(messages, params)
+
+
+async def _stats():
+    return _client.stats() if _client is not None else None
+
+
+async def stats():
+    return await _on_loop(_stats())
+
+
+async def _reset():
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.http.aclose()
+
+
+async def reset():
+    """Close the client; the next call builds one from the current settings."""
+    await _on_loop(_reset())
@@ -0,0 +1,53 @@
+"""
+orjson and MessagePack renderers.
+
+``ORJSONRenderer`` replaces DRF's ``JSONRenderer`` globally and writes the
+same bytes for what our views return: dates and times still go through DRF's
+encoder, so UTC datetimes keep their ``Z`` suffix, and ``Decimal`` becomes a
+float as before.  Indented output (the browsable API, ``; indent=4``
+requests) and non-default ``COMPACT_JSON``/``UNICODE_JSON`` settings fall
+back to the stdlib encoder.
+
+``MessagePackRenderer`` is only picked when a client asks for
+``application/msgpack``; values are coerced the same way as for JSON.
+"""
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+# Coerces what orjson/msgpack cannot encode (Decimal, datetimes, lazy strings...) like JSONRenderer
+_default = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (not self.compact or self.ensure_ascii
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        # Keep the output a strict JavaScript subset, like JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
@@ -0,0 +1,93 @@
+"""
+Cache of rendered read-only responses, stored precompressed.
+
+``@cached_response(scope)`` wraps a DRF handler (a function view below
+``@api_view``, or a generic view method through ``method_decorator``) whose
+output depends only on the URL.  The first request renders normally; its bytes
+are stored in the ``responses`` cache together with gzip/brotli versions
+compressed once at the best ratio (see ``healthhub.compression``).  Later
+requests for the same URL and media type are answered from the cache, and
+``CompressionMiddleware`` sends the stored encoding without compressing again.
+
+Entries are keyed by a per-scope generation number.  ``invalidate(scope)``
+bumps it, which is what ``invalidate_on`` does when models of the scope are
+saved or deleted.  Entries also expire after ``RESPONSE_CACHE_TTL`` seconds,
+which bounds staleness for writes that skip signals, or that happen in other
+processes while the cache is process-local.
+"""
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+from .compression import precompress
+
+CACHE_ALIAS = 'responses'
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _generation(scope):
+    # Seeded from the clock so a generation evicted from the cache never comes back as an old number
+    return _cache().get_or_set(f'gen:{scope}', time.time_ns, None)
+
+
+def invalidate(*scopes):
+    for scope in scopes:
+        try:
+            _cache().incr(f'gen:{scope}')
+        except ValueError:
+            # Never cached yet; nothing to invalidate
+            pass
+
+
+def invalidate_on(scope, model, condition=None):
+    """Invalidate ``scope`` whenever a ``model`` row is saved or deleted (and ``condition(instance)`` holds)."""
+    def handler(sender, instance, **kwargs):
+        if condition is None or condition(instance):
+            invalidate(scope)
+    post_save.connect(handler, sender=model, weak=False, dispatch_uid=f'responsecache_save_{scope}_{model.__name__}')
+    post_delete.connect(handler, sender=model, weak=False,
+                        dispatch_uid=f'responsecache_delete_{scope}_{model.__name__}')
+
+
+def _cacheable(request):
+    # The browsable API embeds the user and a CSRF token
+    renderer = getattr(request, 'accepted_renderer', None)
+    return request.method == 'GET' and renderer is not None and renderer.format != 'api'
+
+
+def cached_response(scope):
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable(request):
+                return view_func(request, *args, **kwargs)
+            digest = hashlib.sha256(f'{request.get_full_path()}\x00{request.accepted_media_type}'.encode())
+            key = f'{scope}:{_generation(scope)}:{digest.hexdigest()}'
+            entry = _cache().get(key)
+            if entry is not None:
+                response = HttpResponse(entry['content'], content_type=entry['content_type'])
+                response.precompressed = entry['encoded']
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                def store(rendered):
+                    rendered.precompressed = precompress(rendered.content)
+                    _cache().set(key, {
+                        'content': rendered.content,
+                        'content_type': rendered['Content-Type'],
+                        'encoded': rendered.precompressed,
+                    }, settings.RESPONSE_CACHE_TTL)
+                response.add_post_render_callback(store)
+            return response
+        return wrapper
+    return decorator
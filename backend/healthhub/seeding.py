@@ -0,0 +1,302 @@
+"""
+Deterministic synthetic dataset for load tests and benchmarks.
+
+``Seeder`` bulk-inserts patients, doctors, nurses, hospitals and appointments
+drawn from a ``random.Random(seed)``: the same seed, volumes and anchor date
+always produce the same rows.  Everything is written with ``bulk_create`` in
+batches, every account shares one precomputed password hash, and derived
+columns (``starts_at``, timestamps) are filled in directly, so seeding skips
+the per-row work of the API.
+
+Distributions are skewed the way real traffic is: a few specialties and the
+big cities dominate, provider popularity follows a Pareto curve so some
+calendars are nearly full while most are sparse, and past bookings are mostly
+completed while upcoming ones are pending or approved.
+"""
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from datetime import time as clock
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import Doctor, Nurse, Patient, User
+from appointments.models import Appointment, NurseAppointment, appointment_starts_at
+from hospitals.models import Hospital, HospitalSpecialist
+
+DEFAULT_PASSWORD = 'testpass123'
+
+SPECIALIST_WEIGHTS = {
+    'eye': 9, 'cardiologist': 12, 'gynecologist': 14, 'neurologist': 6, 'orthopedic': 9,
+    'dermatologist': 8, 'pediatrician': 15, 'psychiatrist': 4,
+}
+LOCATION_WEIGHTS = {
+    'dhaka': 40, 'chittagong': 18, 'rajshahi': 8, 'khulna': 8, 'barisal': 5,
+    'sylhet': 8, 'rangpur': 6, 'mymensingh': 7,
+}
+SURGERY_TYPE_WEIGHTS = {
+    'open_heart': 6, 'bypass': 8, 'valve_replacement': 5, 'pacemaker': 6, 'brain_tumor': 4,
+    'spinal_cord': 4, 'joint_replacement': 9, 'spine_fixation': 5, 'lasik': 10,
+    'retinal_detachment': 5, 'prostate_cancer': 4, 'lung_cancer': 4,
+}
+ABROAD_CITIES = ('Kolkata', 'Chennai', 'Delhi', 'Bangkok', 'Singapore', 'Kuala Lumpur')
+DURATION_WEIGHTS = {15: 2, 20: 3, 30: 10, 45: 3, 60: 1}
+PAST_STATUS_WEIGHTS = {'completed': 78, 'cancelled': 14, 'approved': 5, 'pending': 3}
+FUTURE_STATUS_WEIGHTS = {'pending': 45, 'approved': 45, 'cancelled': 10}
+FIRST_NAMES = (
+    'Abdul', 'Amina', 'Arif', 'Ayesha', 'Farhan', 'Fatema', 'Habib', 'Jannat', 'Kamal', 'Laila',
+    'Mahmud', 'Nadia', 'Nasir', 'Nusrat', 'Rafiq', 'Rina', 'Sabbir', 'Sadia', 'Tanvir', 'Tasnim',
+)
+LAST_NAMES = (
+    'Ahmed', 'Akter', 'Alam', 'Chowdhury', 'Das', 'Hasan', 'Hossain', 'Islam', 'Karim', 'Khan',
+    'Mia', 'Rahman', 'Roy', 'Sarkar', 'Siddique', 'Uddin',
+)
+REASONS = ('Routine check-up', 'Follow-up visit', 'Persistent headache', 'Fever and cough',
+           'Back pain', 'Skin rash', 'Prescription renewal', 'Test results review', '')
+DAY_START, DAY_END = clock(9), clock(17)
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let ``bulk_create`` keep the ``auto_now``/``auto_now_add`` values set on the instances."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _weighted(rng, weights, k=1):
+    return rng.choices(list(weights), weights=list(weights.values()), k=k)
+
+
+def _allocate(total, weights):
+    """Split ``total`` over ``weights`` proportionally with integer counts (largest remainders first)."""
+    scale = total / sum(weights)
+    shares = [weight * scale for weight in weights]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(range(len(shares)), key=lambda i: shares[i] - counts[i], reverse=True)
+    for i in by_remainder[:total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+class Seeder:
+    """Generates one dataset; ``run()`` writes it and returns per-table row counts and timings."""
+
+    def __init__(self, patients, doctors, nurses, hospitals, appointments, nurse_appointments,
+                 seed=42, anchor=None, days_back=365, days_ahead=60, batch_size=5000,
+                 prefix='seed', password=DEFAULT_PASSWORD, log=None):
+        self.volumes = {
+            'patients': patients, 'doctors': doctors, 'nurses': nurses, 'hospitals': hospitals,
+            'appointments': appointments, 'nurse_appointments': nurse_appointments,
+        }
+        self.seed = seed
+        self.anchor = anchor or timezone.localdate()
+        self.days_back = days_back
+        self.days_ahead = days_ahead
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.password = password
+        self.log = log or (lambda message: None)
+        self.anchor_time = appointment_starts_at(self.anchor, clock(8))
+        self.stats = {}
+
+    def rng(self, stream):
+        # One generator per table, so changing one volume leaves the other tables unchanged
+        return random.Random(f'{self.seed}:{stream}')
+
+    def exists(self):
+        return User.objects.filter(username__startswith=f'{self.prefix}_').exists()
+
+    def run(self):
+        self.password_hash = make_password(self.password)
+        self.patient_ids = self._seed_users('patient', Patient, self._patient_profile)
+        self.doctor_ids = self._seed_users('doctor', Doctor, self._doctor_profile)
+        self.nurse_ids = self._seed_users('nurse', Nurse, self._nurse_profile)
+        self._seed_hospitals()
+        with explicit_timestamps(Appointment, NurseAppointment):
+            self._seed_appointments('appointments', Appointment, 'doctor', Doctor, self.doctor_ids)
+            self._seed_appointments('nurse_appointments', NurseAppointment, 'nurse', Nurse, self.nurse_ids)
+        return self.stats
+
+    def _write(self, name, model, rows):
+        """``bulk_create`` ``rows`` (any iterable) in transactions of ``batch_size``."""
+        started = time.monotonic()
+        written, batch = 0, []
+
+        def flush():
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            self.log(f"  {name}: {written} rows")
+
+        for row in rows:
+            batch.append(row)
+            written += 1
+            if len(batch) >= self.batch_size:
+                flush()
+                batch = []
+        if batch:
+            flush()
+        elapsed = time.monotonic() - started
+        self.stats[name] = {'rows': written, 'seconds': round(elapsed, 2),
+                            'rows_per_second': round(written / elapsed) if elapsed else None}
+        return written
+
+    def _seed_users(self, user_type, profile_model, make_profile):
+        count = self.volumes[f'{user_type}s']
+        rng = self.rng(user_type)
+        stem = f'{self.prefix}_{user_type}_'
+        joined_span = (self.days_back + 365) * 86400
+
+        def users():
+            for i in range(count):
+                yield User(
+                    username=f'{stem}{i}',
+                    email=f'{stem}{i}@example.com',
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                    user_type=user_type,
+                    password=self.password_hash,
+                    date_joined=self.anchor_time - timedelta(seconds=rng.randrange(joined_span)),
+                )
+
+        self._write(f'{user_type}_users', User, users())
+        ids = list(User.objects.filter(username__startswith=stem).order_by('pk').values_list('pk', flat=True))
+        self._write(f'{user_type}_profiles', profile_model, (make_profile(rng, user_id) for user_id in ids))
+        return ids
+
+    def _phone(self, rng):
+        return f'01{rng.randrange(3, 10)}{rng.randrange(10 ** 8):08d}'
+
+    def _patient_profile(self, rng, user_id):
+        born = self.anchor - timedelta(days=rng.randrange(365, 90 * 365))
+        return Patient(user_id=user_id, phone=self._phone(rng), date_of_birth=born,
+                       address=f'House {rng.randrange(1, 200)}, Road {rng.randrange(1, 40)}',
+                       emergency_contact=self._phone(rng))
+
+    def _doctor_profile(self, rng, user_id):
+        return Doctor(
+            user_id=user_id,
+            specialist=_weighted(rng, SPECIALIST_WEIGHTS)[0],
+            location=_weighted(rng, LOCATION_WEIGHTS)[0],
+            phone=self._phone(rng),
+            experience_years=min(40, int(rng.expovariate(1 / 10))),
+            consultation_fee=Decimal(rng.randrange(300, 2000, 50)),
+            appointment_duration=_weighted(rng, DURATION_WEIGHTS)[0],
+        )
+
+    def _nurse_profile(self, rng, user_id):
+        return Nurse(
+            user_id=user_id,
+            location=_weighted(rng, LOCATION_WEIGHTS)[0],
+            phone=self._phone(rng),
+            experience_years=min(35, int(rng.expovariate(1 / 8))),
+            consultation_fee=Decimal(rng.randrange(200, 1000, 50)),
+            appointment_duration=_weighted(rng, DURATION_WEIGHTS)[0],
+        )
+
+    def _seed_hospitals(self):
+        rng = self.rng('hospital')
+        count = self.volumes['hospitals']
+        stem = f'{self.prefix.title()} '
+        locations = [code.title() for code in LOCATION_WEIGHTS]
+
+        def hospitals():
+            for i in range(count):
+                abroad = rng.random() < 0.2
+                yield Hospital(
+                    name=f'{stem}{rng.choice(LAST_NAMES)} Hospital {i}',
+                    country='abroad' if abroad else 'bangladesh',
+                    city=rng.choice(ABROAD_CITIES) if abroad else _weighted(
+                        rng, dict(zip(locations, LOCATION_WEIGHTS.values())))[0],
+                    address=f'{rng.randrange(1, 500)} Hospital Road',
+                    phone=self._phone(rng),
+                    surgery_types=sorted(set(_weighted(rng, SURGERY_TYPE_WEIGHTS, k=rng.randint(1, 6)))),
+                    rating=Decimal(rng.randrange(250, 500)) / 100,
+                )
+
+        self._write('hospitals', Hospital, hospitals())
+        ids = list(Hospital.objects.filter(name__startswith=stem).order_by('pk').values_list('pk', flat=True))
+        specialties = list(SPECIALIST_WEIGHTS)
+
+        def specialists():
+            for hospital_id in ids:
+                for _ in range(rng.randint(0, 5)):
+                    yield HospitalSpecialist(
+                        hospital_id=hospital_id,
+                        name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                        specialization=rng.choice(specialties).title(),
+                        experience_years=rng.randrange(1, 35),
+                    )
+
+        self._write('hospital_specialists', HospitalSpecialist, specialists())
+
+    def _seed_appointments(self, name, model, provider_field, profile_model, provider_ids):
+        total = self.volumes[name]
+        if not total or not provider_ids or not self.patient_ids:
+            self.stats[name] = {'rows': 0, 'seconds': 0, 'rows_per_second': None}
+            return
+        rng = self.rng(name)
+        durations = dict(profile_model.objects.filter(user_id__in=provider_ids)
+                         .values_list('user_id', 'appointment_duration'))
+        # Pareto-distributed popularity for providers and patients alike, capped so
+        # the busiest calendars stay within their working hours
+        counts = _allocate(total, [min(rng.paretovariate(1.3), 50) for _ in provider_ids])
+        patient_cum_weights = list(accumulate(min(rng.paretovariate(1.5), 100) for _ in self.patient_ids))
+        first_day = self.anchor - timedelta(days=self.days_back)
+        days = self.days_back + self.days_ahead
+        workday = (datetime.combine(date.min, DAY_END) - datetime.combine(date.min, DAY_START)).seconds // 60
+
+        def appointments():
+            for provider_id, count in zip(provider_ids, counts):
+                duration = durations.get(provider_id) or 30
+                slots_per_day = workday // duration
+                count = min(count, days * slots_per_day)
+                patients = rng.choices(self.patient_ids, cum_weights=patient_cum_weights, k=count)
+                for slot, patient_id in zip(rng.sample(range(days * slots_per_day), count), patients):
+                    day = first_day + timedelta(days=slot // slots_per_day)
+                    minutes = (slot % slots_per_day) * duration
+                    at = clock(DAY_START.hour + minutes // 60, minutes % 60)
+                    starts_at = appointment_starts_at(day, at)
+                    yield self._appointment(rng, model, provider_field, provider_id, patient_id,
+                                            day, at, starts_at, duration)
+
+        self._write(name, model, appointments())
+
+    def _appointment(self, rng, model, provider_field, provider_id, patient_id, day, at, starts_at, duration):
+        past = starts_at < self.anchor_time
+        status = _weighted(rng, PAST_STATUS_WEIGHTS if past else FUTURE_STATUS_WEIGHTS)[0]
+        lead = timedelta(hours=1 + rng.expovariate(1 / 150))
+        created_at = min(starts_at - lead, self.anchor_time - timedelta(minutes=rng.randrange(1, 600)))
+        if status == 'completed':
+            updated_at = starts_at + timedelta(minutes=duration)
+        elif status == 'pending':
+            updated_at = created_at
+        else:
+            updated_at = created_at + (min(starts_at, self.anchor_time) - created_at) * rng.random()
+        return model(
+            patient_id=patient_id,
+            **{f'{provider_field}_id': provider_id},
+            status=status,
+            appointment_date=day,
+            appointment_time=at,
+            starts_at=starts_at,
+            duration_minutes=duration,
+            reason=rng.choice(REASONS),
+            created_at=created_at,
+            updated_at=updated_at,
+        )
+
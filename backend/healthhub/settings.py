@@ -3,7 +3,8 @@ Django settings for healthhub project.
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
+from corsheaders.defaults import default_headers
 from datetime import timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -27,15 +28,20 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'accounts',
     'appointments',
     'hospitals',
+    'taskqueue',
+    'audit',
+    'analytics',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'healthhub.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -49,7 +55,7 @@ ROOT_URLCONF = 'healthhub.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -68,11 +74,109 @@ WSGI_APPLICATION = 'healthhub.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': config('DATABASE_NAME', default=str(BASE_DIR / 'db.sqlite3')),
     }
 }
 
+# Caches
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'idempotency': {
+        'BACKEND': config('IDEMPOTENCY_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('IDEMPOTENCY_CACHE_LOCATION', default='idempotency'),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('IDEMPOTENCY_MAX_ENTRIES', default=10000, cast=int),
+        },
+    },
+    'responses': {
+        'BACKEND': config('RESPONSE_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('RESPONSE_CACHE_LOCATION', default='responses'),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('RESPONSE_CACHE_MAX_ENTRIES', default=2000, cast=int),
+        },
+    },
+    # login / user_profile payloads (accounts.profiles)
+    'profiles': {
+        'BACKEND': config('PROFILE_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('PROFILE_CACHE_LOCATION', default='profiles'),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('PROFILE_CACHE_MAX_ENTRIES', default=10000, cast=int),
+        },
+    },
+    # Counters of healthhub.throttling; use a cache shared by all workers (e.g. redis) for global limits
+    'throttle': {
+        'BACKEND': config('THROTTLE_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('THROTTLE_CACHE_LOCATION', default='throttle'),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('THROTTLE_MAX_ENTRIES', default=100000, cast=int),
+        },
+    },
+}
+
+# Directory and statistics responses cached precompressed (seconds)
+RESPONSE_CACHE_TTL = config('RESPONSE_CACHE_TTL', default=300, cast=int)
+# Cached login / user_profile payloads (seconds)
+PROFILE_CACHE_TTL = config('PROFILE_CACHE_TTL', default=300, cast=int)
+
+# gzip / brotli compression of API responses
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=4, cast=int)
+COMPRESSION_GZIP_LEVEL = config('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+COMPRESSION_TYPES = (
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/html', 'text/plain', 'application/javascript',
+    'text/css',
+)
+# Responses carrying tokens are left uncompressed (BREACH), and chat replies stream as generated
+COMPRESSION_EXCLUDE_PATHS = ('/api/auth/login/', '/api/auth/register/', '/api/auth/token/refresh/', '/api/chat/')
+
+# Idempotency-Key handling for retried POSTs (seconds)
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=24 * 60 * 60, cast=int)
+IDEMPOTENCY_LOCK_TIMEOUT = config('IDEMPOTENCY_LOCK_TIMEOUT', default=30, cast=int)
+
+# Finished appointments older than this many days are moved to the archive tables
+APPOINTMENT_ARCHIVE_AFTER_DAYS = config('APPOINTMENT_ARCHIVE_AFTER_DAYS', default=180, cast=int)
+
+# Minutes a provider is bookable per week, the denominator of dashboard utilization
+PROVIDER_WEEKLY_CAPACITY_MINUTES = config('PROVIDER_WEEKLY_CAPACITY_MINUTES', default=40 * 60, cast=int)
+
+# Appointment reminders (see appointments/reminders.py)
+REMINDER_BACKEND = config('REMINDER_BACKEND', default='appointments.reminders.ConsoleReminderBackend')
+REMINDER_WORKERS = config('REMINDER_WORKERS', default=4, cast=int)
+REMINDER_FILE_PATH = config('REMINDER_FILE_PATH', default=str(BASE_DIR / 'reminders.jsonl'))
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='no-reply@healthhub.local')
+
+# Background task queue (see taskqueue/queue.py)
+TASKS_WORKERS = config('TASKS_WORKERS', default=4, cast=int)
+TASKS_VISIBILITY_TIMEOUT = config('TASKS_VISIBILITY_TIMEOUT', default=300, cast=int)
+TASKS_MAX_ATTEMPTS = config('TASKS_MAX_ATTEMPTS', default=5, cast=int)
+TASKS_RETRY_BACKOFF = config('TASKS_RETRY_BACKOFF', default=5, cast=int)
+TASKS_RETRY_BACKOFF_MAX = config('TASKS_RETRY_BACKOFF_MAX', default=3600, cast=int)
+
+# Audit trail buffering (see audit/buffer.py)
+AUDIT_FLUSH_SIZE = config('AUDIT_FLUSH_SIZE', default=200, cast=int)
+AUDIT_FLUSH_INTERVAL = config('AUDIT_FLUSH_INTERVAL', default=2.0, cast=float)
+# Failed flushes keep their events for this many attempts, then insert them one by one
+AUDIT_FLUSH_RETRIES = config('AUDIT_FLUSH_RETRIES', default=5, cast=int)
+
 # Password validation
+# The first hasher hashes new passwords; the others only verify stored hashes, which are
+# rehashed with the first one at the next login.  Put ScryptPasswordHasher first (or
+# Argon2PasswordHasher, with argon2-cffi installed) to switch algorithms.
+PASSWORD_HASHERS = config('PASSWORD_HASHERS', cast=Csv(), default=','.join([
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]))
+# Threads hashing passwords (healthhub.hashing); 0 means one per CPU
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=0, cast=int)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -108,13 +212,34 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Sliding-window limits of the login/registration throttles (healthhub.throttling); empty disables one
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('THROTTLE_LOGIN_IP_RATE', default='30/min'),
+        'login_username': config('THROTTLE_LOGIN_USERNAME_RATE', default='10/min'),
+        'register': config('THROTTLE_REGISTER_RATE', default='20/hour'),
+    },
+    # Reverse proxies in front of the app; the address throttles key on the client address the
+    # outermost one saw (from X-Forwarded-For), or on REMOTE_ADDR when 0
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # orjson for JSON; MessagePack only when a client sends Accept: application/msgpack
+    'DEFAULT_RENDERER_CLASSES': [
+        'healthhub.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'healthhub.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'healthhub.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'healthhub.parsers.MessagePackParser',
+    ],
 }
 
 # JWT Settings
@@ -142,8 +267,17 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.TokenRefreshSerializer',
 }
 
+# Per-process cache of the user fields authentication needs (accounts.authentication)
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=10000, cast=int)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=300, cast=int)
+# Embed user_type/is_staff/is_superuser in issued tokens and authorize from them
+JWT_ROLE_CLAIMS = config('JWT_ROLE_CLAIMS', default=True, cast=bool)
+# Seconds between reloads of tokens revoked by other processes (accounts.revocation)
+REVOCATION_SYNC_INTERVAL = config('REVOCATION_SYNC_INTERVAL', default=5, cast=float)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -152,6 +286,8 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+
 # Custom user model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -159,4 +295,24 @@ AUTH_USER_MODEL = 'accounts.User'
 AI_CHAT_ENABLED = config('AI_CHAT_ENABLED', default=False, cast=bool)
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
 OPENAI_MODEL = config('OPENAI_MODEL', default='gpt-4o-mini')
+OPENAI_BASE_URL = config('OPENAI_BASE_URL', default='https://api.openai.com/v1')
+# Limits of the pooled completion client (healthhub.llm), in seconds unless noted
+LLM_TIMEOUT = config('LLM_TIMEOUT', default=20, cast=float)
+LLM_CONNECT_TIMEOUT = config('LLM_CONNECT_TIMEOUT', default=3, cast=float)
+LLM_MAX_CONCURRENCY = config('LLM_MAX_CONCURRENCY', default=32, cast=int)
+LLM_QUEUE_TIMEOUT = config('LLM_QUEUE_TIMEOUT', default=2, cast=float)
+# Consecutive failures that open the circuit breaker, and how long it stays open
+LLM_BREAKER_FAILURES = config('LLM_BREAKER_FAILURES', default=5, cast=int)
+LLM_BREAKER_RESET = config('LLM_BREAKER_RESET', default=30, cast=float)
+# Streamed reply deltas read from the upstream ahead of a slow client
+LLM_STREAM_BUFFER = config('LLM_STREAM_BUFFER', default=16, cast=int)
+# Per-process cache of replies to repeated chat questions (healthhub.chatcache); 0 entries disables it
+CHAT_CACHE_SIZE = config('CHAT_CACHE_SIZE', default=1000, cast=int)
+CHAT_CACHE_TTL = config('CHAT_CACHE_TTL', default=3600, cast=int)
+CHAT_CACHE_MAX_LENGTH = config('CHAT_CACHE_MAX_LENGTH', default=200, cast=int)
+# Also ignore stopwords, plurals and word order when matching questions
+CHAT_CACHE_FUZZY = config('CHAT_CACHE_FUZZY', default=False, cast=bool)
+# Answer directory questions ("find an eye specialist in Sylhet") from the database (healthhub.intents)
+CHAT_ROUTER_ENABLED = config('CHAT_ROUTER_ENABLED', default=True, cast=bool)
+CHAT_ROUTER_LIMIT = config('CHAT_ROUTER_LIMIT', default=5, cast=int)
 
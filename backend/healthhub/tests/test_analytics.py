@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from analytics import materialize
+from analytics.models import DailyRegistrationStat
+
+User = get_user_model()
+
+
+class MaterializeTests(TestCase):
+
+    def test_refresh_covers_more_days_than_one_query_can_hold(self):
+        # Every other day, so no two changed days merge into one range
+        first = timezone.make_aware(datetime(2020, 1, 1, 12))
+        User.objects.bulk_create(
+            User(username=f'user_{index}', email=f'user_{index}@example.com', user_type='patient',
+                 date_joined=first + timedelta(days=2 * index))
+            for index in range(1200))
+        self.assertEqual(materialize.refresh_registrations(since=first - timedelta(days=1)), 1200)
+        self.assertEqual(DailyRegistrationStat.objects.count(), 1200)
+        self.assertEqual(sum(DailyRegistrationStat.objects.values_list('count', flat=True)), 1200)
+        # A second pass replaces the rows of every changed day
+        self.assertEqual(materialize.refresh_registrations(since=first - timedelta(days=1)), 1200)
+        self.assertEqual(DailyRegistrationStat.objects.count(), 1200)
+
+    def test_day_ranges_merge_consecutive_days(self):
+        day = datetime(2024, 2, 28).date()
+        days = {day, day + timedelta(days=1), day + timedelta(days=2), day + timedelta(days=5)}
+        self.assertEqual(materialize.day_ranges(days),
+                         [(day, day + timedelta(days=2)), (day + timedelta(days=5), day + timedelta(days=5))])
@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TestCase
+
+from audit.buffer import AuditBuffer
+from audit.models import AuditEvent
+
+
+def event(field='status', new_value='approved'):
+    return AuditEvent(model_label='appointments.appointment', object_id=1, field=field, old_value='pending',
+                      new_value=new_value)
+
+
+class AuditBufferTests(TestCase):
+
+    def setUp(self):
+        self.buffer = AuditBuffer(flush_size=1000, flush_interval=3600, retries=3)
+        # No background flusher: the tests flush by hand
+        self.buffer._thread = mock.Mock()
+
+    def fail_bulk_create(self, times):
+        real = AuditEvent.objects.bulk_create
+        calls = {'failed': 0}
+
+        def bulk_create(*args, **kwargs):
+            if calls['failed'] < times:
+                calls['failed'] += 1
+                raise OperationalError('database is locked')
+            return real(*args, **kwargs)
+        return mock.patch.object(AuditEvent.objects, 'bulk_create', side_effect=bulk_create)
+
+    def test_failed_flush_keeps_events_for_the_next_one(self):
+        self.buffer.add([event('status'), event('notes')])
+        with self.fail_bulk_create(times=1), self.assertLogs('audit.buffer', 'WARNING'):
+            self.assertEqual(self.buffer.flush(), 0)
+            self.assertEqual(AuditEvent.objects.count(), 0)
+            self.buffer.add([event('status', 'completed')])
+            self.assertEqual(self.buffer.flush(), 3)
+        self.assertEqual(list(AuditEvent.objects.order_by('pk').values_list('field', 'new_value')),
+                         [('status', 'approved'), ('notes', 'approved'), ('status', 'completed')])
+
+    def test_events_are_inserted_one_by_one_after_the_last_retry(self):
+        self.buffer.add([event('status'), event('notes')])
+        # Every batch write fails, then the first single-event insert too
+        with self.fail_bulk_create(times=4), self.assertLogs('audit.buffer', 'WARNING') as logs:
+            self.assertEqual(self.buffer.flush(), 0)
+            self.assertEqual(self.buffer.flush(), 0)
+            self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(list(AuditEvent.objects.values_list('field', flat=True)), ['notes'])
+        self.assertIn('Dropping audit event', logs.output[-1])
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_final_flush_does_not_wait_for_retries(self):
+        self.buffer.add([event()])
+        with self.fail_bulk_create(times=1):
+            self.assertEqual(self.buffer.flush(final=True), 1)
+        self.assertEqual(AuditEvent.objects.count(), 1)
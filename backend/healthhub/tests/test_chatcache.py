@@ -0,0 +1,45 @@
+from django.test import SimpleTestCase, override_settings
+
+from healthhub import chatcache
+
+
+@override_settings(CHAT_CACHE_SIZE=100, CHAT_CACHE_MAX_LENGTH=200, CHAT_CACHE_FUZZY=False)
+class CacheKeyTests(SimpleTestCase):
+
+    def test_personal_messages_bypass_the_cache(self):
+        for message in (
+            "I have chest pain and shortness of breath, what should I do?",
+            "When should we vaccinate our baby?",
+            "Can you tell me if this rash is serious?",
+            "I'm dizzy after standing up",
+            "Is it normal that my hands shake?",
+            "Should the doctor see us today?",
+            "Call 555 0100 tomorrow",
+            "Reply to someone@example.com",
+        ):
+            with self.subTest(message=message):
+                self.assertIsNone(chatcache.cache_key(message))
+
+    def test_bypasses_are_counted(self):
+        before = chatcache.stats()['bypassed']
+        chatcache.cache_key("What should I do about a fever?")
+        self.assertEqual(chatcache.stats()['bypassed'], before + 1)
+
+    def test_general_questions_are_cached(self):
+        self.assertEqual(chatcache.cache_key("What does a cardiologist do?"), 'what does a cardiologist do')
+        self.assertEqual(chatcache.cache_key("  WHAT does a Cardiologist do??"),
+                         chatcache.cache_key("what does a cardiologist do"))
+        self.assertIsNotNone(chatcache.cache_key("What are the symptoms of flu when ill?"))
+
+    def test_long_messages_bypass_the_cache(self):
+        self.assertIsNone(chatcache.cache_key("What is flu " * 30))
+
+    @override_settings(CHAT_CACHE_FUZZY=True)
+    def test_fuzzy_keys_ignore_stopwords_plurals_and_order(self):
+        self.assertEqual(chatcache.cache_key("what do cardiologists do"),
+                         chatcache.cache_key("What does a cardiologist do?"))
+        self.assertIsNone(chatcache.cache_key("what do I need for a cardiologist"))
+
+    @override_settings(CHAT_CACHE_SIZE=0)
+    def test_disabled_cache_has_no_keys(self):
+        self.assertIsNone(chatcache.cache_key("What does a cardiologist do?"))
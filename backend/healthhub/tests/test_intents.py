@@ -0,0 +1,105 @@
+from django.test import SimpleTestCase, TestCase
+
+from accounts.authentication import RoleRefreshToken
+from accounts.models import Doctor, Nurse, User
+from healthhub import intents
+from healthhub.chat_views import PLACEHOLDER
+from hospitals.models import Hospital
+
+
+class MatchTests(SimpleTestCase):
+
+    def test_directory_questions_are_routed(self):
+        for message, name, slots in (
+            ("find an eye specialist in Sylhet", 'find_doctors', {'specialist': 'eye', 'location': 'sylhet'}),
+            ("Which cardiologists are available in Dhaka?", 'find_doctors',
+             {'specialist': 'cardiologist', 'location': 'dhaka'}),
+            ("recommend a child specialist", 'find_doctors', {'specialist': 'pediatrician'}),
+            ("any nurses in chattogram?", 'find_nurses', {'location': 'chittagong'}),
+            ("find a nurse", 'find_nurses', {}),
+            ("which hospitals do bypass surgery abroad", 'find_hospitals',
+             {'surgery_type': 'bypass', 'country': 'abroad'}),
+            ("Show me hospitals for knee replacement in Bangladesh", 'find_hospitals',
+             {'surgery_type': 'joint_replacement', 'country': 'bangladesh'}),
+            ("show me lasik hospitals", 'find_hospitals', {'surgery_type': 'lasik'}),
+        ):
+            with self.subTest(message=message):
+                self.assertEqual(intents.match(message), intents.Intent(name, slots))
+
+    def test_medical_questions_go_to_the_model(self):
+        for message in (
+            "any side effects after knee replacement?",
+            "Is it safe to get lasik at 50?",
+            "which is better for migraines, a neurologist or a psychiatrist?",
+            "I need to know what a cardiologist does",
+            "What does a cardiologist do?",
+            "Is bypass surgery risky abroad?",
+            "find out what a neurologist does",
+            "best skin specialist",
+            "How do I book an appointment?",
+            "",
+        ):
+            with self.subTest(message=message):
+                self.assertIsNone(intents.match(message))
+
+    def test_non_text_messages_are_not_routed(self):
+        self.assertIsNone(intents.match({'text': 'find a nurse'}))
+
+    def test_longest_phrase_wins(self):
+        self.assertEqual(intents.find_slots(intents.normalize("heart bypass surgery")), {'surgery_type': 'bypass'})
+        self.assertEqual(intents.find_slots(intents.normalize("eye doctors")), {'specialist': 'eye'})
+
+
+class AnswerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for index, (specialist, location, years) in enumerate(
+                (('eye', 'sylhet', 10), ('eye', 'sylhet', 3), ('eye', 'dhaka', 5), ('cardiologist', 'sylhet', 7))):
+            user = User.objects.create_user(f'doctor{index}', f'doctor{index}@example.com', 'pass-12345',
+                                            user_type='doctor', first_name='Doc', last_name=str(index))
+            Doctor.objects.create(user=user, specialist=specialist, location=location, experience_years=years)
+        user = User.objects.create_user('nurse0', 'nurse0@example.com', 'pass-12345', user_type='nurse')
+        Nurse.objects.create(user=user, location='chittagong')
+        Hospital.objects.create(name='Apollo', country='abroad', city='Chennai', address='Road 1',
+                                surgery_types=['bypass', 'lasik'], rating=4.5)
+        Hospital.objects.create(name='Square', country='bangladesh', city='Dhaka', address='Road 2',
+                                surgery_types=['open_heart'], rating=4.1)
+        cls.patient = User.objects.create_user('patient0', 'patient0@example.com', 'pass-12345',
+                                               user_type='patient')
+
+    def test_doctors_by_experience(self):
+        data = intents.answer(intents.Intent('find_doctors', {'specialist': 'eye', 'location': 'sylhet'}))
+        self.assertEqual([row['name'] for row in data['results']], ['Dr. Doc 0', 'Dr. Doc 1'])
+        self.assertEqual(data['total'], 2)
+        self.assertTrue(data['reply'].startswith("I found 2 available doctors for Eye Specialist in Sylhet."))
+
+    def test_total_counts_past_the_limit(self):
+        with self.settings(CHAT_ROUTER_LIMIT=1):
+            data = intents.answer(intents.Intent('find_doctors', {'specialist': 'eye'}))
+        self.assertEqual(len(data['results']), 1)
+        self.assertEqual(data['total'], 3)
+        self.assertIn("Here are the top 1:", data['reply'])
+
+    def test_hospitals_by_surgery(self):
+        data = intents.answer(intents.Intent('find_hospitals', {'surgery_type': 'bypass', 'country': 'abroad'}))
+        self.assertEqual([row['name'] for row in data['results']], ['Apollo'])
+        self.assertTrue(data['reply'].startswith("I found 1 hospital for Bypass Surgery (CABG) abroad."))
+
+    def test_no_results(self):
+        data = intents.answer(intents.Intent('find_nurses', {'location': 'rangpur'}))
+        self.assertEqual(data['results'], [])
+        self.assertEqual(data['reply'], "I couldn't find any available nurses in Rangpur right now.")
+
+    def test_chat_routes_directory_questions_only(self):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {RoleRefreshToken.for_user(self.patient).access_token}'}
+        response = self.client.post('/api/chat/', {'message': "find an eye specialist in Sylhet"},
+                                    content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['intent']['name'], 'find_doctors')
+        self.assertEqual(len(response.json()['results']), 2)
+
+        response = self.client.post('/api/chat/', {'message': "any side effects after knee replacement?"},
+                                    content_type='application/json', **headers)
+        self.assertEqual(response.json()['reply'], PLACEHOLDER)
+        self.assertNotIn('intent', response.json())
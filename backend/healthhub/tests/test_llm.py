@@ -0,0 +1,220 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync
+from django.core.asgi import get_asgi_application
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from rest_framework.permissions import IsAdminUser
+
+from accounts.authentication import RoleRefreshToken
+from accounts.models import User
+from benchmarks.mock_llm import MockLLMServer
+from healthhub import llm
+from healthhub.asgi import CancelOnDisconnect
+from healthhub.chat_views import PLACEHOLDER, ChatAPIView
+
+
+@override_settings(
+    AI_CHAT_ENABLED=True,
+    OPENAI_API_KEY='test',
+    LLM_TIMEOUT=0.5,
+    LLM_CONNECT_TIMEOUT=0.5,
+    LLM_MAX_CONCURRENCY=2,
+    LLM_QUEUE_TIMEOUT=0.1,
+    LLM_BREAKER_FAILURES=2,
+    LLM_BREAKER_RESET=0.3,
+    CHAT_CACHE_SIZE=0,
+)
+class LLMClientTests(TestCase):
+    """The pooled client and the async chat view against ``benchmarks.mock_llm``."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.mock = MockLLMServer(latency=0.01, tokens=3).start()
+        cls.settings = override_settings(OPENAI_BASE_URL=cls.mock.base_url)
+        cls.settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.mock.latency = 0.01
+        self.mock.error_rate = 0.0
+        # A fresh client, built from the settings above
+        async_to_sync(llm.reset)()
+        self.addCleanup(async_to_sync(llm.reset))
+        self.user = User.objects.create_user('chat_patient', 'chat@example.com', 'pass-12345', user_type='patient')
+        self.token = str(RoleRefreshToken.for_user(self.user).access_token)
+
+    async def chat(self, message, **headers):
+        return await self.async_client.post('/api/chat/', {'message': message}, content_type='application/json',
+                                            headers=headers)
+
+    async def authorized_chat(self, message):
+        return await self.chat(message, Authorization=f'Bearer {self.token}')
+
+    async def test_reply_from_upstream(self):
+        response = await self.authorized_chat('Hello there')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['reply'].startswith('Mock reply to: Hello there.'))
+
+    async def test_timeout_falls_back_to_placeholder(self):
+        self.mock.latency = 2
+        started = time.monotonic()
+        with self.assertLogs('healthhub.llm', 'WARNING'):
+            response = await self.authorized_chat('Hello there')
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['reply'], PLACEHOLDER)
+        self.assertEqual((await llm.stats())['failed'], 1)
+
+    async def test_semaphore_bounds_concurrency(self):
+        self.mock.latency = 0.3
+        calls = self.mock.calls
+        messages = [{'role': 'user', 'content': 'Hello'}]
+        replies = await asyncio.gather(*(llm.chat_completion(messages) for _ in range(5)))
+        # Two calls fit in LLM_MAX_CONCURRENCY; the rest give up after LLM_QUEUE_TIMEOUT
+        self.assertEqual(sum(reply is not None for reply in replies), 2)
+        self.assertEqual(self.mock.calls - calls, 2)
+        stats = await llm.stats()
+        self.assertEqual(stats['queue_timeouts'], 3)
+        self.assertEqual(stats['succeeded'], 2)
+
+    async def test_breaker_opens_and_recovers_through_probe(self):
+        messages = [{'role': 'user', 'content': 'Hello'}]
+        self.mock.error_rate = 1.0
+        with self.assertLogs('healthhub.llm', 'WARNING'):
+            for _ in range(2):
+                self.assertIsNone(await llm.chat_completion(messages))
+        self.assertEqual((await llm.stats())['breaker'], 'open')
+
+        calls = self.mock.calls
+        self.assertIsNone(await llm.chat_completion(messages))
+        self.assertEqual(self.mock.calls, calls, "An open breaker must not call the upstream")
+        self.assertEqual((await llm.stats())['short_circuited'], 1)
+
+        # A failed probe opens it again
+        await asyncio.sleep(0.35)
+        with self.assertLogs('healthhub.llm', 'WARNING'):
+            self.assertIsNone(await llm.chat_completion(messages))
+        self.assertEqual(self.mock.calls, calls + 1)
+        self.assertEqual((await llm.stats())['breaker'], 'open')
+
+        self.mock.error_rate = 0.0
+        await asyncio.sleep(0.35)
+        self.assertEqual((await llm.stats())['breaker'], 'half-open')
+        self.assertIsNotNone(await llm.chat_completion(messages))
+        stats = await llm.stats()
+        self.assertEqual(stats['breaker'], 'closed')
+        self.assertEqual(stats['consecutive_failures'], 0)
+
+    async def open_breaker(self):
+        self.mock.error_rate = 1.0
+        with self.assertLogs('healthhub.llm', 'WARNING'):
+            for _ in range(2):
+                self.assertIsNone(await llm.chat_completion([{'role': 'user', 'content': 'Hello'}]))
+        self.mock.error_rate = 0.0
+        await asyncio.sleep(0.35)
+
+    async def wait_for_calls(self, calls):
+        while self.mock.calls < calls:
+            await asyncio.sleep(0.01)
+
+    async def test_cancelled_probe_lets_the_next_call_probe(self):
+        messages = [{'role': 'user', 'content': 'Hello'}]
+        await self.open_breaker()
+        self.mock.latency = 2
+        calls = self.mock.calls
+        probe = asyncio.ensure_future(llm.chat_completion(messages))
+        await self.wait_for_calls(calls + 1)
+        probe.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await probe
+        await asyncio.sleep(0.05)
+        self.assertEqual((await llm.stats())['breaker'], 'half-open')
+
+        self.mock.latency = 0.01
+        self.assertIsNotNone(await llm.chat_completion(messages))
+        self.assertEqual((await llm.stats())['breaker'], 'closed')
+
+    async def test_disconnect_during_probe_stream_lets_the_next_call_probe(self):
+        await self.open_breaker()
+        self.mock.token_interval = 0.2
+        self.addCleanup(setattr, self.mock, 'token_interval', 0.0)
+        # As the test client does, keep the request signals off the test's transaction
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+        body = b'{"message": "Hello there"}'
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST', 'scheme': 'http',
+            'path': '/api/chat/', 'raw_path': b'/api/chat/', 'query_string': b'', 'root_path': '',
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()),
+                        (b'accept', b'text/event-stream'), (b'authorization', f'Bearer {self.token}'.encode())],
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+        disconnected = asyncio.Event()
+        received = []
+
+        async def receive():
+            if not received:
+                received.append(body)
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            pass
+
+        calls, aborted = self.mock.calls, self.mock.streams_aborted
+        request = asyncio.ensure_future(CancelOnDisconnect(get_asgi_application())(scope, receive, send))
+        await self.wait_for_calls(calls + 1)
+        disconnected.set()
+        await asyncio.wait_for(request, 2)
+        while self.mock.streams_aborted == aborted:
+            await asyncio.sleep(0.01)
+        stats = await llm.stats()
+        self.assertEqual(stats['abandoned'], 1)
+        self.assertEqual(stats['breaker'], 'half-open')
+
+        self.mock.token_interval = 0.0
+        self.assertIsNotNone(await llm.chat_completion([{'role': 'user', 'content': 'Hello'}]))
+        self.assertEqual((await llm.stats())['breaker'], 'closed')
+
+    async def test_open_breaker_answers_with_placeholder_at_once(self):
+        self.mock.error_rate = 1.0
+        with self.assertLogs('healthhub.llm', 'WARNING'):
+            for _ in range(2):
+                await self.authorized_chat('Hello there')
+        self.mock.latency = 2
+        started = time.monotonic()
+        response = await self.authorized_chat('Hello there')
+        self.assertLess(time.monotonic() - started, 0.3)
+        self.assertEqual(response.json()['reply'], PLACEHOLDER)
+
+    async def test_unauthenticated_is_401(self):
+        calls = self.mock.calls
+        response = await self.chat('Hello there')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response.headers)
+        response = await self.chat('Hello there', Authorization='Bearer not-a-token')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.mock.calls, calls)
+
+    async def test_permission_denied_is_403(self):
+        view = ChatAPIView.as_view(permission_classes=[IsAdminUser])
+        request = AsyncRequestFactory().post('/api/chat/', {'message': 'Hello there'},
+                                             content_type='application/json',
+                                             headers={'Authorization': f'Bearer {self.token}'})
+        response = await view(request)
+        self.assertEqual(response.status_code, 403)
+
+    async def test_get_is_405(self):
+        response = await self.async_client.get('/api/chat/', headers={'Authorization': f'Bearer {self.token}'})
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+
+def rest_framework(**overrides):
+    return {**settings.REST_FRAMEWORK, **overrides}
+
+
+@override_settings(REST_FRAMEWORK=rest_framework(DEFAULT_THROTTLE_RATES={
+    'login_ip': '3/min', 'login_username': '', 'register': ''}))
+class IPThrottleTests(TestCase):
+
+    def setUp(self):
+        caches['throttle'].clear()
+
+    def login(self, forwarded_for, remote_addr='203.0.113.7'):
+        return self.client.post('/api/auth/login/', {'username': 'nobody', 'password': 'wrong'},
+                                content_type='application/json', REMOTE_ADDR=remote_addr,
+                                HTTP_X_FORWARDED_FOR=forwarded_for)
+
+    def test_forwarded_for_does_not_reset_the_count(self):
+        statuses = [self.login(f'198.51.100.{index}').status_code for index in range(4)]
+        self.assertNotIn(429, statuses[:3])
+        self.assertEqual(statuses[3], 429)
+        # Another connecting address has its own count
+        self.assertNotEqual(self.login('198.51.100.9', remote_addr='203.0.113.8').status_code, 429)
+
+    @override_settings(REST_FRAMEWORK=rest_framework(
+        DEFAULT_THROTTLE_RATES={'login_ip': '3/min', 'login_username': '', 'register': ''}, NUM_PROXIES=1))
+    def test_behind_a_proxy_the_forwarded_address_is_used(self):
+        # The proxy appends the address it saw; earlier entries come from the client
+        for index in range(3):
+            self.assertNotEqual(self.login(f'10.0.0.{index}, 198.51.100.1').status_code, 429)
+        self.assertEqual(self.login('10.0.0.9, 198.51.100.1').status_code, 429)
+        self.assertNotEqual(self.login('10.0.0.1, 198.51.100.2').status_code, 429)
@@ -0,0 +1,120 @@
+"""
+Sliding-window throttles for the unauthenticated login and registration endpoints.
+
+DRF's ``SimpleRateThrottle`` keeps a list with a timestamp per request for
+every key.  ``SlidingWindowThrottle`` keeps two integers instead: the count
+of the current fixed window and of the previous one.  It estimates the rate
+as ``previous * (share of the previous window still in range) + current``.
+Counters live in the ``throttle`` cache and are bumped with ``add()`` +
+``incr()``, which are atomic in the locmem, memcached and redis backends, so
+workers sharing one cache share the limits.
+
+Throttles run before the view, so rejected attempts never reach password
+hashing.  Rejected attempts are not counted, which keeps a client that keeps
+hammering from extending its own lockout indefinitely.
+"""
+import hashlib
+import math
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    cache_alias = 'throttle'
+
+    def __init__(self):
+        super().__init__()
+        self._wait = None
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_rate(self):
+        # Read at request time rather than import time, so settings overrides apply
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        if self.scope not in rates:
+            raise ImproperlyConfigured(f"No default throttle rate set for '{self.scope}' scope")
+        # An empty rate disables the throttle
+        return rates[self.scope] or None
+
+    def get_ident_value(self, request):
+        raise NotImplementedError
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_value(request)
+        if ident is None:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        position = self.timer() / self.duration
+        window = math.floor(position)
+        elapsed = position - window
+        current_key, previous_key = f'{self.key}:{window}', f'{self.key}:{window - 1}'
+        counts = self.cache.get_many([current_key, previous_key])
+        current, previous = counts.get(current_key, 0), counts.get(previous_key, 0)
+        if previous * (1 - elapsed) + current >= self.num_requests:
+            self._wait = self.wait_time(previous, current, elapsed)
+            return self.throttle_failure()
+
+        # Kept until the end of the next window, where it is the previous count
+        self.cache.add(current_key, 0, 2 * self.duration)
+        try:
+            self.cache.incr(current_key)
+        except ValueError:
+            # Evicted since add()
+            self.cache.set(current_key, 1, 2 * self.duration)
+        return self.throttle_success()
+
+    def wait_time(self, previous, current, elapsed):
+        """Seconds until the estimated rate drops below the limit, with no further requests."""
+        if current < self.num_requests:
+            # Only the previous window's share has to shrink
+            return (1 - (self.num_requests - current) / previous - elapsed) * self.duration
+        return (1 - elapsed + 1 - self.num_requests / current) * self.duration
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        return max(self._wait, 0) if self._wait is not None else None
+
+
+class IPThrottle(SlidingWindowThrottle):
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class UsernameThrottle(SlidingWindowThrottle):
+    """Keyed by the ``username`` of the request body, whatever address it comes from."""
+
+    def get_ident_value(self, request):
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        # Fixed-length, cache-safe keys for any input
+        return hashlib.blake2b(username.casefold().encode(), digest_size=16).hexdigest()
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginUsernameThrottle(UsernameThrottle):
+    scope = 'login_username'
+
+
+class RegisterIPThrottle(IPThrottle):
+    scope = 'register'
@@ -12,6 +12,9 @@ urlpatterns = [
     path('api/appointments/', include('appointments.urls')),
     path('api/hospitals/', include('hospitals.urls')),
     path('api/chat/', include('healthhub.chat_urls')),
+    path('api/tasks/', include('taskqueue.urls')),
+    path('api/audit/', include('audit.urls')),
+    path('api/analytics/', include('analytics.urls')),
 ]
 
 if settings.DEBUG:
@@ -1,13 +1,16 @@
 from django.contrib import admin
+from healthhub.imports import ImportAdminMixin
+from .imports import HospitalImporter, HospitalSpecialistImporter
 from .models import Hospital, HospitalSpecialist
 
 
 @admin.register(Hospital)
-class HospitalAdmin(admin.ModelAdmin):
+class HospitalAdmin(ImportAdminMixin, admin.ModelAdmin):
     list_display = ['name', 'country', 'city', 'rating', 'is_active', 'created_at']
     list_filter = ['country', 'is_active', 'created_at']
     search_fields = ['name', 'city', 'address']
     readonly_fields = ['created_at', 'updated_at']
+    importer_class = HospitalImporter
     
     fieldsets = (
         ('Basic Information', {
@@ -27,7 +30,8 @@ class HospitalAdmin(admin.ModelAdmin):
 
 
 @admin.register(HospitalSpecialist)
-class HospitalSpecialistAdmin(admin.ModelAdmin):
+class HospitalSpecialistAdmin(ImportAdminMixin, admin.ModelAdmin):
     list_display = ['name', 'specialization', 'hospital', 'experience_years', 'is_available']
     list_filter = ['specialization', 'is_available', 'hospital']
     search_fields = ['name', 'specialization', 'hospital__name']
+    importer_class = HospitalSpecialistImporter
@@ -5,3 +5,8 @@ class HospitalsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hospitals'
 
+    def ready(self):
+        from healthhub.responsecache import invalidate_on
+        from .models import Hospital, HospitalSpecialist
+        invalidate_on('hospitals', Hospital)
+        invalidate_on('hospitals', HospitalSpecialist)
@@ -0,0 +1,142 @@
+"""
+Bulk import of hospitals and their specialists (see ``healthhub.imports``).
+
+Hospitals are matched by ``name`` and ``city``.  Specialist rows name their
+hospital with ``hospital`` and ``hospital_city`` and are matched by hospital,
+``name`` and ``specialization``.  In CSV files ``surgery_types`` may be a
+JSON list or values separated by ``;``.
+"""
+import json
+
+from django.utils import timezone
+
+from healthhub.imports import Importer, SerializerRules
+from .models import Hospital, HospitalSpecialist
+from .serializers import HospitalSerializer, HospitalSpecialistSerializer
+
+HOSPITAL_FIELDS = ('name', 'country', 'city', 'address', 'phone', 'email', 'website', 'description',
+                   'surgery_types', 'rating', 'is_active')
+SPECIALIST_FIELDS = ('name', 'specialization', 'experience_years', 'phone', 'email', 'is_available')
+
+
+class HospitalImporter(Importer):
+    name = 'hospitals'
+    cache_scopes = ('hospitals',)
+
+    def __init__(self):
+        self.rules = SerializerRules(HospitalSerializer(), HOSPITAL_FIELDS)
+
+    def prepare(self, row):
+        row = super().prepare(row)
+        surgery_types = row.get('surgery_types')
+        if isinstance(surgery_types, str):
+            if surgery_types.lstrip().startswith('['):
+                try:
+                    row['surgery_types'] = json.loads(surgery_types)
+                except ValueError:
+                    pass
+            else:
+                row['surgery_types'] = [value.strip() for value in surgery_types.split(';') if value.strip()]
+        return row
+
+    def validate(self, row):
+        record, errors = self.rules.validate(row)
+        valid_types = dict(Hospital.SURGERY_TYPE_CHOICES)
+        surgery_types = record.get('surgery_types', [])
+        if not isinstance(surgery_types, list):
+            errors['surgery_types'] = ["Expected a list of surgery types."]
+        elif any(value not in valid_types for value in surgery_types):
+            unknown = sorted(set(surgery_types) - set(valid_types))
+            errors['surgery_types'] = [f"Unknown surgery types: {', '.join(map(str, unknown))}"]
+        return record, errors
+
+    def key(self, record):
+        return (record['name'], record['city'])
+
+    def write(self, batch):
+        existing = {}
+        for hospital in Hospital.objects.filter(name__in={record['name'] for _, record in batch}).order_by('pk'):
+            existing.setdefault((hospital.name, hospital.city), hospital)
+
+        now = timezone.now()
+        new, changed, matched = [], [], 0
+        for _, record in batch:
+            hospital = existing.get(self.key(record))
+            if hospital is None:
+                new.append(Hospital(**record))
+                continue
+            if all(getattr(hospital, name) == value for name, value in record.items()):
+                matched += 1
+                continue
+            for name, value in record.items():
+                setattr(hospital, name, value)
+            # bulk_update skips auto_now
+            hospital.updated_at = now
+            changed.append(hospital)
+        Hospital.objects.bulk_create(new, batch_size=500)
+        # Large CASE expressions make big bulk_update batches slow
+        Hospital.objects.bulk_update(changed, HOSPITAL_FIELDS + ('updated_at',), batch_size=100)
+        return len(new), len(changed) + matched, {}
+
+
+class HospitalSpecialistImporter(Importer):
+    name = 'hospital specialists'
+    cache_scopes = ('hospitals',)
+
+    def __init__(self):
+        self.rules = SerializerRules(HospitalSpecialistSerializer(), SPECIALIST_FIELDS)
+
+    def validate(self, row):
+        record, errors = self.rules.validate(row)
+        for column in ('hospital', 'hospital_city'):
+            if not row.get(column):
+                errors[column] = ["This field is required."]
+            else:
+                record[column] = str(row[column]).strip()
+        return record, errors
+
+    def key(self, record):
+        return (record['hospital'], record['hospital_city'], record['name'], record['specialization'])
+
+    def write(self, batch):
+        hospital_ids = {}
+        for pk, name, city in (Hospital.objects.filter(name__in={record['hospital'] for _, record in batch})
+                               .order_by('pk').values_list('pk', 'name', 'city')):
+            hospital_ids.setdefault((name, city), pk)
+
+        skipped, accepted = {}, []
+        for line, record in batch:
+            hospital_id = hospital_ids.get((record.pop('hospital'), record.pop('hospital_city')))
+            if hospital_id is None:
+                skipped[line] = "Unknown hospital; import it first"
+                continue
+            record['hospital_id'] = hospital_id
+            accepted.append(record)
+
+        existing = {}
+        for specialist in HospitalSpecialist.objects.filter(
+                hospital_id__in={record['hospital_id'] for record in accepted},
+                name__in={record['name'] for record in accepted}).order_by('pk'):
+            existing.setdefault((specialist.hospital_id, specialist.name, specialist.specialization), specialist)
+
+        new, changed, matched = [], [], 0
+        for record in accepted:
+            specialist = existing.get((record['hospital_id'], record['name'], record['specialization']))
+            if specialist is None:
+                new.append(HospitalSpecialist(**record))
+                continue
+            if all(getattr(specialist, name) == value for name, value in record.items()):
+                matched += 1
+                continue
+            for name, value in record.items():
+                setattr(specialist, name, value)
+            changed.append(specialist)
+        HospitalSpecialist.objects.bulk_create(new, batch_size=500)
+        HospitalSpecialist.objects.bulk_update(changed, SPECIALIST_FIELDS, batch_size=100)
+        return len(new), len(changed) + matched, skipped
+
+
+IMPORTERS = {
+    'hospitals': HospitalImporter,
+    'specialists': HospitalSpecialistImporter,
+}
@@ -0,0 +1,7 @@
+from healthhub.imports import ImportCommand
+from hospitals.imports import IMPORTERS
+
+
+class Command(ImportCommand):
+    help = "Create or update hospitals or hospital specialists from a CSV or JSON Lines file"
+    importers = IMPORTERS
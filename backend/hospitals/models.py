@@ -1,4 +1,14 @@
-from django.db import models
+from django.db import connections, models
+
+
+class HospitalQuerySet(models.QuerySet):
+
+    def performing(self, surgery_type):
+        """Hospitals whose ``surgery_types`` include ``surgery_type``."""
+        if connections[self.db].features.supports_json_field_contains:
+            return self.filter(surgery_types__contains=[surgery_type])
+        # SQLite has no JSON containment; match the quoted element in the stored JSON text
+        return self.filter(surgery_types__icontains=f'"{surgery_type}"')
 
 
 class Hospital(models.Model):
@@ -35,6 +45,8 @@ class Hospital(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = HospitalQuerySet.as_manager()
     
     class Meta:
         ordering = ['-rating', 'name']
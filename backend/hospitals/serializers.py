@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from healthhub.fastserializers import FastSerializer
 from .models import Hospital, HospitalSpecialist
 
 
@@ -26,6 +27,14 @@ class HospitalSerializer(serializers.ModelSerializer):
         return obj.get_surgery_types_display()
 
 
+class FastHospitalSerializer(FastSerializer):
+    serializer_class = HospitalSerializer
+    labels = dict(Hospital.SURGERY_TYPE_CHOICES)
+
+    def get_surgery_types_display(self, row):
+        return [self.labels.get(value, value) for value in row['surgery_types']]
+
+
 class HospitalSearchSerializer(serializers.Serializer):
     surgery_type = serializers.ChoiceField(choices=Hospital.SURGERY_TYPE_CHOICES)
     country = serializers.ChoiceField(choices=Hospital.COUNTRY_CHOICES)
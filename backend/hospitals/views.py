@@ -3,12 +3,17 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Q
+from django.utils.decorators import method_decorator
+from healthhub.fastserializers import FastListMixin
+from healthhub.responsecache import cached_response
 from .models import Hospital, HospitalSpecialist
-from .serializers import HospitalSerializer, HospitalSearchSerializer
+from .serializers import FastHospitalSerializer, HospitalSerializer, HospitalSearchSerializer
 
 
-class HospitalListView(generics.ListAPIView):
+@method_decorator(cached_response('hospitals'), name='list')
+class HospitalListView(FastListMixin, generics.ListAPIView):
     serializer_class = HospitalSerializer
+    fast_serializer_class = FastHospitalSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
@@ -38,19 +43,18 @@ def search_hospitals(request):
     hospitals = Hospital.objects.filter(
         is_active=True,
         country=country,
-        surgery_types__contains=[surgery_type]
-    ).order_by('-rating', 'name')
+    ).performing(surgery_type).order_by('-rating', 'name')
     
-    hospital_serializer = HospitalSerializer(hospitals, many=True)
+    hospital_data = FastHospitalSerializer(hospitals).data
     return Response({
-        'hospitals': hospital_serializer.data,
+        'hospitals': hospital_data,
         'search_criteria': {
             'surgery_type': surgery_type,
             'surgery_type_display': dict(Hospital.SURGERY_TYPE_CHOICES)[surgery_type],
             'country': country,
             'country_display': dict(Hospital.COUNTRY_CHOICES)[country]
         },
-        'total_count': hospitals.count()
+        'total_count': len(hospital_data)
     })
 
 
@@ -0,0 +1,74 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from taskqueue.queue import claim, execute, record_failure, record_success, renew
+
+
+def _init_process():
+    django.setup()
+
+
+def _run_in_thread(name, payload):
+    try:
+        return execute(name, payload)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks on a thread or process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.TASKS_WORKERS)
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--visibility-timeout', type=int, default=settings.TASKS_VISIBILITY_TIMEOUT)
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is drained")
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if options['pool'] == 'process':
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_process)
+            runner = execute
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers)
+            runner = _run_in_thread
+
+        in_flight = {}
+        visibility_timeout = options['visibility_timeout']
+        renewed = time.monotonic()
+        self.stdout.write(f"Running tasks with {workers} {options['pool']} workers")
+        try:
+            while True:
+                free = workers - len(in_flight)
+                claimed = claim(free, visibility_timeout) if free else []
+                for task_obj in claimed:
+                    in_flight[pool.submit(runner, task_obj.name, task_obj.payload)] = task_obj
+
+                if not in_flight:
+                    if options['once']:
+                        return
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, _ = wait(in_flight, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                # Keep long-running tasks hidden from other workers, well before their lease runs out
+                if time.monotonic() - renewed >= visibility_timeout / 3:
+                    renew([in_flight[future] for future in in_flight if future not in done], visibility_timeout)
+                    renewed = time.monotonic()
+                for future in done:
+                    task_obj = in_flight.pop(future)
+                    exc = future.exception()
+                    if exc is None:
+                        record_success(task_obj)
+                    else:
+                        record_failure(task_obj, exc)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping; unfinished tasks will be retried after their visibility timeout")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,177 @@
+"""
+Database-backed task queue.
+
+Functions decorated with ``@task`` in an app's ``tasks.py`` can be deferred
+with ``func.delay(*args, **kwargs)``; the call is stored as a ``Task`` row and
+executed later by ``manage.py run_tasks``.  Claimed tasks are hidden from
+other workers for a visibility timeout, which ``run_tasks`` keeps extending
+while the task runs; a task whose worker died is picked up again once the
+timeout expires.  Failures are retried with exponential
+backoff until ``max_attempts`` is reached.
+"""
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+class TaskFunction:
+    def __init__(self, func, name, max_attempts):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return enqueue(self.name, *args, **kwargs)
+
+
+def task(func=None, *, name=None, max_attempts=None):
+    """Register ``func`` as a task that can be deferred with ``func.delay(...)``."""
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        attempts = max_attempts or settings.TASKS_MAX_ATTEMPTS
+        registry[task_name] = TaskFunction(func, task_name, attempts)
+        return registry[task_name]
+    return register(func) if func is not None else register
+
+
+def enqueue(name, *args, run_at=None, **kwargs):
+    """Queue a call to the registered task ``name``; arguments must be JSON-serializable."""
+    if name not in registry:
+        raise KeyError(f"Unknown task {name!r}")
+    return Task.objects.create(
+        name=name,
+        payload={'args': list(args), 'kwargs': kwargs},
+        max_attempts=registry[name].max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def claim(limit, visibility_timeout):
+    """
+    Atomically take up to ``limit`` runnable tasks for this worker.
+
+    A task is runnable when it is queued and due, or when it is marked running
+    but its visibility timeout has passed.  Each claim is a conditional UPDATE,
+    so two workers never run the same attempt.
+    """
+    now = timezone.now()
+    candidates = list(
+        Task.objects
+        .filter(Q(status='queued', run_at__lte=now) | Q(status='running', locked_until__lt=now))
+        .order_by('run_at')
+        .values_list('pk', 'status', 'locked_until')[:limit]
+    )
+    claimed = []
+    for pk, status, locked_until in candidates:
+        updated = Task.objects.filter(pk=pk, status=status, locked_until=locked_until).update(
+            status='running',
+            locked_until=now + timedelta(seconds=visibility_timeout),
+            attempts=F('attempts') + 1,
+            started_at=now,
+        )
+        if updated:
+            claimed.append(pk)
+    return list(Task.objects.filter(pk__in=claimed))
+
+
+def renew(task_objs, visibility_timeout):
+    """
+    Extend the visibility timeout of tasks this worker is still running.
+
+    Like the claim, each renewal is conditional on the lease being the one this
+    worker holds; returns the tasks whose lease was lost to another worker.
+    """
+    locked_until = timezone.now() + timedelta(seconds=visibility_timeout)
+    lost = []
+    for task_obj in task_objs:
+        if _current_claim(task_obj).update(locked_until=locked_until):
+            task_obj.locked_until = locked_until
+        else:
+            logger.warning("Task %s #%s lost its claim while running", task_obj.name, task_obj.pk)
+            lost.append(task_obj)
+    return lost
+
+
+def retry_delay(attempts):
+    base = settings.TASKS_RETRY_BACKOFF
+    delay = min(base * 2 ** (attempts - 1), settings.TASKS_RETRY_BACKOFF_MAX)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def execute(name, payload):
+    return registry[name](*payload.get('args', []), **payload.get('kwargs', {}))
+
+
+def _current_claim(task_obj):
+    # Guard against a worker that outlived its visibility timeout overwriting a newer claim
+    return Task.objects.filter(pk=task_obj.pk, status='running', locked_until=task_obj.locked_until)
+
+
+def record_success(task_obj):
+    _current_claim(task_obj).update(
+        status='succeeded', locked_until=None, finished_at=timezone.now(), last_error=''
+    )
+
+
+def record_failure(task_obj, exc):
+    error = ''.join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+    if task_obj.attempts >= task_obj.max_attempts:
+        logger.error("Task %s #%s failed permanently: %s", task_obj.name, task_obj.pk, exc)
+        _current_claim(task_obj).update(
+            status='failed', locked_until=None, finished_at=timezone.now(), last_error=error
+        )
+    else:
+        logger.warning("Task %s #%s failed (attempt %s), retrying: %s",
+                       task_obj.name, task_obj.pk, task_obj.attempts, exc)
+        _current_claim(task_obj).update(
+            status='queued', locked_until=None,
+            run_at=timezone.now() + retry_delay(task_obj.attempts), last_error=error
+        )
+
+
+def queue_metrics(window=timedelta(hours=1), sample_size=1000):
+    """Queue depth by status plus wait/run-time percentiles of recently finished tasks."""
+    now = timezone.now()
+    depth = dict(Task.objects.values_list('status').annotate(total=Count('id')).order_by())
+    oldest_due = Task.objects.filter(status='queued', run_at__lte=now).aggregate(oldest=Min('run_at'))['oldest']
+
+    recent = list(
+        Task.objects
+        .filter(status='succeeded', finished_at__gte=now - window)
+        .order_by('-finished_at')
+        .values_list('created_at', 'started_at', 'finished_at')[:sample_size]
+    )
+    queue_wait = sorted((started - created).total_seconds() for created, started, _ in recent)
+    run_time = sorted((finished - started).total_seconds() for _, started, finished in recent)
+
+    return {
+        'depth': {status: depth.get(status, 0) for status, _ in Task.STATUS_CHOICES},
+        'oldest_due_age_seconds': (now - oldest_due).total_seconds() if oldest_due else 0,
+        'finished_last_window': len(recent),
+        'queue_wait_seconds': _percentiles(queue_wait),
+        'run_time_seconds': _percentiles(run_time),
+    }
+
+
+def _percentiles(values):
+    if not values:
+        return {'p50': None, 'p95': None, 'max': None}
+
+    def pick(fraction):
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+    return {'p50': pick(0.5), 'p95': pick(0.95), 'max': values[-1]}
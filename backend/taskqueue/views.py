@@ -0,0 +1,13 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from .queue import queue_metrics
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def metrics(request):
+    if request.user.user_type != 'admin' and not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    return Response(queue_metrics())